@@ -0,0 +1,261 @@
+import base64
+import io
+import os
+import random
+import threading
+
+import requests
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Optional: without Pillow screenshots are uploaded as-is (with their real mime type)
+    Image = None
+
+from build_manifest import hash_inputs
+
+# Stat extraction through the Gemini API, shared by the GUI (sitegen.py).
+# Keep this module free of PySide6 so it can be driven from scripts or against a local stand-in server.
+
+# --- CONFIGURATION ---
+DEFAULT_ENDPOINT = "https://generativelanguage.googleapis.com/v1beta"
+DEFAULT_MODEL = "gemini-2.5-pro"
+DEFAULT_CONCURRENCY = 2
+REQUEST_TIMEOUT = 60
+# Retries after the first attempt; waits grow 2s, 4s, 8s, ... up to MAX_BACKOFF (plus jitter)
+MAX_RETRIES = 4
+BASE_BACKOFF = 2.0
+MAX_BACKOFF = 30.0
+RETRY_STATUS = {429, 500, 502, 503, 504}
+# Response cache (state dir/.ai_cache), least recently used entries are evicted above this size
+CACHE_DIR_NAME = ".ai_cache"
+DEFAULT_CACHE_MB = 64
+# Screenshot pre-processing before upload. crop is a (left, top, right, bottom) box in fractions
+# of the screenshot, e.g. (0.5, 0.0, 1.0, 1.0) keeps the right half where the stat panel sits.
+DEFAULT_PREPROCESS = {"max_side": 1600, "crop": None, "format": "jpeg", "quality": 88}
+MIME_TYPES = {"jpeg": "image/jpeg", "png": "image/png", "webp": "image/webp"}
+EXIF_ORIENTATION = 0x0112
+
+PROMPT = "Analyze the attached image(s) of a character's stats from Granado Espada M. Extract all Basic Stats and Stance Information. Format the output as a clean, well-structured HTML snippet using TailwindCSS classes. The final output should be ONLY the HTML code, without any markdown formatting. Use a structure like this: <div class='space-y-4'><div><h3 class='text-lg font-semibold text-amber-200'>Basic Stats</h3>...</div><div><h3 class='text-lg font-semibold text-amber-200'>Stance Information</h3>...</div></div>"
+
+
+class AIExtractError(Exception):
+    pass
+
+
+class AICancelled(AIExtractError):
+    pass
+
+
+class ResponseCache:
+    """
+    On-disk cache of model responses, one file per key. Keys hash the image bytes, prompt and
+    model, so identical requests are answered without calling (or paying for) the API.
+    A hit refreshes the file's mtime; eviction drops the oldest files once max_bytes is exceeded.
+    """
+
+    def __init__(self, cache_dir, max_bytes=DEFAULT_CACHE_MB * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def key(images, prompt, model, preprocess=None):
+        """images are the original file bytes, so a hit skips the pre-processing as well."""
+        return hash_inputs(model, prompt, preprocess, *images)
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.html")
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                text = f.read()
+            os.utime(path)
+        except OSError:
+            return None
+        return text
+
+    def put(self, key, text):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._path(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+        self.evict()
+
+    def evict(self):
+        with self.lock:
+            entries = []
+            for filename in os.listdir(self.cache_dir):
+                if not filename.endswith(".html"):
+                    continue
+                try:
+                    stat = os.stat(os.path.join(self.cache_dir, filename))
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, filename))
+            total = sum(size for _, size, _ in entries)
+            for _, size, filename in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(os.path.join(self.cache_dir, filename))
+                except OSError:
+                    pass
+                total -= size
+
+
+def read_images(file_paths):
+    images = []
+    for file_path in file_paths:
+        with open(file_path, "rb") as image_file:
+            images.append(image_file.read())
+    return images
+
+
+def detect_mime(data):
+    """Mime type from the file signature; pasted clipboard images are PNG, phone screenshots often JPEG."""
+    if data.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    if data.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "image/webp"
+    if data[4:12] in (b"ftypheic", b"ftypheix", b"ftypmif1"):
+        return "image/heic"
+    return "image/jpeg"
+
+
+def preprocess_image(data, options=DEFAULT_PREPROCESS):
+    """
+    Crops, downscales and re-encodes one screenshot. Returns (bytes, mime_type).
+    The original is kept when Pillow is missing or can't decode it (HEIC without a plugin,
+    truncated files), or when re-encoding would not make it smaller.
+    """
+    if Image is None:
+        return data, detect_mime(data)
+    try:
+        encoded, fmt, rotated = _reencode(data, options)
+    except (OSError, ValueError, Image.DecompressionBombError):
+        # UnidentifiedImageError is an OSError
+        return data, detect_mime(data)
+    # Cropping always counts as an improvement (it also removes noise the model would read), so does rotating
+    if len(encoded) >= len(data) and not options.get("crop") and not rotated:
+        return data, detect_mime(data)
+    return encoded, MIME_TYPES[fmt]
+
+
+def _reencode(data, options):
+    with Image.open(io.BytesIO(data)) as image:
+        image.load()
+        # Phone screenshots carry their rotation in EXIF; crop boxes refer to the upright image
+        rotated = image.getexif().get(EXIF_ORIENTATION, 1) != 1
+        image = ImageOps.exif_transpose(image)
+        if options.get("crop"):
+            left, top, right, bottom = options["crop"]
+            image = image.crop((round(left * image.width), round(top * image.height),
+                                round(right * image.width), round(bottom * image.height)))
+        max_side = options.get("max_side")
+        if max_side and max(image.size) > max_side:
+            scale = max_side / max(image.size)
+            image = image.resize((max(1, round(image.width * scale)), max(1, round(image.height * scale))), Image.LANCZOS)
+        fmt = options.get("format", "jpeg")
+        if fmt == "jpeg" and image.mode != "RGB":
+            image = image.convert("RGB")
+        out = io.BytesIO()
+        image.save(out, fmt.upper(), quality=options.get("quality", 88))
+    return out.getvalue(), fmt, rotated
+
+
+def build_payload(parts, prompt=PROMPT):
+    """parts is a list of (bytes, mime_type)."""
+    image_parts = []
+    for data, mime_type in parts:
+        encoded_string = base64.b64encode(data).decode('utf-8')
+        image_parts.append({"inline_data": {"mime_type": mime_type, "data": encoded_string}})
+    return {"contents": [{"parts": [{"text": prompt}] + image_parts}]}
+
+
+def backoff_delay(attempt, retry_after=None):
+    """Seconds to wait before retry number attempt (0-based). Honours a numeric Retry-After header."""
+    if retry_after:
+        try:
+            return min(MAX_BACKOFF, float(retry_after))
+        except ValueError:
+            pass
+    delay = min(MAX_BACKOFF, BASE_BACKOFF * (2 ** attempt))
+    return delay * random.uniform(0.8, 1.2)
+
+
+def extract_stats(file_paths, api_key, endpoint=DEFAULT_ENDPOINT, model=DEFAULT_MODEL,
+                  cancel_event=None, progress=None, session=None, cache=None, bypass_cache=False,
+                  preprocess=DEFAULT_PREPROCESS):
+    """
+    Sends the screenshots to the model and returns the generated HTML snippet.
+    Retries 429/5xx responses and connection errors with exponential backoff.
+    cancel_event (threading.Event) aborts between attempts and during backoff waits.
+    progress(message) is called before every attempt / wait.
+    With a ResponseCache, identical requests are answered from disk; bypass_cache forces a
+    fresh request (the new answer still replaces the cached one).
+    preprocess (see DEFAULT_PREPROCESS) controls cropping/downscaling before upload; None sends the files untouched.
+    """
+    cancel_event = cancel_event or threading.Event()
+    progress = progress or (lambda message: None)
+    session = session or requests
+
+    images = read_images(file_paths)
+    cache_key = ResponseCache.key(images, PROMPT, model, preprocess) if cache else None
+    if cache and not bypass_cache:
+        cached = cache.get(cache_key)
+        if cached is not None:
+            progress("Using cached AI response.")
+            return cached
+
+    if preprocess:
+        parts = [preprocess_image(image, preprocess) for image in images]
+        before, after = sum(len(image) for image in images), sum(len(data) for data, _ in parts)
+        progress(f"Prepared {len(parts)} image{'s' if len(parts) != 1 else ''} ({before / 1048576:.1f} MB -> {after / 1048576:.1f} MB).")
+    else:
+        parts = [(image, detect_mime(image)) for image in images]
+
+    stats_html = _request_stats(parts, api_key, endpoint, model, cancel_event, progress, session)
+    if cache:
+        cache.put(cache_key, stats_html)
+    return stats_html
+
+
+def _request_stats(parts, api_key, endpoint, model, cancel_event, progress, session):
+    payload = build_payload(parts)
+    api_url = f"{endpoint.rstrip('/')}/models/{model}:generateContent"
+    # Key goes in a header so it never ends up in logged URLs / exception messages
+    headers = {"Content-Type": "application/json", "x-goog-api-key": api_key}
+
+    for attempt in range(MAX_RETRIES + 1):
+        if cancel_event.is_set():
+            raise AICancelled("Cancelled")
+        progress(f"Requesting {model} (attempt {attempt + 1}/{MAX_RETRIES + 1})...")
+
+        retry_after = None
+        try:
+            response = session.post(api_url, headers=headers, json=payload, timeout=REQUEST_TIMEOUT)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            reason = f"{type(e).__name__}"
+        else:
+            if response.status_code not in RETRY_STATUS:
+                if response.status_code >= 400:
+                    raise AIExtractError(f"HTTP {response.status_code}: {response.text[:200]}")
+                try:
+                    return response.json()['candidates'][0]['content']['parts'][0]['text']
+                except (ValueError, KeyError, IndexError) as e:
+                    raise AIExtractError(f"Unexpected response format: {type(e).__name__}: {e}")
+            reason = f"HTTP {response.status_code}"
+            retry_after = response.headers.get("Retry-After")
+
+        if attempt == MAX_RETRIES:
+            raise AIExtractError(f"Giving up after {MAX_RETRIES + 1} attempts ({reason})")
+        delay = backoff_delay(attempt, retry_after)
+        progress(f"{reason}, retrying in {delay:.1f}s...")
+        if cancel_event.wait(delay):
+            raise AICancelled("Cancelled")
@@ -0,0 +1,36 @@
+import hashlib
+import os
+import re
+
+from output_stage import VARIANT_PATTERN
+
+# Content-hashed shared assets (assets/common.<hash>.css / .js). The name changes only when
+# the content does, so browsers can cache a bundle for as long as the site links it.
+
+
+def bundle_name(prefix, ext, content):
+    """'common.<sha256[:12]>.css'; same scheme as search_index.write_index()."""
+    return f"{prefix}.{hashlib.sha256(content.encode('utf-8')).hexdigest()[:12]}.{ext}"
+
+
+def write_bundle(out_dir, prefix, ext, content):
+    """Writes the bundle (named by bundle_name()) unless that build of it already exists. Returns (files, bytes) written."""
+    path = os.path.join(out_dir, bundle_name(prefix, ext, content))
+    if os.path.exists(path):
+        return 0, 0
+    data = content.encode('utf-8')
+    os.makedirs(out_dir, exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return 1, len(data)
+
+
+def prune_bundles(out_dir, prefix, ext, keep):
+    """Removes older builds of a bundle (and their .gz/.br variants), keeping the file named keep."""
+    pattern = re.compile(rf"({re.escape(prefix)}\.[0-9a-f]{{12}}\.{re.escape(ext)}){VARIANT_PATTERN}$")
+    for filename in os.listdir(out_dir):
+        match = pattern.match(filename)
+        if match and match.group(1) != keep:
+            os.remove(os.path.join(out_dir, filename))
@@ -0,0 +1,293 @@
+import argparse
+import gzip
+import json
+import os
+import shutil
+import struct
+import sys
+import tempfile
+import time
+import zlib
+
+from build_manifest import MANIFEST_NAME
+from image_dimensions import CACHE_NAME as SIZE_CACHE_NAME, PNG_SIGNATURE
+from output_stage import brotli
+from site_render import (CHARACTER_GROUPS, CLASSIFICATIONS, build_site, default_workers, render_character_page,
+                         render_gallery_page, render_wiki, write_page)
+from sprite_atlas import HASH_CACHE_NAME as ICON_HASH_CACHE_NAME
+from update_data import NameResolver
+
+# Benchmark suite on synthetic rosters: times every stage, compares against stored baselines
+# and checks the renderers and the written (minified) pages byte-for-byte against golden files.
+# Runs headless; the GUI stage uses Qt's offscreen platform and is skipped without PySide6.
+#
+#   python benchmark.py                      # 100, 1k and 10k entries, fail on regressions / golden diffs
+#   python benchmark.py --sizes 100000       # the big roster (writes 100k icons and pages to a temp dir)
+#   python benchmark.py --save-baseline      # store this machine's timings as the new baseline
+#   python benchmark.py --update-golden      # accept the current render output
+
+# --- CONFIGURATION ---
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+BENCH_DIR = os.path.join(BASE_DIR, "benchmarks")
+GOLDEN_DIR = os.path.join(BENCH_DIR, "golden")
+# Timings are machine specific, so the baseline is not committed (see .gitignore)
+BASELINE_PATH = os.path.join(BENCH_DIR, "baseline.json")
+DEFAULT_SIZES = [100, 1000, 10000]
+DEFAULT_REPEAT = 3
+# A stage regresses when it is this much slower than its baseline...
+DEFAULT_THRESHOLD = 0.4
+# ...and by more than this many seconds (keeps timer noise on tiny stages out)
+MIN_REGRESSION = 0.005
+GOLDEN_SIZE = 50
+STAGES = ["wiki", "character pages", "gallery page", "resolve names", "build cold", "build no-op", "populate lists"]
+
+
+def synthetic_characters(count):
+    """A characters.json-like roster spread over every group, with names that need escaping."""
+    characters = {}
+    for i in range(count):
+        characters[f"spr-icon-pc-synthetic{i}-01"] = {
+            "name": f"Synthetic <{i}> & Co" if i % 10 == 0 else f"Synthetic {i}",
+            "icon": f"SPR_Icon_PC_Synthetic{i}_01.png",
+            "group": CHARACTER_GROUPS[i % len(CHARACTER_GROUPS)],
+            "is_rare": i % 3 == 0,
+            "classification": CLASSIFICATIONS[i % len(CLASSIFICATIONS)],
+            "hidden": i % 25 == 0,
+        }
+    return characters
+
+
+def synthetic_cards(count):
+    return [
+        {"category": f"Category {i // 12}", "label": f"#{i}", "region": "SG" if i % 2 else "", "rel": f"images/item/IMG_{i}.png",
+         "full": f"images/item/IMG_{i}.png", "size": (512, 256), "srcsets": [("image/webp", [(f"images/item/IMG_{i}-320.webp", 320)])]}
+        for i in range(count)
+    ]
+
+
+def synthetic_lookups(characters):
+    """Every name once, plus a typo of every tenth name for the fuzzy path."""
+    names = [data['name'] for data in characters.values()]
+    return names + [name[:-1] + "x" for name in names[::10]]
+
+
+def tiny_png(width=8, height=8):
+    """A valid grey PNG without Pillow."""
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data) & 0xffffffff)
+    rows = b"".join(b"\x00" + b"\x80" * width for _ in range(height))
+    return (PNG_SIGNATURE + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 0, 0, 0, 0))
+            + chunk(b"IDAT", zlib.compress(rows)) + chunk(b"IEND", b""))
+
+
+def write_icons(site_root, characters):
+    icon_dir = os.path.join(site_root, "images", "icons")
+    os.makedirs(icon_dir, exist_ok=True)
+    png = tiny_png()
+    for data in characters.values():
+        with open(os.path.join(icon_dir, data['icon']), 'wb') as f:
+            f.write(png)
+
+
+def best_time(fn, repeat, setup=None):
+    """Fastest of repeat runs; setup runs untimed before each one."""
+    best = None
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def qt_window():
+    """MainWindow on the offscreen platform, or None without PySide6."""
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    try:
+        from PySide6.QtWidgets import QApplication
+        import sitegen
+    except ImportError:
+        return None
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    # An empty base folder, so the window never reads or writes the real config.json / characters.json
+    base_dir = tempfile.TemporaryDirectory(prefix="gem-bench-gui-")
+    window = sitegen.MainWindow(base_dir=base_dir.name)
+    # Keep the application and the folder alive as long as the window
+    window.app = app
+    window.bench_dir = base_dir
+    return window
+
+
+def populate_lists_stage(window, characters, site_root):
+    def run():
+        window.characters = characters
+        window.site_root = site_root
+        window.icon_cache = {}
+        window.pending_icons = {}
+        window.populate_lists()
+    return run
+
+
+def run_stages(size, repeat, stages, window=None, log=print):
+    """{stage: seconds} for one roster size."""
+    characters = synthetic_characters(size)
+    cards = synthetic_cards(size)
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="gem-bench-") as tmp:
+        site_root = os.path.join(tmp, "site")
+        state_dir = os.path.join(tmp, "state")
+        os.makedirs(state_dir)
+        write_icons(site_root, characters)
+
+        def cold():
+            for name in (MANIFEST_NAME, SIZE_CACHE_NAME, ICON_HASH_CACHE_NAME):
+                if os.path.exists(os.path.join(state_dir, name)):
+                    os.remove(os.path.join(state_dir, name))
+            shutil.rmtree(os.path.join(site_root, "assets"), ignore_errors=True)
+
+        def build():
+            build_site(characters, site_root, state_dir, log=lambda message: None, workers=default_workers(), optimize_images=False)
+
+        timed = {
+            "wiki": (lambda: render_wiki(characters), None),
+            "character pages": (lambda: [render_character_page(data, f"../images/icons/{data['icon']}") for data in characters.values()], None),
+            "gallery page": (lambda: render_gallery_page("Items", "items", 1, 1, size, cards), None),
+            "resolve names": (lambda: NameResolver(characters).resolve_all(synthetic_lookups(characters)), None),
+            "build cold": (build, cold),
+            "build no-op": (build, None),
+        }
+        if window is not None:
+            timed["populate lists"] = (populate_lists_stage(window, characters, site_root), None)
+        for stage in stages:
+            if stage not in timed:
+                log(f"{stage:<16}{size:>9}   skipped (PySide6 not installed)")
+                continue
+            fn, setup = timed[stage]
+            results[stage] = best_time(fn, repeat, setup)
+            log(f"{stage:<16}{size:>9}{results[stage] * 1000:>11.2f}{results[stage] * 1e6 / size:>10.2f}")
+    return results
+
+
+def compare_baseline(results, baseline, threshold, log=print):
+    """Returns the number of stages slower than baseline by more than threshold."""
+    regressions = 0
+    for size, stages in results.items():
+        for stage, elapsed in stages.items():
+            before = baseline.get(size, {}).get(stage)
+            if before is None:
+                continue
+            if elapsed > before * (1 + threshold) and elapsed - before > MIN_REGRESSION:
+                log(f"REGRESSION {stage} @ {size}: {before * 1000:.2f} ms -> {elapsed * 1000:.2f} ms (+{(elapsed / before - 1) * 100:.0f}%)")
+                regressions += 1
+    return regressions
+
+
+def golden_pages():
+    """{file name: html} rendered from a fixed synthetic roster."""
+    characters = synthetic_characters(GOLDEN_SIZE)
+    first = characters["spr-icon-pc-synthetic0-01"]
+    return {
+        "wiki.html": render_wiki(characters, icon_sizes={first['icon']: (8, 8)}, search_index="assets/search.golden.json",
+                                 galleries=[("gallery/items.html", "Items & Events")]),
+        "character.html": render_character_page(first, "../images/icons/SPR_Icon_PC_Synthetic0_01.png",
+                                                [("image/webp", [("images/portrait/golden-320.webp", 320)])], (8, 8)),
+        "gallery.html": render_gallery_page("Items & Events", "items", 2, 3, GOLDEN_SIZE, synthetic_cards(GOLDEN_SIZE),
+                                            [("gallery/items.html", "Items & Events")]),
+    }
+
+
+def golden_outputs(log=print):
+    """
+    ({file name: bytes}, variant errors): each rendered page, plus the bytes the build writes for
+    it (<name>.min.html, through write_page()). The .gz/.br variants must decompress to exactly
+    those bytes; compressor output itself differs between zlib/brotli versions, so it isn't stored.
+    """
+    outputs = {}
+    errors = 0
+    with tempfile.TemporaryDirectory(prefix="gem-golden-") as tmp:
+        for name, html in golden_pages().items():
+            outputs[name] = html.encode('utf-8')
+            write_page(tmp, name, html)
+            path = os.path.join(tmp, name)
+            with open(path, 'rb') as f:
+                written = f.read()
+            outputs[name.replace(".html", ".min.html")] = written
+            variants = {".gz": gzip.decompress}
+            if brotli is not None:
+                variants[".br"] = brotli.decompress
+            for suffix, decompress in variants.items():
+                with open(path + suffix, 'rb') as f:
+                    if decompress(f.read()) != written:
+                        log(f"GOLDEN {name}{suffix}: does not decompress to the written page")
+                        errors += 1
+    return outputs, errors
+
+
+def check_golden(update=False, log=print):
+    """Returns the number of golden files that differ plus broken .gz/.br variants (only the latter after an update)."""
+    outputs, mismatches = golden_outputs(log)
+    os.makedirs(GOLDEN_DIR, exist_ok=True)
+    for name, data in outputs.items():
+        path = os.path.join(GOLDEN_DIR, name)
+        if update:
+            with open(path, 'wb') as f:
+                f.write(data)
+            continue
+        if not os.path.exists(path):
+            log(f"GOLDEN {name}: missing, run with --update-golden")
+            mismatches += 1
+            continue
+        with open(path, 'rb') as f:
+            expected = f.read()
+        if expected != data:
+            got_lines, expected_lines = data.decode('utf-8').splitlines(), expected.decode('utf-8').splitlines()
+            line = next((i for i, (a, b) in enumerate(zip(got_lines, expected_lines)) if a != b), min(len(got_lines), len(expected_lines)))
+            log(f"GOLDEN {name}: differs from line {line + 1}")
+            mismatches += 1
+    log("Golden files updated." if update and not mismatches else f"Golden files: {len(outputs) - mismatches}/{len(outputs)} match.")
+    return mismatches
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the generator stages on synthetic rosters.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Roster sizes (e.g. 100 1000 10000 100000)")
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=STAGES, help="Stages to time")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="Runs per measurement (best one counts)")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Allowed slowdown against the baseline (0.4 = 40%%)")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="Baseline timings file")
+    parser.add_argument("--save-baseline", action="store_true", help="Store these timings as the baseline instead of comparing")
+    parser.add_argument("--update-golden", action="store_true", help="Rewrite the golden files from the current renderers and writer")
+    parser.add_argument("--skip-golden", action="store_true", help="Only time the stages")
+    args = parser.parse_args(argv)
+
+    failures = 0
+    if not args.skip_golden:
+        failures += check_golden(update=args.update_golden)
+
+    window = qt_window() if "populate lists" in args.stages else None
+    print(f"{'stage':<16}{'entries':>9}{'total ms':>11}{'us/entry':>10}")
+    results = {str(size): run_stages(size, args.repeat, args.stages, window) for size in args.sizes}
+
+    if args.save_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, 'r') as f:
+                baseline = json.load(f)
+        for size, stages in results.items():
+            baseline.setdefault(size, {}).update(stages)
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, 'w') as f:
+            json.dump(baseline, f, indent=4, sort_keys=True)
+        print(f"Baseline saved to {args.baseline}.")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline, 'r') as f:
+            failures += compare_baseline(results, json.load(f), args.threshold)
+    else:
+        print("No baseline yet, run with --save-baseline to store one.")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+import hashlib
+import json
+import os
+
+# --- CONFIGURATION ---
+MANIFEST_NAME = ".build_manifest.json"
+
+
+def hash_inputs(*parts):
+    """Returns a stable hex digest over everything that goes into a page."""
+    digest = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, bytes):
+            data = part
+        elif isinstance(part, str):
+            data = part.encode('utf-8')
+        else:
+            # Dicts/lists (character records etc.) are hashed in a key-order independent way
+            data = json.dumps(part, sort_keys=True).encode('utf-8')
+        # Length prefix so ("ab", "c") and ("a", "bc") never collide
+        digest.update(len(data).to_bytes(8, 'big'))
+        digest.update(data)
+    return digest.hexdigest()
+
+
+class BuildManifest:
+    """
+    Remembers the input hash of every generated page so a build only renders
+    and writes the pages whose inputs changed since the last run.
+    Shared by the GUI (sitegen.py) and the headless script.
+    """
+
+    def __init__(self, state_dir, site_root=None, force=False):
+        self.path = os.path.join(state_dir, MANIFEST_NAME)
+        self.site_root = site_root or state_dir
+        self.force = force
+        self.entries = {}
+        self.dirty = False
+        self.load()
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f).get("pages", {})
+        except (OSError, ValueError):
+            # A broken manifest only costs us one full rebuild
+            self.entries = {}
+
+    def _entry(self, rel_path):
+        entry = self.entries.get(rel_path)
+        # Older manifests stored just the digest
+        return {"hash": entry} if isinstance(entry, str) else (entry or {})
+
+    def _missing(self, rel_path):
+        return not os.path.exists(os.path.join(self.site_root, rel_path))
+
+    def needs_build(self, rel_path, digest):
+        """rel_path is relative to the site root, e.g. 'characters/adelina-01.html'."""
+        if self.force or self._entry(rel_path).get("hash") != digest:
+            return True
+        return self._missing(rel_path)
+
+    def inputs_changed(self, rel_path, inputs):
+        """True when the page has to be re-rendered (as opposed to only re-linked)."""
+        if self.force or self._entry(rel_path).get("inputs") != inputs:
+            return True
+        return self._missing(rel_path)
+
+    def classes(self, rel_path):
+        """CSS classes the page used when it was last rendered."""
+        return self._entry(rel_path).get("classes", [])
+
+    def stylesheet(self, rel_path):
+        """Site stylesheet the page links, None for pages from builds that didn't record it."""
+        return self._entry(rel_path).get("stylesheet")
+
+    def stylesheets(self):
+        """Every site stylesheet some recorded page still links."""
+        return {entry["stylesheet"] for entry in self.entries.values() if isinstance(entry, dict) and entry.get("stylesheet")}
+
+    def record(self, rel_path, digest, inputs=None, classes=None, stylesheet=None):
+        entry = {"hash": digest}
+        if inputs is not None:
+            entry["inputs"] = inputs
+        if classes is not None:
+            entry["classes"] = list(classes)
+        if stylesheet is not None:
+            entry["stylesheet"] = stylesheet
+        if self.entries.get(rel_path) != entry:
+            self.entries[rel_path] = entry
+            self.dirty = True
+
+    def save(self):
+        if not self.dirty:
+            return
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump({"pages": self.entries}, f, indent=4, sort_keys=True)
+        self.dirty = False
@@ -0,0 +1,96 @@
+import cProfile
+import json
+import os
+import platform
+import time
+from contextlib import contextmanager
+
+# Build metrics for --profile (headless) and the "Profile Build" toggle in the GUI.
+# Time per phase is always cheap to collect; cProfile only runs when a pstats path is given.
+
+# --- CONFIGURATION ---
+REPORT_NAME = "build_profile.json"
+REPORT_VERSION = 1
+# Slowest pages listed in the log summary (the JSON report has all of them)
+SUMMARY_PAGES = 5
+
+
+class BuildProfile:
+    """
+    Wall time, files and bytes written per phase, and render/write time plus size per page.
+    Phases keep the order they first ran in; report() is plain JSON so runs can be diffed.
+    """
+
+    def __init__(self, pstats_path=None):
+        self.phases = {}
+        self.pages = {}
+        self.started = time.time()
+        self.start_counter = time.perf_counter()
+        self.pstats_path = pstats_path
+        self.profiler = cProfile.Profile() if pstats_path else None
+        if self.profiler:
+            self.profiler.enable()
+
+    @property
+    def profiling(self):
+        """True while cProfile runs; it only sees the thread that created this profile."""
+        return self.profiler is not None
+
+    def _phase(self, name):
+        return self.phases.setdefault(name, {"seconds": 0.0, "files": 0, "bytes": 0})
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._phase(name)["seconds"] += time.perf_counter() - start
+
+    def add_files(self, phase, count, size):
+        entry = self._phase(phase)
+        entry["files"] += count
+        entry["bytes"] += size
+
+    def page(self, rel_path, **metrics):
+        """Adds to a page's metrics, e.g. page(path, render_seconds=0.01) or page(path, bytes=1234)."""
+        entry = self.pages.setdefault(rel_path, {})
+        for key, value in metrics.items():
+            entry[key] = entry.get(key, 0) + value
+
+    def stop(self):
+        """Ends cProfile (if running) and writes its pstats file."""
+        if self.profiler:
+            self.profiler.disable()
+            self.profiler.dump_stats(self.pstats_path)
+            self.profiler = None
+
+    def report(self, **context):
+        total = time.perf_counter() - self.start_counter
+        return {
+            "version": REPORT_VERSION,
+            "started": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started)),
+            "python": platform.python_version(),
+            "context": context,
+            "total_seconds": round(total, 6),
+            "phases": {name: dict(entry, seconds=round(entry["seconds"], 6)) for name, entry in self.phases.items()},
+            "pages": {rel_path: {key: round(value, 6) if isinstance(value, float) else value for key, value in sorted(entry.items())}
+                      for rel_path, entry in sorted(self.pages.items())},
+        }
+
+    def write(self, path, **context):
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.report(**context), f, indent=2)
+        os.replace(tmp_path, path)
+
+    def summary(self):
+        """Log lines: one per phase, then the slowest pages."""
+        lines = [f"  {name:<14}{entry['seconds'] * 1000:>10.1f} ms{entry['files']:>7} files{entry['bytes'] / 1024:>10.1f} KB"
+                 for name, entry in self.phases.items()]
+        slowest = sorted(self.pages.items(), key=lambda item: item[1].get("render_seconds", 0) + item[1].get("write_seconds", 0), reverse=True)
+        for rel_path, entry in slowest[:SUMMARY_PAGES]:
+            seconds = entry.get("render_seconds", 0) + entry.get("write_seconds", 0)
+            compressed = f" ({entry['compressed_bytes'] / 1024:.1f} KB compressed)" if entry.get('compressed_bytes') else ""
+            lines.append(f"  slow page {rel_path}: {seconds * 1000:.1f} ms, {entry.get('bytes', 0) / 1024:.1f} KB{compressed}")
+        return lines
@@ -0,0 +1,242 @@
+import json
+import os
+import sqlite3
+import sys
+
+# Data access for the character roster, shared by sitegen.py, update_data.py and the headless script.
+# characters.json stays the default; a .db/.sqlite path selects the SQLite backend.
+
+# --- CONFIGURATION ---
+SQLITE_EXTENSIONS = (".db", ".sqlite", ".sqlite3")
+# Unsorted characters go after every manually sorted one (same default the GUI writes)
+DEFAULT_SORT_ORDER = 999
+
+# Names players use -> icon names, for tricky names or missing icons (update_data.py, search_index.py)
+NAME_MAPPING = {
+    "Baek Ho": "Backho",
+    "Edward": "Eduardo",
+    "Grenmah": "Grandma",
+    "P. Queen Grenmah": "Grandma2", # Likely mapped to Grandma2
+    "Rescue Officer Romina": "Romina2",
+    "Battle Cook Panfilo": "Panfilo2",
+    "Battle Smith Idge": "Idge2",
+    "Battlefield Claude": "Claude2",
+    "Scavenger Yeganeh": "Yeganeh2",
+    "Sniper Bernelli": "Berneli2", # Note spelling Berneli vs Bernelli
+    "Sage Emilia": "Emilia3",
+    "Pirate Adelina": "Adelina2",
+    "Mercenary Calyce": "Calyce2",
+    "Cannon Shooter Claire": "Clair2", # Claire vs Clair
+    "Cutie Claire": "Clair3",
+    "Designer Karjalainen": "Karjalainen2",
+    "Meister Lorch": "Lorch2",
+    "Conductor Rio": "Rio2",
+    "Valeria Vendetta": "Valleria2", # Valleria vs Valeria
+    "Sage Sharon": "Sharon2",
+    "Banshee Natalie": "Natalie2",
+    "Cold Hearted Ganazu": "Ganazu2",
+    "Cold Hearted Ganuzu": "Ganazu2", # User typo handling
+    "Reckless Emilia": "Emilia2", 
+    "Selva Norte": "Selva",
+    "Catherine Torsche": "Catherine2", # Fixed from Torshe
+    "Rescue Knight": "Rescue", 
+}
+
+
+def load_characters(json_path):
+    with open(json_path, 'r') as f:
+        return json.load(f)
+
+
+def serialize_characters(characters):
+    # Same layout the tools have always written (insertion order, indent=4)
+    return json.dumps(characters, indent=4)
+
+
+def save_characters(json_path, characters):
+    """
+    Writes characters.json atomically (temp file + rename, so a crash never leaves half a file).
+    Returns False without touching the file when the content would not change.
+    """
+    text = serialize_characters(characters)
+    try:
+        with open(json_path, 'r') as f:
+            if f.read() == text:
+                return False
+    except OSError:
+        pass
+
+    tmp_path = json_path + ".tmp"
+    with open(tmp_path, 'w') as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, json_path)
+    return True
+
+
+def group_sort_key(item):
+    """Wiki/GUI order inside a group for a (char_id, record) pair: manual sort order, then name."""
+    return item[1].get('sort_order', DEFAULT_SORT_ORDER), item[1]['name']
+
+
+class JsonCharacterStore:
+    """The whole roster in one JSON file; every query works on the loaded dict."""
+
+    # update() rewrites the whole file, so callers batch frequent edits into one save_all()
+    RECORD_UPDATES = False
+
+    def __init__(self, path):
+        self.path = path
+        self.characters = None
+
+    def load_all(self):
+        self.characters = load_characters(self.path) if os.path.exists(self.path) else {}
+        return self.characters
+
+    def _loaded(self):
+        return self.characters if self.characters is not None else self.load_all()
+
+    def get(self, char_id):
+        return self._loaded().get(char_id)
+
+    def by_group(self, group, include_hidden=False):
+        members = [(char_id, data) for char_id, data in self._loaded().items()
+                   if data.get('group') == group and (include_hidden or not data.get('hidden', False))]
+        return sorted(members, key=group_sort_key)
+
+    def update(self, char_id, **fields):
+        """Partial update of one record (the file is rewritten as a whole). Returns False, writing nothing, for an unknown char_id."""
+        characters = self._loaded()
+        if char_id not in characters:
+            return False
+        characters[char_id].update(fields)
+        save_characters(self.path, characters)
+        return True
+
+    def save_all(self, characters):
+        """Returns True when anything was written."""
+        self.characters = characters
+        return save_characters(self.path, characters)
+
+    def close(self):
+        pass
+
+
+class SqliteCharacterStore:
+    """
+    The roster in SQLite. Each row keeps the full record as JSON (so exports round-trip exactly)
+    plus indexed copies of the fields we filter on. Group queries and single-record updates
+    don't load or rewrite the whole roster, and save_all() only writes rows that changed.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS characters (
+            id TEXT PRIMARY KEY,
+            position INTEGER NOT NULL,
+            name TEXT NOT NULL,
+            grp TEXT,
+            classification TEXT,
+            hidden INTEGER NOT NULL DEFAULT 0,
+            sort_order INTEGER,
+            data TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_characters_group ON characters (grp, hidden, sort_order, name);
+        CREATE INDEX IF NOT EXISTS idx_characters_classification ON characters (classification);
+        CREATE INDEX IF NOT EXISTS idx_characters_hidden ON characters (hidden);
+    """
+
+    # update() writes a single row, cheap enough for every edit
+    RECORD_UPDATES = True
+
+    def __init__(self, path):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(self.SCHEMA)
+        # {char_id: (position, data)} as last read/written, so save_all() can skip unchanged rows
+        self.snapshot = None
+
+    @staticmethod
+    def _row(char_id, position, data):
+        return (char_id, position, data['name'], data.get('group'), data.get('classification'),
+                int(bool(data.get('hidden', False))), data.get('sort_order'), json.dumps(data))
+
+    def _write(self, rows):
+        self.connection.executemany(
+            "INSERT OR REPLACE INTO characters (id, position, name, grp, classification, hidden, sort_order, data) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows
+        )
+
+    def load_all(self):
+        rows = self.connection.execute("SELECT id, position, data FROM characters ORDER BY position").fetchall()
+        self.snapshot = {char_id: (position, data) for char_id, position, data in rows}
+        return {char_id: json.loads(data) for char_id, _, data in rows}
+
+    def get(self, char_id):
+        row = self.connection.execute("SELECT data FROM characters WHERE id = ?", (char_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def by_group(self, group, include_hidden=False):
+        query = (f"SELECT id, data FROM characters WHERE grp = ? {'' if include_hidden else 'AND hidden = 0'} "
+                 f"ORDER BY COALESCE(sort_order, {DEFAULT_SORT_ORDER}), name")
+        return [(char_id, json.loads(data)) for char_id, data in self.connection.execute(query, (group,))]
+
+    def update(self, char_id, **fields):
+        """Partial update of one record (one row). Returns False, writing nothing, for an unknown char_id."""
+        row = self.connection.execute("SELECT position, data FROM characters WHERE id = ?", (char_id,)).fetchone()
+        if not row:
+            return False
+        data = json.loads(row[1])
+        data.update(fields)
+        with self.connection:
+            self._write([self._row(char_id, row[0], data)])
+        if self.snapshot is not None:
+            self.snapshot[char_id] = (row[0], json.dumps(data))
+        return True
+
+    def save_all(self, characters):
+        """Writes the rows that differ from the database and deletes removed ones. Returns True when anything was written."""
+        if self.snapshot is None:
+            self.snapshot = {char_id: (position, data) for char_id, position, data
+                             in self.connection.execute("SELECT id, position, data FROM characters")}
+        rows = []
+        current = {}
+        for position, (char_id, data) in enumerate(characters.items()):
+            current[char_id] = (position, json.dumps(data))
+            if self.snapshot.get(char_id) != current[char_id]:
+                rows.append(self._row(char_id, position, data))
+        removed = [(char_id,) for char_id in self.snapshot if char_id not in current]
+        if not rows and not removed:
+            return False
+        with self.connection:
+            self._write(rows)
+            self.connection.executemany("DELETE FROM characters WHERE id = ?", removed)
+        self.snapshot = current
+        return True
+
+    def close(self):
+        self.connection.close()
+
+
+def open_store(path):
+    """JsonCharacterStore or SqliteCharacterStore, depending on the file extension."""
+    if path.lower().endswith(SQLITE_EXTENSIONS):
+        return SqliteCharacterStore(path)
+    return JsonCharacterStore(path)
+
+
+def convert(source, target):
+    """Copies the roster between backends, e.g. characters.json -> characters.db (import) or back (export)."""
+    source_store, target_store = open_store(source), open_store(target)
+    characters = source_store.load_all()
+    target_store.save_all(characters)
+    source_store.close()
+    target_store.close()
+    return len(characters)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Usage: python character_data.py <source> <target>   (e.g. characters.json characters.db)")
+        sys.exit(2)
+    print(f"Copied {convert(sys.argv[1], sys.argv[2])} characters from {sys.argv[1]} to {sys.argv[2]}.")
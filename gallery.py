@@ -0,0 +1,53 @@
+import os
+import re
+
+# Groups the banner/item images into galleries by their file naming convention.
+# Rendering lives in site_render.py with the other templates.
+
+# --- CONFIGURATION ---
+# (slug, folder relative to the site root, title)
+GALLERIES = [
+    ("items", "images/item", "Items & Events"),
+    ("sales", "images/sale", "Time Sales"),
+]
+PAGE_SIZE = 48
+
+# IMG_Shop_Time_Sale_Main_1001_SG / SPR_Icon_Shop_Event_Stepup_3_2_SG -> kind, category, numbers, region
+NAME_PATTERN = re.compile(r"^(?:(IMG|SPR)_)?(?:Icon_)?(.*?)((?:_\d+)*)(?:_([A-Z]{2}))?$")
+
+
+def parse_asset_name(filename):
+    """{'category': 'Shop Time Sale Main', 'numbers': (1001,), 'region': 'SG', 'kind': 'IMG'}"""
+    stem = os.path.splitext(filename)[0]
+    kind, name, numbers, region = NAME_PATTERN.match(stem).groups()
+    return {
+        "category": name.replace('_', ' ') or stem,
+        "numbers": tuple(int(n) for n in numbers.split('_') if n),
+        "region": region or "",
+        "kind": kind or "",
+    }
+
+
+def gallery_entries(site_root, folder):
+    """Every PNG of the folder, sorted by category and then numerically (so _9 comes before _10)."""
+    folder_path = os.path.join(site_root, folder)
+    if not os.path.isdir(folder_path):
+        return []
+    entries = []
+    for filename in os.listdir(folder_path):
+        if not filename.lower().endswith('.png'):
+            continue
+        entry = parse_asset_name(filename)
+        entry["rel"] = f"{folder}/{filename}"
+        entries.append(entry)
+    entries.sort(key=lambda e: (e["category"], e["numbers"], e["region"], e["rel"]))
+    return entries
+
+
+def page_path(slug, page_no):
+    """Site relative path of a gallery page, page_no starts at 1."""
+    return f"gallery/{slug}.html" if page_no == 1 else f"gallery/{slug}-{page_no}.html"
+
+
+def paginate(entries, page_size=PAGE_SIZE):
+    return [entries[i:i + page_size] for i in range(0, len(entries), page_size)] or [[]]
@@ -0,0 +1,61 @@
+import json
+import os
+
+# --- CONFIGURATION ---
+CACHE_NAME = ".image_sizes.json"
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+def png_size(path):
+    """(width, height) from the PNG IHDR chunk without decoding the image, None if it is not a PNG."""
+    with open(path, 'rb') as f:
+        header = f.read(24)
+    # 8 byte signature, 4 byte chunk length, b'IHDR', then big-endian width and height
+    if len(header) < 24 or header[:8] != PNG_SIGNATURE or header[12:16] != b"IHDR":
+        return None
+    return int.from_bytes(header[16:20], 'big'), int.from_bytes(header[20:24], 'big')
+
+
+def size_attrs(size):
+    """' width="w" height="h"' for an <img> tag, '' when the size is unknown."""
+    return f' width="{size[0]}" height="{size[1]}"' if size else ""
+
+
+class ImageSizeCache:
+    """
+    Intrinsic sizes of the site images, keyed by path relative to the site root.
+    Entries are re-read only when a file's size/mtime changes (.image_sizes.json).
+    """
+
+    def __init__(self, site_root, state_dir):
+        self.site_root = site_root
+        self.path = os.path.join(state_dir, CACHE_NAME)
+        self.entries = {}
+        self.dirty = False
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self.entries = json.load(f).get("images", {})
+            except (OSError, ValueError):
+                self.entries = {}
+
+    def size(self, rel_path):
+        """(width, height) of site_root/rel_path, None when missing or not a PNG."""
+        path = os.path.join(self.site_root, rel_path)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        entry = self.entries.get(rel_path)
+        if not entry or entry["mtime"] != stat.st_mtime or entry["size"] != stat.st_size:
+            entry = {"mtime": stat.st_mtime, "size": stat.st_size, "dimensions": png_size(path)}
+            self.entries[rel_path] = entry
+            self.dirty = True
+        return tuple(entry["dimensions"]) if entry["dimensions"] else None
+
+    def save(self):
+        if not self.dirty:
+            return
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump({"images": self.entries}, f, indent=4, sort_keys=True)
+        self.dirty = False
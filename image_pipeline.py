@@ -0,0 +1,208 @@
+import hashlib
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from PIL import Image
+except ImportError:  # Optional: without Pillow the pages simply link the original PNGs
+    Image = None
+
+# --- CONFIGURATION ---
+# Folders (relative to the site root) that get responsive variants
+IMAGE_FOLDERS = ["images/portrait", "images/item", "images/sale"]
+OPTIMIZED_DIR = "images/optimized"
+CACHE_NAME = ".image_cache.json"
+# Target widths; widths above the source width are skipped, the source width is always kept
+DEFAULT_WIDTHS = (160, 256, 384, 512, 768, 1024)
+QUALITY = {"webp": 80, "avif": 55}
+MIME_TYPES = {"webp": "image/webp", "avif": "image/avif"}
+
+
+def available():
+    return Image is not None
+
+
+def avif_supported():
+    if Image is None:
+        return False
+    try:
+        import pillow_avif  # noqa: F401  Registers the AVIF codec on Pillow < 11.2
+    except ImportError:
+        pass
+    Image.init()
+    return "AVIF" in Image.SAVE
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _encode(job):
+    """Worker: writes every missing width/format variant of one source image. Returns (files, bytes) written."""
+    src_path, variants, quality = job
+    files = size = 0
+    with Image.open(src_path) as image:
+        image.load()
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA")
+        for fmt, width, out_path in variants:
+            if os.path.exists(out_path):
+                continue
+            height = max(1, round(image.height * width / image.width))
+            resized = image if width == image.width else image.resize((width, height), Image.LANCZOS)
+            tmp_path = out_path + ".tmp"
+            resized.save(tmp_path, fmt.upper(), quality=quality[fmt])
+            os.replace(tmp_path, out_path)
+            files += 1
+            size += os.path.getsize(out_path)
+    return files, size
+
+
+class ImageOptimizer:
+    """
+    Produces WebP (and optionally AVIF) variants of the site images at several widths.
+    Variants are named after the source content hash, so a source is only re-encoded when
+    its bytes change. A stat cache (.image_cache.json) avoids re-hashing unchanged files.
+    """
+
+    def __init__(self, site_root, state_dir, widths=DEFAULT_WIDTHS, avif=False, log=print):
+        self.site_root = site_root
+        self.cache_path = os.path.join(state_dir, CACHE_NAME)
+        self.widths = widths
+        self.formats = ["avif", "webp"] if avif and avif_supported() else ["webp"]
+        self.log = log
+        self.sources = {}
+        self.dirty = False
+        if avif and "avif" not in self.formats:
+            log("Warning: AVIF requested but this Pillow build has no AVIF codec, writing WebP only.")
+        if os.path.exists(self.cache_path):
+            try:
+                with open(self.cache_path, 'r', encoding='utf-8') as f:
+                    self.sources = json.load(f).get("sources", {})
+            except (OSError, ValueError):
+                self.sources = {}
+
+    def _entry(self, rel_src):
+        """Returns the cache entry for rel_src, re-hashing only when size/mtime changed."""
+        path = os.path.join(self.site_root, rel_src)
+        stat = os.stat(path)
+        entry = self.sources.get(rel_src)
+        if entry and entry["mtime"] == stat.st_mtime and entry["size"] == stat.st_size:
+            return entry
+        digest = file_hash(path)
+        if entry and entry["hash"] == digest:
+            entry.update(mtime=stat.st_mtime, size=stat.st_size)
+        else:
+            with Image.open(path) as image:
+                width, height = image.size
+            entry = {"mtime": stat.st_mtime, "size": stat.st_size, "hash": digest, "width": width, "height": height}
+        self.sources[rel_src] = entry
+        self.dirty = True
+        return entry
+
+    def _variant_paths(self, rel_src, entry):
+        folder, filename = os.path.split(rel_src)
+        stem = os.path.splitext(filename)[0]
+        out_dir = f"{OPTIMIZED_DIR}/{os.path.basename(folder)}"
+        widths = sorted({w for w in self.widths if w < entry["width"]} | {entry["width"]})
+        return [
+            (fmt, width, f"{out_dir}/{stem}.{entry['hash'][:10]}.{width}w.{fmt}")
+            for fmt in self.formats for width in widths
+        ]
+
+    def prepare(self, rel_sources, workers=1):
+        """Encodes the missing variants for rel_sources. Returns (files, bytes) written."""
+        if Image is None:
+            return 0, 0
+        jobs = []
+        for rel_src in rel_sources:
+            try:
+                entry = self._entry(rel_src)
+            except (OSError, Image.DecompressionBombError) as e:
+                # Unreadable source: no variants, its pages link the original
+                self.log(f"Error: could not read {rel_src}: {type(e).__name__}: {e}")
+                if self.sources.pop(rel_src, None) is not None:
+                    self.dirty = True
+                continue
+            variants = self._variant_paths(rel_src, entry)
+            missing = [(fmt, width, os.path.join(self.site_root, rel)) for fmt, width, rel in variants
+                       if not os.path.exists(os.path.join(self.site_root, rel))]
+            if missing:
+                os.makedirs(os.path.dirname(missing[0][2]), exist_ok=True)
+                jobs.append((os.path.join(self.site_root, rel_src), missing, QUALITY))
+        files = size = 0
+        if jobs:
+            self.log(f"Encoding responsive variants for {len(jobs)} image{'s' if len(jobs) != 1 else ''}...")
+            if workers <= 1:
+                # Inline, so a profiler on this thread sees the encoding
+                results = [self._safe_encode(job) for job in jobs]
+            else:
+                # Pillow releases the GIL while encoding, threads are enough
+                with ThreadPoolExecutor(max_workers=workers) as pool:
+                    results = list(pool.map(self._safe_encode, jobs))
+            for job, (error, (job_files, job_size)) in zip(jobs, results):
+                files += job_files
+                size += job_size
+                if error:
+                    self.log(f"Error: could not encode {job[0]}: {error}")
+        return files, size
+
+    @staticmethod
+    def _safe_encode(job):
+        try:
+            return None, _encode(job)
+        except Exception as e:
+            # Variants written before the failure stay on disk but aren't counted
+            return f"{type(e).__name__}: {e}", (0, 0)
+
+    def prepare_folders(self, folders=IMAGE_FOLDERS, workers=1):
+        rel_sources = []
+        for folder in folders:
+            folder_path = os.path.join(self.site_root, folder)
+            if not os.path.isdir(folder_path):
+                continue
+            rel_sources.extend(f"{folder}/{f}" for f in sorted(os.listdir(folder_path)) if f.lower().endswith('.png'))
+        return self.prepare(rel_sources, workers)
+
+    def srcsets(self, rel_src):
+        """
+        [(mime_type, [(rel_path, width), ...]), ...] for the variants that exist on disk,
+        best format first. Paths are relative to the site root. Empty without Pillow.
+        """
+        if Image is None or rel_src not in self.sources:
+            return []
+        result = []
+        variants = self._variant_paths(rel_src, self.sources[rel_src])
+        for fmt in self.formats:
+            entries = [(rel, width) for f, width, rel in variants
+                       if f == fmt and os.path.exists(os.path.join(self.site_root, rel))]
+            if entries:
+                result.append((MIME_TYPES[fmt], entries))
+        return result
+
+    def prune(self):
+        """Deletes variant files that no longer belong to a current source hash."""
+        out_root = os.path.join(self.site_root, OPTIMIZED_DIR)
+        if not os.path.isdir(out_root):
+            return
+        keep = set()
+        for rel_src, entry in self.sources.items():
+            if os.path.exists(os.path.join(self.site_root, rel_src)):
+                keep.update(os.path.normpath(os.path.join(self.site_root, rel)) for _, _, rel in self._variant_paths(rel_src, entry))
+        for folder, _, files in os.walk(out_root):
+            for filename in files:
+                path = os.path.normpath(os.path.join(folder, filename))
+                if path not in keep:
+                    os.remove(path)
+
+    def save(self):
+        if not self.dirty:
+            return
+        with open(self.cache_path, 'w', encoding='utf-8') as f:
+            json.dump({"sources": self.sources}, f, indent=4, sort_keys=True)
+        self.dirty = False
@@ -0,0 +1,60 @@
+import threading
+import time
+from collections import deque
+
+# Buffered log shared by the GUI (sitegen.py) and the headless script.
+# Writers call the sink like print(); a view drains the buffer at its own pace.
+
+# --- CONFIGURATION ---
+# Seconds between two flushes of the buffered messages into a view
+FLUSH_INTERVAL = 0.1
+# Messages kept for a view that has not drained them yet (and lines kept in the GUI log)
+MAX_SCROLLBACK = 5000
+
+
+class LogSink:
+    """
+    Thread-safe message sink. Every message is appended to a bounded buffer for a view
+    (see MainWindow.flush_log) and, optionally, written straight to a log file and/or a stream.
+    """
+
+    def __init__(self, path=None, stream=None, buffered=True):
+        self.lock = threading.Lock()
+        self.pending = deque(maxlen=MAX_SCROLLBACK) if buffered else None
+        self.stream = stream
+        self.file = None
+        if path:
+            self.open_file(path)
+
+    def open_file(self, path):
+        with self.lock:
+            if self.file:
+                self.file.close()
+            self.file = open(path, 'a', encoding='utf-8')
+
+    def __call__(self, message):
+        message = str(message)
+        with self.lock:
+            if self.pending is not None:
+                self.pending.append(message)
+            if self.file:
+                self.file.write(f"{time.strftime('%Y-%m-%d %H:%M:%S')} {message}\n")
+            if self.stream:
+                self.stream.write(message + "\n")
+
+    def drain(self):
+        """Returns and forgets the messages buffered since the last drain."""
+        if self.pending is None:
+            return []
+        with self.lock:
+            messages = list(self.pending)
+            self.pending.clear()
+        return messages
+
+    def close(self):
+        with self.lock:
+            if self.file:
+                self.file.close()
+                self.file = None
+            if self.stream:
+                self.stream.flush()
@@ -0,0 +1,264 @@
+import gzip
+import os
+import re
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Minification and precompressed siblings (page.html.gz / page.html.br) for everything the build
+# writes, so a static host can serve the compressed variant directly. The minifiers are
+# deliberately conservative: they only drop whitespace and comments that can't change rendering.
+
+# --- CONFIGURATION ---
+# Bump when minify_html() output changes, so pages written with the old rules are rewritten
+MINIFY_VERSION = 2
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 11
+VARIANT_SUFFIXES = (".gz", ".br")
+# For the prune patterns of the fingerprinted assets: a file name plus an optional variant suffix
+VARIANT_PATTERN = r"(?:\.gz|\.br)?"
+
+# HTML whitespace only: \s would also eat U+00A0, which renders
+HTML_SPACE = re.compile(r"[ \t\n\r\f]+")
+HTML_TOKEN = re.compile(
+    r"(<(pre|textarea|script|style)\b.*?</\2\s*>)"    # content kept byte for byte
+    r"|(<!--.*?-->)"
+    r"|(<(?:[^>\"']|\"[^\"]*\"|'[^']*')*>)",
+    re.S | re.I,
+)
+TAG_NAME = re.compile(r"<(/?)([^\s/>]+)")
+# Whitespace next to these doesn't render: it ends up at the start or end of a line box
+BLOCK_TAGS = frozenset(
+    "!doctype html head body title meta link base div p ul ol li dl dt dd section article aside header footer "
+    "nav main h1 h2 h3 h4 h5 h6 table thead tbody tfoot tr td th caption form fieldset legend figure "
+    "figcaption blockquote hr pre noscript".split()
+)
+VOID_TAGS = frozenset("!doctype area base br col embed hr img input link meta source track wbr".split())
+CSS_TOKEN = re.compile(r"(\"(?:\\.|[^\"\\])*\"|'(?:\\.|[^'\\])*')|(/\*.*?\*/)|([ \t\n\r\f]+)", re.S)
+# No space needed next to these (':' is handled separately, "--x: ;" needs its space)
+CSS_PUNCTUATION = "{};,>"
+# Whitespace and comments, string literals (copied as is), words, anything else one character.
+# Template literals can nest (`a ${`b`} c`), _js_template_end() finds where they close.
+JS_TOKEN = re.compile(
+    r"(?P<gap>(?:\s|//[^\n]*|/\*.*?\*/)+)"
+    r"|(?P<literal>'(?:\\.|[^'\\\n])*'|\"(?:\\.|[^\"\\\n])*\")"
+    r"|(?P<word>[\w$]+)"
+    r"|(?P<other>.)",
+    re.S,
+)
+JS_REGEX = re.compile(r"/(?:\\.|\[(?:\\.|[^\]\\\n])*\]|[^/\\\n\[])+/[A-Za-z]*")
+# A '/' after one of these (or at the start) begins a regex literal, otherwise it divides
+JS_REGEX_AFTER = set("(,=:[!&|?{};+-*/%<>~^") | {"return", "typeof", "case", "do", "else", "in", "of", "new",
+                                                 "delete", "void", "throw", "instanceof", "yield", "await"}
+# jsmin's rule: a line break stays only between tokens that could each end and start a statement
+JS_ENDS_STATEMENT = ")]}'\"`+-/"
+JS_STARTS_STATEMENT = "([{'\"`+-!~/"
+
+
+def _collapse(text, after_block, before_block):
+    text = HTML_SPACE.sub(" ", text)
+    if after_block:
+        text = text.lstrip(" ")
+    if before_block:
+        text = text.rstrip(" ")
+    return text
+
+
+def _is_block(match, open_tags):
+    """Whether match (a tag or raw element) is a block boundary; open_tags resolves end tags to their start tag."""
+    if match.group(3):
+        return False
+    start_tag = match.group(4) or match.group(1).split(">", 1)[0]
+    closing, name = TAG_NAME.match(start_tag).groups()
+    name = name.lower()
+    if closing:
+        # Pops elements closed implicitly (<li>, <p>); a stray end tag leaves the stack alone
+        if any(open_name == name for open_name, _ in open_tags):
+            while True:
+                open_name, block = open_tags.pop()
+                if open_name == name:
+                    return block
+        return name in BLOCK_TAGS
+    # An inline-block/inline-flex class (or display:inline style) makes the whitespace around it render
+    block = name in BLOCK_TAGS and "inline" not in start_tag.lower()
+    if match.group(4) and name not in VOID_TAGS and not start_tag.endswith("/>"):
+        open_tags.append((name, block))
+    return block
+
+
+def minify_html(html):
+    """
+    Collapses whitespace runs to one space, drops the ones next to block-level tags and drops
+    comments (IE conditional comments stay). Browsers render neither, so this is invisible;
+    tags, <pre>, <textarea>, <script> and <style> are copied unchanged.
+    """
+    out = []
+    text = []  # Text on both sides of a dropped comment collapses as one run
+    open_tags = []
+    after_block = True
+    pos = 0
+    for match in HTML_TOKEN.finditer(html):
+        text.append(html[pos:match.start()])
+        pos = match.end()
+        comment = match.group(3)
+        if comment is None or comment.startswith("<!--[if"):
+            block = _is_block(match, open_tags)
+            out.append(_collapse("".join(text), after_block, block))
+            out.append(match.group())
+            text = []
+            after_block = block
+    text.append(html[pos:])
+    out.append(_collapse("".join(text), after_block, True))
+    return "".join(out) + "\n"
+
+
+def minify_css(css):
+    """Drops comments and needless whitespace; strings are left alone."""
+    def replace(match):
+        if match.group(1):
+            return match.group(1)
+        if match.group(2):
+            return " "
+        before = css[match.start() - 1] if match.start() else ""
+        after = css[match.end()] if match.end() < len(css) else ""
+        if not before or not after or before in CSS_PUNCTUATION or (after in CSS_PUNCTUATION and before != ":"):
+            return ""
+        if before == ":" and after not in ";}":
+            return ""
+        return " "
+    # Comments become a space first, so a second pass can decide whether that space is needed
+    css = CSS_TOKEN.sub(lambda m: m.group(1) or (" " if m.group(2) else m.group()), css)
+    return CSS_TOKEN.sub(replace, css)
+
+
+def _js_word(char):
+    return char.isalnum() or char in "_$\\"
+
+
+def _js_gap(before, after, newline):
+    """What replaces the whitespace/comments between the tokens before and after."""
+    if not before or not after:
+        return ""
+    last, first = before[-1], after[0]
+    if newline and (_js_word(last) or last in JS_ENDS_STATEMENT) and (_js_word(first) or first in JS_STARTS_STATEMENT):
+        return "\n"
+    # "a b", "a + +b", "a - -b", "1 .toString()"
+    if (_js_word(last) and _js_word(first)) or (last == first and last in "+-/") or (before.isdigit() and first == "."):
+        return " "
+    return ""
+
+
+def _js_template_end(js, pos):
+    """Index just past the template literal starting at js[pos] (a backtick), -1 when it never closes."""
+    depth = 0  # Open braces inside the current ${...} substitutions
+    i = pos + 1
+    while i < len(js):
+        char = js[i]
+        if depth and char in "'\"":
+            match = JS_TOKEN.match(js, i)
+            if not match.group("literal"):
+                return -1
+            i = match.end()
+            continue
+        if char == "\\":
+            i += 2
+        elif char == "`":
+            if not depth:
+                return i + 1
+            i = _js_template_end(js, i)
+            if i < 0:
+                return -1
+        elif depth and char == "{":
+            depth += 1
+            i += 1
+        elif depth and char == "}":
+            depth -= 1
+            i += 1
+        elif not depth and js.startswith("${", i):
+            depth = 1
+            i += 2
+        else:
+            i += 1
+    return -1
+
+
+def minify_js(js):
+    """
+    Drops comments and the whitespace the grammar doesn't need. A line break stays wherever
+    automatic semicolon insertion could depend on it; strings, regex literals and template
+    literals (their ${...} substitutions included) are copied unchanged. Scripts it can't
+    tokenize (an unterminated literal) are returned as is.
+    """
+    tokens = []
+    newline = False  # The whitespace/comments since the last token had a line break
+    gap = False
+    pos = 0
+    while pos < len(js):
+        previous = tokens[-1] if tokens else ""
+        if js[pos] == "/" and not js.startswith(("//", "/*"), pos) and (not previous or previous in JS_REGEX_AFTER):
+            match = JS_REGEX.match(js, pos)
+            if not match:
+                return js
+            end = match.end()
+        elif js[pos] == "`":
+            end = _js_template_end(js, pos)
+            if end < 0:
+                return js
+        else:
+            match = JS_TOKEN.match(js, pos)
+            if match.group("gap"):
+                gap = True
+                newline = newline or "\n" in match.group()
+                pos = match.end()
+                continue
+            if match.group("other") in ("'", '"'):
+                return js
+            end = match.end()
+        token = js[pos:end]
+        if gap:
+            tokens.append(_js_gap(previous, token, newline))
+            gap = newline = False
+        tokens.append(token)
+        pos = end
+    return "".join(tokens) + "\n"
+
+
+def _write_atomic(path, data):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def write_variants(path, data, compress=True):
+    """
+    Writes path.gz (and path.br with brotli installed) for data, the bytes just written to path.
+    Variants that aren't produced are removed, so a host never serves a stale one.
+    Returns (files, bytes) written.
+    """
+    variants = {}
+    if compress:
+        # mtime=0 keeps the .gz identical for identical input
+        variants[".gz"] = gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+        if brotli is not None:
+            variants[".br"] = brotli.compress(data, quality=BROTLI_QUALITY)
+    for suffix in VARIANT_SUFFIXES:
+        if suffix in variants:
+            _write_atomic(path + suffix, variants[suffix])
+        elif os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    return len(variants), sum(len(variant) for variant in variants.values())
+
+
+def refresh_variants(path, compress=True):
+    """write_variants() for a file written elsewhere, skipped (0, 0) while its variants are up to date."""
+    suffixes = ([".gz"] + ([".br"] if brotli is not None else [])) if compress else []
+    current = all(os.path.exists(path + suffix) and os.path.getmtime(path + suffix) >= os.path.getmtime(path)
+                  for suffix in suffixes)
+    stale = [suffix for suffix in VARIANT_SUFFIXES if suffix not in suffixes and os.path.exists(path + suffix)]
+    if current and not stale:
+        return 0, 0
+    with open(path, 'rb') as f:
+        return write_variants(path, f.read(), compress)
@@ -0,0 +1,80 @@
+import hashlib
+import json
+import os
+import re
+import unicodedata
+
+from character_data import NAME_MAPPING
+from output_stage import VARIANT_PATTERN
+
+# --- CONFIGURATION ---
+INDEX_PREFIX = "search"
+
+
+def tokenize(text):
+    """Lowercase ASCII words; must match normalize() in site_render.SEARCH_SCRIPT."""
+    text = unicodedata.normalize('NFKD', text)
+    text = "".join(c for c in text if not unicodedata.combining(c)).lower()
+    return [token for token in re.split(r'[^a-z0-9]+', text) if token]
+
+
+def character_aliases(characters):
+    """
+    {char_id: [alias, ...]} from character_data.NAME_MAPPING. Mappings go from the name players use
+    to the icon name ("Baek Ho" -> "Backho"), so either side can identify the character.
+    """
+    aliases = {}
+    for display_name, icon_name in NAME_MAPPING.items():
+        key_part = f"-{icon_name.lower().replace(' ', '')}-"
+        for char_id, data in characters.items():
+            if data['name'].lower() == display_name.lower() or key_part in char_id:
+                aliases.setdefault(char_id, set()).update({display_name, icon_name} - {data['name']})
+    return {char_id: sorted(names) for char_id, names in aliases.items()}
+
+
+def build_index(entries):
+    """
+    entries: [(name, href, group, classification, [alias, ...]), ...] in display order.
+    Returns a compact dict: entries as [name, href, group_idx, class_idx], plus a sorted token list
+    with one posting list (entry ids) per token, so the client finds every token starting
+    with a query term by binary search.
+    """
+    groups, classes = [], []
+    rows, postings = [], {}
+    for entry_id, (name, href, group, classification, aliases) in enumerate(entries):
+        if group not in groups:
+            groups.append(group)
+        if classification not in classes:
+            classes.append(classification)
+        rows.append([name, href, groups.index(group), classes.index(classification)])
+        for text in [name, group, classification, *aliases]:
+            for token in tokenize(text):
+                ids = postings.setdefault(token, [])
+                if not ids or ids[-1] != entry_id:
+                    ids.append(entry_id)
+    tokens = sorted(postings)
+    return {"groups": groups, "classes": classes, "entries": rows,
+            "tokens": tokens, "postings": [postings[token] for token in tokens]}
+
+
+def write_index(index, out_dir, prefix=INDEX_PREFIX):
+    """Writes <prefix>.<hash>.json (skipped when that build already exists). Returns (file name, files, bytes written)."""
+    data = json.dumps(index, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+    filename = f"{prefix}.{hashlib.sha256(data).hexdigest()[:12]}.json"
+    path = os.path.join(out_dir, filename)
+    if os.path.exists(path):
+        return filename, 0, 0
+    os.makedirs(out_dir, exist_ok=True)
+    with open(path + ".tmp", 'wb') as f:
+        f.write(data)
+    os.replace(path + ".tmp", path)
+    return filename, 1, len(data)
+
+
+def prune_indexes(out_dir, keep, prefix=INDEX_PREFIX):
+    """Removes older fingerprinted indexes (and their .gz/.br variants), keeping the file named keep."""
+    pattern = re.compile(rf"({re.escape(prefix)}\.[0-9a-f]{{12}}\.json){VARIANT_PATTERN}$")
+    for filename in os.listdir(out_dir):
+        match = pattern.match(filename)
+        if match and match.group(1) != keep:
+            os.remove(os.path.join(out_dir, filename))
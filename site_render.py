@@ -0,0 +1,924 @@
+import itertools
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from build_manifest import BuildManifest, hash_inputs
+from asset_bundle import bundle_name, prune_bundles, write_bundle
+from build_profile import BuildProfile
+from character_data import group_sort_key
+import image_pipeline
+from gallery import GALLERIES, gallery_entries, paginate
+from gallery import page_path as gallery_page_path
+from image_dimensions import ImageSizeCache, size_attrs
+from output_stage import MINIFY_VERSION, minify_css, minify_html, minify_js, refresh_variants, write_variants
+import sprite_atlas
+from search_index import build_index, character_aliases, prune_indexes, write_index
+from stats_store import StatsStore
+from static_css import compile_css, extract_classes, prune_stylesheets, write_stylesheet
+from template_engine import Template
+
+# Shared rendering for the GUI (sitegen.py) and the headless CLI (generate_wiki_headless.py).
+# Keep this module free of PySide6 / requests so headless builds start fast.
+
+# --- CONFIGURATION ---
+CHARACTER_GROUPS = [
+    "Stock Characters", "Cite Of Reboldouex", "Port Of Coimbra", "City of Auch",
+    "Ustiur", "Bahamar", "Los Toldos", "Katovic", "Gigante", "Unreleased", "Unknown"
+]
+CLASSIFICATIONS = ["Stock", "Scout", "Recruit"]
+
+# Generated stylesheets go to site_root/assets
+ASSET_DIR = "assets"
+# The portrait card is full width on phones and a third of the 72rem container from md: up
+PORTRAIT_SIZES = "(min-width: 1152px) 352px, (min-width: 768px) 30vw, 100vw"
+# Gallery cards are a sixth of the 1600px container on xl, a quarter from md:, half on phones
+GALLERY_SIZES = "(min-width: 1280px) 256px, (min-width: 768px) 25vw, 50vw"
+# Gallery thumbnails in the first row load eagerly, the rest lazily
+EAGER_THUMBNAILS = 6
+# Grid icons above the fold on a wide screen (two xl rows); the rest are lazy-loaded
+EAGER_ICONS = 20
+# Pages are rendered before the stylesheet name is known; this is swapped for the real path on write
+STYLESHEET_PLACEHOLDER = "__SITE_STYLESHEET__"
+
+# --- HTML TEMPLATES ---
+
+# 1. Shared assets: one content-hashed CSS and JS bundle for every page (asset_bundle.py),
+# written to assets/ by build_site(). Plain strings, nothing here is formatted by Python.
+# Tailwind utilities (and the glass/accent theme) are compiled at build time by static_css.py
+# and linked from each template right after the head, so they keep overriding COMMON_CSS.
+COMMON_CSS = """body {
+    background-size: cover;
+    background-position: center center;
+    background-repeat: no-repeat;
+    background-attachment: fixed;
+    position: relative;
+    transition: background-image 0.8s ease-in-out;
+    min-height: 100vh;
+    color: #e2e8f0;
+}
+body::before {
+    content: '';
+    position: absolute;
+    top: 0;
+    left: 0;
+    right: 0;
+    bottom: 0;
+    background: linear-gradient(to bottom, rgba(15, 23, 42, 0.9), rgba(15, 23, 42, 0.7));
+    z-index: -1;
+}
+.glass-panel {
+    background: rgba(30, 41, 59, 0.7);
+    backdrop-filter: blur(16px);
+    -webkit-backdrop-filter: blur(16px);
+    border: 1px solid rgba(255, 255, 255, 0.08);
+    box-shadow: 0 8px 32px 0 rgba(0, 0, 0, 0.3);
+}
+.glass-card {
+    background: linear-gradient(145deg, rgba(255, 255, 255, 0.05) 0%, rgba(255, 255, 255, 0.02) 100%);
+    backdrop-filter: blur(12px);
+    border: 1px solid rgba(255, 255, 255, 0.05);
+    transition: transform 0.2s ease, background-color 0.2s ease;
+}
+.glass-card:hover {
+    transform: translateY(-2px);
+    background-color: rgba(255, 255, 255, 0.08);
+    border-color: rgba(255, 255, 255, 0.2);
+}
+/* Rarity Borders */
+.border-stock { border-color: rgba(255, 255, 255, 0.2); }
+.border-scout { border-color: #4ade80; box-shadow: 0 0 10px rgba(74, 222, 128, 0.2); }
+.border-recruit { border-color: #fbbf24; box-shadow: 0 0 10px rgba(251, 191, 36, 0.2); }
+"""
+
+# Page background; the bundle is deferred, so this still runs before DOMContentLoaded
+BACKGROUND_SCRIPT = """document.addEventListener('DOMContentLoaded', () => {
+    const backgrounds = ['https://gem.hanbiton.com/Brand2E/src/images/new-contents/event/bg.jpg'];
+    document.body.style.backgroundImage = `url(${backgrounds[0]})`;
+});
+"""
+
+# Wiki search: queries the fingerprinted index from search_index.py as you type.
+# Does nothing on pages without the search box. The index is fetched on first use.
+SEARCH_SCRIPT = r"""(() => {
+    const input = document.getElementById('wiki-search');
+    if (!input || !input.dataset.index) return;
+    const cards = new Map(Array.from(document.querySelectorAll('a[data-search]'), a => [a.getAttribute('href'), a]));
+    const sections = Array.from(document.querySelectorAll('section'));
+    let index = null, loading = null;
+
+    // Must match search_index.tokenize()
+    const normalize = text => text.normalize('NFKD').replace(/[\u0300-\u036f]/g, '').toLowerCase().split(/[^a-z0-9]+/).filter(Boolean);
+    // A failed fetch is forgotten, so the next keystroke tries again
+    const load = () => loading || (loading = fetch(input.dataset.index)
+        .then(r => { if (!r.ok) throw new Error('HTTP ' + r.status); return r.json(); })
+        .then(data => index = data, error => { loading = null; throw error; }));
+
+    function lowerBound(tokens, term) {
+        let lo = 0, hi = tokens.length;
+        while (lo < hi) {
+            const mid = (lo + hi) >> 1;
+            if (tokens[mid] < term) lo = mid + 1; else hi = mid;
+        }
+        return lo;
+    }
+
+    // Entry ids matching every query term as a token prefix, null for an empty query
+    function search(query) {
+        let result = null;
+        for (const term of normalize(query)) {
+            const ids = new Set();
+            for (let i = lowerBound(index.tokens, term); i < index.tokens.length && index.tokens[i].startsWith(term); i++) {
+                for (const id of index.postings[i]) ids.add(id);
+            }
+            result = result ? new Set([...result].filter(id => ids.has(id))) : ids;
+            if (!result.size) break;
+        }
+        return result;
+    }
+
+    function apply() {
+        const ids = search(input.value);
+        const hrefs = ids && new Set([...ids].map(id => index.entries[id][1]));
+        cards.forEach((card, href) => { card.style.display = !hrefs || hrefs.has(href) ? '' : 'none'; });
+        sections.forEach(section => {
+            const visible = Array.from(section.querySelectorAll('a[data-search]')).some(card => card.style.display !== 'none');
+            section.style.display = visible ? '' : 'none';
+        });
+    }
+
+    input.addEventListener('focus', load, { once: true });
+    input.addEventListener('input', () => load().then(apply));
+})();
+"""
+
+COMMON_JS = BACKGROUND_SCRIPT + "\n" + SEARCH_SCRIPT
+# What actually ships (and is hashed into the bundle names): the minified sources
+COMMON_BUNDLES = {"css": minify_css(COMMON_CSS), "js": minify_js(COMMON_JS)}
+COMMON_CSS_FILE = bundle_name("common", "css", COMMON_BUNDLES["css"])
+COMMON_JS_FILE = bundle_name("common", "js", COMMON_BUNDLES["js"])
+
+# Shared head section (fonts, icons and the bundle); prefix is "../" for pages in subfolders
+COMMON_HEAD_TEMPLATE = Template("""
+    <link rel="preconnect" href="https://fonts.googleapis.com">
+    <link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>
+    <link href="https://fonts.googleapis.com/css2?family=Poppins:wght@400;500;600;700&family=Rajdhani:wght@600;700&display=swap" rel="stylesheet">
+    <script src="https://unpkg.com/@phosphor-icons/web"></script>
+    <link rel="stylesheet" href="{{ prefix }}{{ css }}">
+    <script src="{{ prefix }}{{ js }}" defer></script>""")
+COMMON_HEAD = COMMON_HEAD_TEMPLATE.render(prefix="", css=f"{ASSET_DIR}/{COMMON_CSS_FILE}", js=f"{ASSET_DIR}/{COMMON_JS_FILE}")
+COMMON_HEAD_NESTED = COMMON_HEAD_TEMPLATE.render(prefix="../", css=f"{ASSET_DIR}/{COMMON_CSS_FILE}", js=f"{ASSET_DIR}/{COMMON_JS_FILE}")
+
+# 2. Main Wiki Page Template
+# {{ slot }} is escaped, {{ slot|raw }} inserted as is (template_engine.py); the JS needs no brace doubling.
+WIKI_TEMPLATE = Template("""
+<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Granado Espada M - Wiki</title>
+    {{ common_head|raw }}
+    <link rel="stylesheet" href="{{ stylesheet }}">{{ sprite_stylesheet|raw }}
+</head>
+<body class="antialiased p-4 sm:p-6">
+    <div class="max-w-[1600px] mx-auto">
+        <header class="flex flex-col md:flex-row items-center justify-between gap-6 mb-8 glass-panel rounded-2xl p-4 md:px-8">
+            <div class="flex items-center gap-4">
+                <img src="https://gem.playpark.com/wp-content/uploads/2024/11/1-gem-logo.png" alt="Granado Espada M" class="h-16 object-contain drop-shadow-[0_0_10px_rgba(255,255,255,0.2)]" onerror="this.onerror=null;this.src='https://i.imgur.com/kSTiS9s.png';">
+                <div class="hidden sm:block border-l border-white/10 pl-4">
+                    <h1 class="text-xl font-bold text-white tracking-wide">CHARACTER WIKI</h1>
+                    <p class="text-xs text-accent-blue font-medium tracking-wider uppercase">Database & Stats</p>
+                </div>
+            </div>
+            <div class="flex flex-wrap items-center gap-3">{{ gallery_links|raw }}
+                <a href="https://freischultz.github.io/unofficial_gem/index.html" class="flex items-center gap-2 bg-white/5 hover:bg-white/10 border border-white/5 hover:border-white/20 text-white px-5 py-2 rounded-lg text-sm font-bold uppercase tracking-wide transition-all group">
+                    <i class="ph-bold ph-arrow-u-up-left group-hover:-translate-x-1 transition-transform"></i>
+                    Back to Tracker
+                </a>
+            </div>
+        </header>
+
+        <div class="glass-panel rounded-2xl p-6 md:p-8 min-h-screen">
+            <div class="mb-8 flex items-center gap-4 pb-6 border-b border-white/5">
+                <div class="relative w-full max-w-md">
+                    <i class="ph-bold ph-magnifying-glass absolute left-3 top-1/2 -translate-y-1/2 text-gray-400"></i>
+                    <input type="search" id="wiki-search" data-index="{{ search_index }}" autocomplete="off" placeholder="Search characters..." class="w-full bg-black/20 border border-white/10 rounded-lg py-2 pl-10 pr-4 text-sm text-white focus:outline-none focus:border-accent-blue transition-colors placeholder-gray-500">
+                </div>
+                <div class="text-xs text-gray-500 font-mono uppercase tracking-widest ml-auto">
+                    Database Version 1.0
+                </div>
+            </div>
+
+            <div class="space-y-10">
+                {{ character_sections|raw }}
+            </div>
+        </div>
+    </div>
+</body>
+</html>
+""")
+
+# 3. Individual Character Page Template
+# {{ slot }} is escaped, {{ slot|raw }} inserted as is (template_engine.py); the JS needs no brace doubling.
+CHARACTER_TEMPLATE = Template("""
+<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Granado Espada M - {{ name }}</title>
+    {{ common_head|raw }}
+    <link rel="stylesheet" href="../{{ stylesheet }}">
+</head>
+<body class="antialiased p-4 sm:p-6">
+    <div class="max-w-6xl mx-auto">
+        
+        <header class="flex flex-col md:flex-row items-center justify-between gap-6 mb-8 glass-panel rounded-2xl p-4 md:px-8">
+            <div class="flex items-center gap-4">
+                <img src="https://gem.playpark.com/wp-content/uploads/2024/11/1-gem-logo.png" alt="Granado Espada M" class="h-16 object-contain drop-shadow-[0_0_10px_rgba(255,255,255,0.2)]" onerror="this.onerror=null;this.src='https://i.imgur.com/kSTiS9s.png';">
+            </div>
+            <a href="https://freischultz.github.io/unofficial_gem/wiki.html" class="flex items-center gap-2 bg-white/5 hover:bg-white/10 border border-white/5 hover:border-white/20 text-white px-5 py-2 rounded-lg text-sm font-bold uppercase tracking-wide transition-all group">
+                <i class="ph-bold ph-arrow-u-up-left group-hover:-translate-x-1 transition-transform"></i>
+                Back to Wiki
+            </a>
+        </header>
+
+        <div class="glass-panel rounded-2xl p-8">
+            <div class="flex flex-col md:flex-row gap-8 items-start">
+                
+                <!-- Portrait Card -->
+                <div class="w-full md:w-1/3 flex flex-col items-center glass-card p-4 rounded-2xl">
+                    <picture class="w-full">{{ portrait_sources|raw }}
+                        <img src="{{ image_path }}" alt="{{ name }}"{{ image_size|raw }} fetchpriority="high" class="w-full h-auto rounded-xl border-2 {{ border_class }} shadow-lg mb-4">
+                    </picture>
+                    <h1 class="text-2xl font-bold text-white text-center">{{ name }}</h1>
+                    <div class="mt-2 px-3 py-1 rounded-full bg-white/10 text-xs font-mono uppercase tracking-widest text-accent-blue">
+                        Character Profile
+                    </div>
+                </div>
+
+                <!-- Info Panel -->
+                <div class="w-full md:w-2/3">
+                    <h2 class="text-xl font-bold text-accent-gold uppercase tracking-widest mb-6 border-b border-white/10 pb-2">
+                        <i class="ph-fill ph-chart-bar"></i> Combat Statistics
+                    </h2>
+                    
+                    <div class="glass-card rounded-xl p-6">
+                        {{ stats_section|raw }}
+                    </div>
+                </div>
+            </div>
+        </div>
+    </div>
+</body>
+</html>
+""")
+
+# 5. Gallery Page Template (images/item, images/sale), one page per PAGE_SIZE entries
+# {{ slot }} is escaped, {{ slot|raw }} inserted as is (template_engine.py); the JS needs no brace doubling.
+GALLERY_TEMPLATE = Template("""
+<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Granado Espada M - {{ title }}{{ page_label }}</title>
+    {{ common_head|raw }}
+    <link rel="stylesheet" href="../{{ stylesheet }}">
+</head>
+<body class="antialiased p-4 sm:p-6">
+    <div class="max-w-[1600px] mx-auto">
+        <header class="flex flex-col md:flex-row items-center justify-between gap-6 mb-8 glass-panel rounded-2xl p-4 md:px-8">
+            <div class="flex items-center gap-4">
+                <img src="https://gem.playpark.com/wp-content/uploads/2024/11/1-gem-logo.png" alt="Granado Espada M" class="h-16 object-contain drop-shadow-[0_0_10px_rgba(255,255,255,0.2)]" onerror="this.onerror=null;this.src='https://i.imgur.com/kSTiS9s.png';">
+                <div class="hidden sm:block border-l border-white/10 pl-4">
+                    <h1 class="text-xl font-bold text-white tracking-wide uppercase">{{ title }}</h1>
+                    <p class="text-xs text-accent-blue font-medium tracking-wider uppercase">{{ entry_count }} images</p>
+                </div>
+            </div>
+            <div class="flex flex-wrap items-center gap-3">{{ gallery_links|raw }}
+                <a href="../wiki.html" class="flex items-center gap-2 bg-white/5 hover:bg-white/10 border border-white/5 hover:border-white/20 text-white px-5 py-2 rounded-lg text-sm font-bold uppercase tracking-wide transition-all group">
+                    <i class="ph-bold ph-arrow-u-up-left group-hover:-translate-x-1 transition-transform"></i>
+                    Back to Wiki
+                </a>
+            </div>
+        </header>
+
+        <div class="glass-panel rounded-2xl p-6 md:p-8">
+            <div class="space-y-10">
+                {{ gallery_sections|raw }}
+            </div>
+            {{ pagination|raw }}
+        </div>
+    </div>
+</body>
+</html>
+""")
+
+# 4. Stats placeholder for characters without extracted stats (stats.json)
+NO_STATS_TEMPLATE = Template("""<div class="flex flex-col items-center justify-center py-12 text-center">
+                            <i class="ph-duotone ph-scroll text-4xl text-gray-500 mb-4"></i>
+                            <h3 class="text-lg font-semibold text-white">No Data Available</h3>
+                            <p class="text-sm text-gray-400 max-w-md mt-2">
+                                Detailed stats, stances, and recruitment data for {{ name }} have not been uploaded yet. Use the admin tool to analyze screenshots.
+                            </p>
+                        </div>""")
+
+# 6. Repeated fragments, rendered once per section/card and joined
+WIKI_SECTION_TEMPLATE = Template("""
+            <section>
+                <h2 class="text-lg font-bold {{ color_class }} uppercase tracking-widest mb-4 flex items-center gap-2">
+                    <i class="ph-fill {{ icon_class }}"></i> {{ group_name }}
+                </h2>
+                <div class="grid grid-cols-2 sm:grid-cols-4 md:grid-cols-6 lg:grid-cols-8 xl:grid-cols-10 gap-4">
+            {{ cards|raw }}</div></section>""")
+
+WIKI_CARD_TEMPLATE = Template("""
+                    <a href="characters/{{ page }}.html" data-search class="glass-card p-3 rounded-xl flex flex-col items-center gap-3 group text-center {{ extra_classes }}">
+                        {{ icon_html|raw }}
+                        <span class="text-xs font-semibold {{ text_classes }} group-hover:text-white truncate w-full">{{ name }}</span>
+                    </a>
+                """)
+
+SPRITE_ICON_TEMPLATE = Template('<span role="img" aria-label="{{ name }}" class="spr {{ sprite_class }} w-16 h-16 rounded-lg border-2 {{ border_class }} {{ img_classes }}"></span>')
+
+IMG_ICON_TEMPLATE = Template('<img src="images/icons/{{ icon }}" alt=""{{ size|raw }}{{ loading|raw }} class="w-16 h-16 rounded-lg border-2 {{ border_class }} {{ img_classes }}">')
+
+STYLESHEET_LINK_TEMPLATE = Template('\n    <link rel="stylesheet" href="{{ href }}">')
+
+GALLERY_LINK_TEMPLATE = Template("""
+                <a href="{{ href }}" class="flex items-center gap-2 bg-white/5 hover:bg-white/10 border border-white/5 hover:border-white/20 text-white px-5 py-2 rounded-lg text-sm font-bold uppercase tracking-wide transition-all">
+                    <i class="ph-bold ph-images"></i>
+                    {{ title }}
+                </a>""")
+
+SOURCE_TEMPLATE = Template('\n                        <source type="{{ mime }}" srcset="{{ srcset }}" sizes="{{ sizes }}">')
+
+GALLERY_SECTION_TEMPLATE = Template("""
+                <section>
+                    <h2 class="text-lg font-bold text-accent-blue uppercase tracking-widest mb-4 flex items-center gap-2">
+                        <i class="ph-fill ph-images"></i> {{ category }}
+                    </h2>
+                    <div class="grid grid-cols-2 md:grid-cols-4 xl:grid-cols-6 gap-4">{{ cards|raw }}</div></section>""")
+
+GALLERY_CARD_TEMPLATE = Template("""
+                        <a href="../{{ full }}" target="_blank" rel="noopener" class="glass-card p-2 rounded-xl flex flex-col gap-2 group">
+                            <picture>{{ sources|raw }}
+                                <img src="../{{ rel }}" alt="{{ alt }}"{{ size|raw }}{{ loading|raw }} class="w-full h-auto rounded-lg">
+                            </picture>
+                            <div class="flex items-center justify-between gap-2">
+                                <span class="text-xs font-semibold text-gray-300 group-hover:text-white truncate">{{ label }}</span>
+                                {{ region|raw }}
+                            </div>
+                        </a>""")
+
+REGION_BADGE_TEMPLATE = Template('<span class="px-2 py-0.5 rounded bg-white/10 text-[10px] font-mono text-gray-400">{{ region }}</span>')
+
+PAGINATION_TEMPLATE = Template("""<nav class="flex flex-wrap items-center justify-center gap-2 mt-10">
+                {{ links|raw }}
+            </nav>""")
+
+PAGE_LINK_TEMPLATE = Template('<a href="{{ href }}" class="px-3 py-1 rounded-lg text-sm font-mono {{ active }} transition-colors">{{ page_no }}</a>')
+
+# Template sources per page type, for the build manifest digests
+WIKI_TEMPLATES = (WIKI_TEMPLATE, WIKI_SECTION_TEMPLATE, WIKI_CARD_TEMPLATE, SPRITE_ICON_TEMPLATE, IMG_ICON_TEMPLATE,
+                  STYLESHEET_LINK_TEMPLATE, GALLERY_LINK_TEMPLATE)
+CHARACTER_TEMPLATES = (CHARACTER_TEMPLATE, NO_STATS_TEMPLATE, SOURCE_TEMPLATE)
+GALLERY_TEMPLATES = (GALLERY_TEMPLATE, GALLERY_SECTION_TEMPLATE, GALLERY_CARD_TEMPLATE, REGION_BADGE_TEMPLATE,
+                     PAGINATION_TEMPLATE, PAGE_LINK_TEMPLATE, GALLERY_LINK_TEMPLATE, SOURCE_TEMPLATE)
+
+
+def template_sources(templates):
+    return [template.source for template in templates]
+
+
+# Our own component classes from COMMON_CSS; not Tailwind utilities
+COMPONENT_CLASSES = set(re.findall(r'\.([A-Za-z][\w-]*)', COMMON_CSS)) | {"group", "spr"}
+# Phosphor icon classes and the generated sprite atlas classes
+NON_UTILITY_PREFIXES = ("ph-", "spr-")
+
+# Record fields render_character_page() reads; keep in sync with it
+CHARACTER_PAGE_FIELDS = ("name", "classification", "icon")
+
+# --- RENDERING MAPS ---
+CLASSIFICATION_BORDERS = {
+    "Stock": "border-stock",
+    "Scout": "border-scout",
+    "Recruit": "border-recruit"
+}
+
+# Icon mapping for wiki section headers
+GROUP_ICONS = {
+    "Stock Characters": "ph-users-three",
+    "Cite Of Reboldouex": "ph-buildings",
+    "Port Of Coimbra": "ph-anchor",
+    "City of Auch": "ph-city",
+    "Ustiur": "ph-tree-palm",
+    "Bahamar": "ph-mountains",
+    "Los Toldos": "ph-skull",
+    "Katovic": "ph-snowflake",
+    "Gigante": "ph-island",
+    "Unreleased": "ph-lock-key",
+    "Unknown": "ph-question"
+}
+
+# Color mapping for wiki section headers
+GROUP_COLORS = {
+    "Stock Characters": "text-accent-gold",
+    "Unreleased": "text-accent-red",
+    "Unknown": "text-gray-500"
+}
+
+
+def page_id(char_id):
+    """'spr-icon-pc-adelina-01' -> 'adelina-01' (the characters/*.html file name)."""
+    return char_id.replace("spr-icon-pc-", "")
+
+
+def resolve_portrait(site_root, data):
+    """Returns the page-relative image path: the portrait if we have one, the icon otherwise."""
+    portrait_filename = data['icon'].replace("SPR_Icon", "IMG_Portrait")
+    full_portrait_path = os.path.join(site_root, "images", "portrait", portrait_filename)
+    if os.path.exists(full_portrait_path):
+        return f"../images/portrait/{portrait_filename}"
+    return f"../images/icons/{data['icon']}"
+
+
+def portrait_srcsets(optimizer, site_root, data):
+    """Responsive WebP/AVIF variants of the character portrait, [] when there are none."""
+    if optimizer is None:
+        return []
+    rel_src = f"images/portrait/{data['icon'].replace('SPR_Icon', 'IMG_Portrait')}"
+    if not os.path.exists(os.path.join(site_root, rel_src)):
+        return []
+    return optimizer.srcsets(rel_src)
+
+
+def render_sources(srcsets, prefix, sizes):
+    """<source> tags for a <picture>, srcsets as returned by ImageOptimizer.srcsets()."""
+    return SOURCE_TEMPLATE.render_each(
+        {"mime": mime, "srcset": ", ".join(f"{prefix}{rel} {width}w" for rel, width in entries), "sizes": sizes}
+        for mime, entries in srcsets
+    )
+
+
+def render_character_page(data, image_path, srcsets=(), image_size=None, stats_html=None, stylesheet=STYLESHEET_PLACEHOLDER):
+    return CHARACTER_TEMPLATE.render(
+        stats_section=stats_html or NO_STATS_TEMPLATE.render(name=data['name']),
+        common_head=COMMON_HEAD_NESTED,
+        stylesheet=stylesheet,
+        name=data['name'],
+        image_path=image_path,
+        image_size=size_attrs(image_size),
+        portrait_sources=render_sources(srcsets, "../", PORTRAIT_SIZES),
+        border_class=CLASSIFICATION_BORDERS.get(data.get("classification", "Stock"))
+    )
+
+
+def character_digest(data, image_path, srcsets=(), image_size=None, stats_html=None):
+    # Only the fields the page shows: sort order, group or visibility edits leave it alone
+    fields = {key: data.get(key) for key in CHARACTER_PAGE_FIELDS}
+    return hash_inputs(template_sources(CHARACTER_TEMPLATES), COMMON_HEAD_NESTED, fields, image_path, list(srcsets), image_size, stats_html)
+
+
+def visible_by_group(characters):
+    """{group: [(char_id, data), ...]} of the visible characters in wiki order, in one pass over the roster."""
+    groups = {}
+    for char_id, c in characters.items():
+        if not c.get('hidden', False):
+            groups.setdefault(c.get('group'), []).append((char_id, c))
+    # Manual sort order from the GUI first, alphabetical for everything not sorted yet
+    for members in groups.values():
+        members.sort(key=group_sort_key)
+    return groups
+
+
+def render_gallery_links(galleries, prefix=""):
+    """Header buttons for the gallery pages; galleries is [(site relative href, title), ...]."""
+    return GALLERY_LINK_TEMPLATE.render_each({"href": prefix + href, "title": title} for href, title in galleries)
+
+
+def render_wiki(characters, sprites=None, icon_sizes=None, search_index="", galleries=(), stylesheet=STYLESHEET_PLACEHOLDER):
+    """
+    sprites is the result of sprite_atlas.build_atlas(); without it every icon is its own <img>,
+    sized from icon_sizes ({icon filename: (width, height)}). search_index is the site relative
+    path of the index written by search_index.write_index(), galleries as for render_gallery_links().
+    """
+    sprite_classes = sprites["classes"] if sprites else {}
+    icon_sizes = icon_sizes or {}
+    icon_count = 0
+    sections = []
+    groups = visible_by_group(characters)
+    for group_name in CHARACTER_GROUPS:
+        sorted_chars = groups.get(group_name)
+        if not sorted_chars: continue
+
+        # Add opacity for unreleased
+        unreleased = group_name == "Unreleased"
+        extra_classes = "opacity-70 hover:opacity-100" if unreleased else ""
+        img_classes = "grayscale group-hover:grayscale-0 transition-all" if unreleased else "group-hover:scale-110 transition-transform"
+        text_classes = "text-gray-400" if unreleased else "text-gray-300"
+
+        cards = []
+        for _, char_data in sorted_chars:
+            border_class = CLASSIFICATION_BORDERS.get(char_data.get("classification", "Stock"))
+            char_id = os.path.splitext(char_data['icon'])[0].lower().replace('_', '-')
+
+            icon = char_data['icon']
+            if icon in sprite_classes:
+                icon_html = SPRITE_ICON_TEMPLATE.render(name=char_data['name'], sprite_class=sprite_classes[icon],
+                                                        border_class=border_class, img_classes=img_classes)
+            else:
+                loading = ' loading="lazy" decoding="async"' if icon_count >= EAGER_ICONS else ""
+                icon_html = IMG_ICON_TEMPLATE.render(icon=icon, size=size_attrs(icon_sizes.get(icon)), loading=loading,
+                                                     border_class=border_class, img_classes=img_classes)
+            icon_count += 1
+
+            cards.append(WIKI_CARD_TEMPLATE.render(page=page_id(char_id), extra_classes=extra_classes, icon_html=icon_html,
+                                                   text_classes=text_classes, name=char_data['name']))
+        sections.append(WIKI_SECTION_TEMPLATE.render(
+            color_class=GROUP_COLORS.get(group_name, "text-accent-blue"),
+            icon_class=GROUP_ICONS.get(group_name, "ph-caret-right"),
+            group_name=group_name,
+            cards="".join(cards)
+        ))
+
+    return WIKI_TEMPLATE.render(
+        common_head=COMMON_HEAD,
+        stylesheet=stylesheet,
+        sprite_stylesheet=STYLESHEET_LINK_TEMPLATE.render(href=sprites["stylesheet"]) if sprites else "",
+        search_index=search_index,
+        gallery_links=render_gallery_links(galleries),
+        character_sections="".join(sections)
+    )
+
+
+def wiki_search_entries(characters):
+    """Search index entries for the visible characters, in wiki order."""
+    aliases = character_aliases(characters)
+    entries = []
+    groups = visible_by_group(characters)
+    for group_name in CHARACTER_GROUPS:
+        for char_id, data in groups.get(group_name, []):
+            href = f"characters/{page_id(os.path.splitext(data['icon'])[0].lower().replace('_', '-'))}.html"
+            entries.append((data['name'], href, group_name, data.get('classification', 'Stock'), aliases.get(char_id, [])))
+    return entries
+
+
+def wiki_digest(characters, sprites=None, icon_sizes=None, search_index="", galleries=()):
+    # Everything the wiki page depends on: templates + the visible roster in display order
+    wiki_inputs = [
+        {k: c.get(k) for k in ('name', 'icon', 'group', 'classification', 'sort_order')}
+        for c in characters.values() if not c.get('hidden', False)
+    ]
+    return hash_inputs(template_sources(WIKI_TEMPLATES), COMMON_HEAD, CHARACTER_GROUPS, wiki_inputs, sprites, icon_sizes, search_index, list(galleries))
+
+
+def render_gallery_page(title, slug, page_no, page_count, entry_count, cards, galleries=(), stylesheet=STYLESHEET_PLACEHOLDER):
+    """
+    cards: [{category, label, region, rel, full, size, srcsets}, ...] as built by plan_gallery_pages().
+    Thumbnails come from the responsive variants, the full image is only fetched when a card is opened.
+    """
+    sections = []
+    index = 0
+    # Cards arrive sorted by category, one section per run of equal categories
+    for category, group in itertools.groupby(cards, key=lambda card: card["category"]):
+        card_html = []
+        for card in group:
+            loading = ' loading="lazy" decoding="async"' if index >= EAGER_THUMBNAILS else ""
+            index += 1
+            card_html.append(GALLERY_CARD_TEMPLATE.render(
+                full=card['full'],
+                sources=render_sources(card['srcsets'], "../", GALLERY_SIZES),
+                rel=card['rel'],
+                alt=f"{card['category']} {card['label']}",
+                size=size_attrs(card['size']),
+                loading=loading,
+                label=card['label'],
+                region=REGION_BADGE_TEMPLATE.render(region=card["region"]) if card["region"] else ""
+            ))
+        sections.append(GALLERY_SECTION_TEMPLATE.render(category=category, cards="".join(card_html)))
+
+    pagination = ""
+    if page_count > 1:
+        links = [
+            PAGE_LINK_TEMPLATE.render(
+                href=os.path.basename(gallery_page_path(slug, n)), page_no=n,
+                active="bg-white/20 text-white" if n == page_no else "bg-white/5 text-gray-400 hover:bg-white/10 hover:text-white"
+            )
+            for n in range(1, page_count + 1)
+        ]
+        pagination = PAGINATION_TEMPLATE.render(links=" ".join(links))
+
+    return GALLERY_TEMPLATE.render(
+        common_head=COMMON_HEAD_NESTED,
+        stylesheet=stylesheet,
+        title=title,
+        page_label=f" ({page_no}/{page_count})" if page_count > 1 else "",
+        entry_count=entry_count,
+        gallery_links=render_gallery_links(galleries, "../"),
+        gallery_sections="".join(sections),
+        pagination=pagination
+    )
+
+
+def write_page(site_root, rel_path, content, minify=True, compress=True):
+    """
+    Writes a page (minified unless told otherwise) plus its .gz/.br variants.
+    Returns (page bytes, variant files, variant bytes).
+    """
+    path = os.path.join(site_root, rel_path)
+    data = (minify_html(content) if minify else content).encode('utf-8')
+    with open(path, 'wb') as f:
+        f.write(data)
+    return (len(data),) + write_variants(path, data, compress)
+
+
+def default_workers():
+    return min(8, os.cpu_count() or 1)
+
+
+# --- BUILD PIPELINE ---
+# A page spec is (rel_path, render_function, render_args, input_digest). Render functions are
+# module level so specs can be shipped to a process pool.
+
+def plan_pages(characters, site_root, optimizer=None, sprites=None, image_sizes=None, stats=None, search_index=""):
+    """Every page of the site: character pages, then the galleries, wiki.html last."""
+    image_sizes = image_sizes or ImageSizeCache(site_root, site_root)
+    specs = []
+    for char_id, data in characters.items():
+        image_path = resolve_portrait(site_root, data)
+        srcsets = portrait_srcsets(optimizer, site_root, data)
+        # image_path is relative to characters/, the size cache to the site root
+        image_size = image_sizes.size(image_path.replace("../", "", 1))
+        stats_html = stats.html(char_id) if stats else None
+        specs.append((f"characters/{page_id(char_id)}.html", render_character_page, (data, image_path, srcsets, image_size, stats_html),
+                      character_digest(data, image_path, srcsets, image_size, stats_html)))
+
+    # The sprite grid has fixed CSS sizes, intrinsic sizes only matter for the <img> fallback
+    icon_sizes = None
+    if not sprites:
+        icon_sizes = {
+            c['icon']: image_sizes.size(f"images/icons/{c['icon']}")
+            for c in characters.values() if not c.get('hidden', False)
+        }
+    specs.extend(plan_gallery_pages(site_root, optimizer, image_sizes))
+    # Galleries are only published with their image variants (see plan_gallery_pages)
+    links = gallery_links(site_root) if optimizer else []
+    specs.append(("wiki.html", render_wiki, (characters, sprites, icon_sizes, search_index, links),
+                  wiki_digest(characters, sprites, icon_sizes, search_index, links)))
+    return specs
+
+
+def gallery_links(site_root):
+    """[(href, title)] of the galleries that have images; the wiki and every gallery page link them."""
+    return [(gallery_page_path(slug, 1), title) for slug, folder, title in GALLERIES if gallery_entries(site_root, folder)]
+
+
+def full_size_link(rel_src, srcsets):
+    """Largest WebP variant for a card's full-size link (browsers open WebP directly, not all open AVIF), else the original."""
+    webp = next((variants for mime_type, variants in srcsets if mime_type == "image/webp"), None)
+    return max(webp, key=lambda variant: variant[1])[0] if webp else rel_src
+
+
+def plan_gallery_pages(site_root, optimizer=None, image_sizes=None):
+    """
+    Specs for every page of every gallery (see plan_pages). The banners are multi-megabyte PNGs,
+    so without an optimizer (no Pillow, or the image stage switched off) there are no gallery pages.
+    """
+    if optimizer is None:
+        return []
+    image_sizes = image_sizes or ImageSizeCache(site_root, site_root)
+    links = gallery_links(site_root)
+    specs = []
+    for slug, folder, title in GALLERIES:
+        entries = gallery_entries(site_root, folder)
+        if not entries:
+            continue
+        pages = paginate(entries)
+        for page_no, page_entries in enumerate(pages, start=1):
+            cards = []
+            for entry in page_entries:
+                srcsets = optimizer.srcsets(entry["rel"])
+                full = full_size_link(entry["rel"], srcsets)
+                label = "#" + "-".join(str(n) for n in entry["numbers"]) if entry["numbers"] else os.path.basename(entry["rel"])
+                cards.append({
+                    "category": entry["category"], "label": label, "region": entry["region"], "rel": entry["rel"],
+                    "full": full, "size": image_sizes.size(entry["rel"]), "srcsets": srcsets,
+                })
+            args = (title, slug, page_no, len(pages), len(entries), cards, links)
+            specs.append((gallery_page_path(slug, page_no), render_gallery_page, args,
+                          hash_inputs(template_sources(GALLERY_TEMPLATES), COMMON_HEAD_NESTED, GALLERY_SIZES, EAGER_THUMBNAILS, *args)))
+    return specs
+
+
+def _render_job(job):
+    """Worker entry point for rendering. Returns (rel_path, html, error, seconds)."""
+    rel_path, render, args = job
+    start = time.perf_counter()
+    try:
+        return rel_path, render(*args), None, time.perf_counter() - start
+    except Exception as e:
+        return rel_path, None, f"{type(e).__name__}: {e}", time.perf_counter() - start
+
+
+def _write_job(job):
+    """Worker entry point for minifying, compressing and writing. Returns (rel_path, error, seconds, write_page() result)."""
+    site_root, rel_path, html, minify, compress = job
+    start = time.perf_counter()
+    try:
+        written = write_page(site_root, rel_path, html, minify, compress)
+    except Exception as e:
+        return rel_path, f"{type(e).__name__}: {e}", time.perf_counter() - start, (0, 0, 0)
+    return rel_path, None, time.perf_counter() - start, written
+
+
+def run_jobs(worker, jobs, workers=1, use_processes=False):
+    """Runs jobs on a pool. Results come back in the same order as jobs, whatever order the workers finish in."""
+    if workers <= 1 or len(jobs) <= 1:
+        return [worker(job) for job in jobs]
+    pool_class = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+    with pool_class(max_workers=workers) as pool:
+        # map() yields in submission order; chunksize only matters for process pools
+        return list(pool.map(worker, jobs, chunksize=max(1, len(jobs) // (workers * 4))))
+
+
+def build_pages(specs, site_root, manifest, log=print, workers=1, use_processes=False, only=None, profile=None,
+                minify=True, compress=True):
+    """
+    Renders and writes every stale page in specs. Pages are stale when their inputs or the
+    output options changed, or the stylesheet they link is gone. only (a set of rel_paths)
+    limits which pages may be written; the others still contribute their classes to the shared
+    stylesheet. Written pages link the current fingerprinted stylesheet; unchanged ones keep
+    theirs, which already has all their classes.
+    minify/compress select minified HTML and .gz/.br variants (see output_stage.py).
+    Timings go to profile (a BuildProfile) when given. Returns (written, unchanged, errors, stylesheet).
+    """
+    profile = profile or BuildProfile()
+    for directory in {os.path.dirname(rel_path) for rel_path, _, _, _ in specs}:
+        os.makedirs(os.path.join(site_root, directory), exist_ok=True)
+
+    buildable = [spec for spec in specs if only is None or spec[0] in only]
+    stale = [spec for spec in buildable if manifest.inputs_changed(spec[0], spec[3])]
+    if stale:
+        log(f"Rendering {len(stale)} page{'s' if len(stale) != 1 else ''} ({workers} worker{'s' if workers != 1 else ''})...")
+
+    errors = []
+    rendered = {}
+
+    def render(jobs):
+        with profile.phase("render"):
+            for rel_path, html, error, seconds in run_jobs(_render_job, jobs, workers, use_processes):
+                profile.page(rel_path, render_seconds=seconds)
+                if error:
+                    errors.append((rel_path, error))
+                    log(f"Error: failed to render {rel_path}: {error}")
+                else:
+                    rendered[rel_path] = html
+
+    render([(rel_path, render_fn, args) for rel_path, render_fn, args, _ in stale])
+
+    # One stylesheet for the whole site: fresh classes from re-rendered pages, remembered ones for the rest
+    with profile.phase("stylesheet"):
+        page_classes = {
+            rel_path: sorted(extract_classes(rendered[rel_path])) if rel_path in rendered else manifest.classes(rel_path)
+            for rel_path, _, _, _ in specs
+        }
+        used_classes = set().union(*page_classes.values()) if page_classes else set()
+        css, unknown = compile_css(used_classes)
+        unknown = {c for c in unknown - COMPONENT_CLASSES if not c.startswith(NON_UTILITY_PREFIXES)}
+        if unknown:
+            log(f"Warning: no static CSS for classes: {', '.join(sorted(unknown))}")
+        css = minify_css(css)
+        filename, files, size = write_stylesheet(css, os.path.join(site_root, ASSET_DIR))
+        stylesheet = f"{ASSET_DIR}/{filename}"
+        profile.add_files("stylesheet", files, size)
+        profile.add_files("stylesheet", *refresh_variants(os.path.join(site_root, stylesheet), compress))
+
+    # Pages whose output options changed are re-rendered too (their classes are already known)
+    to_write = []
+    skipped = 0
+    failed = {rel_path for rel_path, _ in errors}
+    for rel_path, render_fn, args, inputs in buildable:
+        if rel_path in failed:
+            continue
+        digest = hash_inputs(inputs, {"minify": minify and MINIFY_VERSION, "compress": compress})
+        linked = manifest.stylesheet(rel_path)
+        if not manifest.needs_build(rel_path, digest) and linked and os.path.exists(os.path.join(site_root, linked)):
+            skipped += 1
+            continue
+        to_write.append((rel_path, render_fn, args, inputs, digest))
+
+    render([(rel_path, render_fn, args) for rel_path, render_fn, args, _, _ in to_write if rel_path not in rendered])
+
+    write_jobs = [
+        (site_root, rel_path, rendered[rel_path].replace(STYLESHEET_PLACEHOLDER, stylesheet), minify, compress)
+        for rel_path, _, _, _, _ in to_write if rel_path in rendered
+    ]
+    digests = {rel_path: (digest, inputs) for rel_path, _, _, inputs, digest in to_write}
+    count = 0
+    with profile.phase("write"):
+        for rel_path, error, seconds, (size, variant_files, variant_bytes) in run_jobs(_write_job, write_jobs, workers, use_processes):
+            profile.page(rel_path, write_seconds=seconds, bytes=size, compressed_bytes=variant_bytes)
+            if error:
+                errors.append((rel_path, error))
+                log(f"Error: failed to write {rel_path}: {error}")
+                continue
+            profile.add_files("write", 1 + variant_files, size + variant_bytes)
+            # Failed pages stay stale in the manifest so the next build retries them
+            digest, inputs = digests[rel_path]
+            manifest.record(rel_path, digest, inputs=inputs, classes=page_classes[rel_path], stylesheet=stylesheet)
+            count += 1
+    return count, skipped, errors, stylesheet
+
+
+def build_site(characters, site_root, state_dir, force=False, wiki_only=False, log=print,
+               workers=1, use_processes=False, optimize_images=True, avif=False, use_sprites=True, only=None, profile=None,
+               minify=True, compress=True):
+    """
+    Full site build: every stale character page plus wiki.html. only (a set of rel_paths,
+    e.g. {"characters/adelina-01.html"}) limits the build to those pages; wiki_only is only={"wiki.html"}.
+    minify only affects the HTML (shipped CSS/JS is always minified); compress adds .gz/.br variants.
+    Per-phase and per-page timings are recorded into profile (a BuildProfile) when given.
+    Returns (written, unchanged, errors).
+    """
+    profile = profile or BuildProfile()
+    if profile.profiling and workers > 1:
+        log("cProfile only sees the building thread, running with 1 worker.")
+        workers = 1
+    if wiki_only:
+        only = {"wiki.html"}
+    manifest = BuildManifest(state_dir, site_root, force=force)
+
+    # Stats extracted by the GUI; pages from older builds still carry them inline, pull those in first
+    with profile.phase("stats"):
+        stats = StatsStore(state_dir)
+        stats.import_legacy(site_root, characters, page_id, log=log)
+        stats.save()
+
+    optimizer = None
+    if optimize_images:
+        if image_pipeline.available():
+            with profile.phase("images"):
+                optimizer = image_pipeline.ImageOptimizer(site_root, state_dir, avif=avif, log=log)
+                # Partial builds link the variants the last full build made
+                if only is None:
+                    profile.add_files("images", *optimizer.prepare_folders(workers=workers))
+                    optimizer.prune()
+                    optimizer.save()
+        elif only is None:
+            log("Pillow is not installed, linking original images (pip install Pillow for WebP variants).")
+    if optimizer is None and only is None and gallery_links(site_root):
+        log("Warning: skipping the image galleries, their banners are only published as WebP variants (needs Pillow and the image stage).")
+
+    sprites = None
+    if use_sprites:
+        with profile.phase("sprites"):
+            icon_hashes = sprite_atlas.IconHashCache(site_root, state_dir)
+            sprites, files, size = sprite_atlas.build_atlas(site_root, ASSET_DIR, sprite_atlas.icon_files(site_root),
+                                                            log=log, hashes=icon_hashes)
+            profile.add_files("sprites", files, size)
+            if sprites:
+                profile.add_files("sprites", *refresh_variants(os.path.join(site_root, sprites["stylesheet"]), compress))
+            icon_hashes.save()
+
+    # Fingerprinted, so browsers can cache it for as long as the roster doesn't change
+    asset_path = os.path.join(site_root, ASSET_DIR)
+    # Shared CSS/JS of every page; the name only changes with the content
+    with profile.phase("bundle"):
+        for ext, content in COMMON_BUNDLES.items():
+            profile.add_files("bundle", *write_bundle(asset_path, "common", ext, content))
+            profile.add_files("bundle", *refresh_variants(os.path.join(asset_path, bundle_name("common", ext, content)), compress))
+    with profile.phase("search index"):
+        search_file, files, size = write_index(build_index(wiki_search_entries(characters)), asset_path)
+        profile.add_files("search index", files, size)
+        profile.add_files("search index", *refresh_variants(os.path.join(asset_path, search_file), compress))
+        search_index = f"{ASSET_DIR}/{search_file}"
+
+    # Portrait probing, image sizes and input digests of every page
+    with profile.phase("plan"):
+        image_sizes = ImageSizeCache(site_root, state_dir)
+        specs = plan_pages(characters, site_root, optimizer, sprites, image_sizes, stats, search_index)
+        image_sizes.save()
+    count, skipped, errors, stylesheet = build_pages(
+        specs, site_root, manifest, log, workers=workers, use_processes=use_processes, only=only, profile=profile,
+        minify=minify, compress=compress
+    )
+    with profile.phase("finish"):
+        manifest.save()
+        if not errors:
+            if only is None or "wiki.html" in only:
+                # Only wiki.html links the atlas and the search index, and it was just (re)built
+                if sprites:
+                    sprite_atlas.prune_atlases(asset_path, sprites["stylesheet"])
+                prune_indexes(asset_path, search_file)
+            if only is None:
+                # Unchanged pages keep the stylesheet they were written with; the rest can go
+                linked = manifest.stylesheets() | {stylesheet}
+                prune_stylesheets(asset_path, {os.path.basename(path) for path in linked})
+                # Every page links the current bundle now, older builds of it can go
+                prune_bundles(asset_path, "common", "css", COMMON_CSS_FILE)
+                prune_bundles(asset_path, "common", "js", COMMON_JS_FILE)
+    return count, skipped, errors
@@ -1,233 +1,45 @@
-import sys
-import os
-import re
-import json
-import base64
-import requests
-from PySide6.QtWidgets import (
+import time
+
+# Taken before the heavy imports below (PySide6 most of all), so the logged startup time includes them
+STARTUP_TIME = time.perf_counter()
+
+import sys  # noqa: E402
+import os  # noqa: E402
+import re  # noqa: E402
+import json  # noqa: E402
+import tempfile  # noqa: E402
+import threading  # noqa: E402
+from PySide6.QtWidgets import (  # noqa: E402
     QApplication, QMainWindow, QPushButton, QVBoxLayout, QHBoxLayout,
-    QWidget, QTextEdit, QLabel, QListWidget, QListWidgetItem,
+    QWidget, QTextEdit, QPlainTextEdit, QLabel, QListWidget, QListWidgetItem,
     QCheckBox, QAbstractItemView, QScrollArea, QGridLayout, QListView,
     QDialog, QDialogButtonBox, QComboBox, QFileDialog, QLineEdit,
-    QMessageBox
+    QMessageBox, QSpinBox, QProgressBar
 )
-from PySide6.QtCore import Qt, QSize, QBuffer, QIODevice
-from PySide6.QtGui import QIcon, QPixmap, QBrush
-
-# --- CONFIGURATION ---
-CHARACTER_GROUPS = [
-    "Stock Characters", "Cite Of Reboldouex", "Port Of Coimbra", "City of Auch",
-    "Ustiur", "Bahamar", "Los Toldos", "Katovic", "Gigante", "Unreleased", "Unknown"
-]
-CLASSIFICATIONS = ["Stock", "Scout", "Recruit"]
-
-# --- HTML TEMPLATES ---
-
-# 1. Shared Head Section (Tailwind Config & CSS for Glassmorphism)
-# FIX: Uses single braces { } because this string is NOT formatted by Python.
-COMMON_HEAD = """
-    <script src="https://cdn.tailwindcss.com"></script>
-    <link rel="preconnect" href="https://fonts.googleapis.com">
-    <link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>
-    <link href="https://fonts.googleapis.com/css2?family=Poppins:wght@400;500;600;700&family=Rajdhani:wght@600;700&display=swap" rel="stylesheet">
-    <script src="https://unpkg.com/@phosphor-icons/web"></script>
-    <script>
-        tailwind.config = {
-            theme: {
-                extend: {
-                    fontFamily: {
-                        sans: ['Poppins', 'sans-serif'],
-                        mono: ['Rajdhani', 'monospace'],
-                    },
-                    colors: {
-                        glass: {
-                            100: 'rgba(255, 255, 255, 0.1)',
-                            200: 'rgba(255, 255, 255, 0.2)',
-                            dark: 'rgba(15, 23, 42, 0.6)',
-                            darker: 'rgba(10, 15, 30, 0.8)',
-                        },
-                        accent: {
-                            gold: '#fbbf24',
-                            blue: '#38bdf8',
-                            green: '#4ade80',
-                            red: '#f87171'
-                        }
-                    }
-                }
-            }
-        }
-    </script>
-    <style>
-        body {
-            background-size: cover;
-            background-position: center center;
-            background-repeat: no-repeat;
-            background-attachment: fixed;
-            position: relative;
-            transition: background-image 0.8s ease-in-out;
-            min-height: 100vh;
-            color: #e2e8f0;
-        }
-        body::before {
-            content: '';
-            position: absolute;
-            top: 0;
-            left: 0;
-            right: 0;
-            bottom: 0;
-            background: linear-gradient(to bottom, rgba(15, 23, 42, 0.9), rgba(15, 23, 42, 0.7));
-            z-index: -1;
-        }
-        .glass-panel {
-            background: rgba(30, 41, 59, 0.7);
-            backdrop-filter: blur(16px);
-            -webkit-backdrop-filter: blur(16px);
-            border: 1px solid rgba(255, 255, 255, 0.08);
-            box-shadow: 0 8px 32px 0 rgba(0, 0, 0, 0.3);
-        }
-        .glass-card {
-            background: linear-gradient(145deg, rgba(255, 255, 255, 0.05) 0%, rgba(255, 255, 255, 0.02) 100%);
-            backdrop-filter: blur(12px);
-            border: 1px solid rgba(255, 255, 255, 0.05);
-            transition: transform 0.2s ease, background-color 0.2s ease;
-        }
-        .glass-card:hover {
-            transform: translateY(-2px);
-            background-color: rgba(255, 255, 255, 0.08);
-            border-color: rgba(255, 255, 255, 0.2);
-        }
-        /* Rarity Borders */
-        .border-stock { border-color: rgba(255, 255, 255, 0.2); }
-        .border-scout { border-color: #4ade80; box-shadow: 0 0 10px rgba(74, 222, 128, 0.2); }
-        .border-recruit { border-color: #fbbf24; box-shadow: 0 0 10px rgba(251, 191, 36, 0.2); }
-    </style>
-"""
+from PySide6.QtCore import Qt, QSize, QBuffer, QIODevice, QObject, QRunnable, QThread, QThreadPool, QTimer, Signal  # noqa: E402
+from PySide6.QtGui import QIcon, QPixmap, QBrush, QImage, QColor  # noqa: E402
 
-# 2. Main Wiki Page Template
-# FIX: Uses double braces {{ }} for JS because this string IS formatted by Python.
-WIKI_TEMPLATE = """
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Granado Espada M - Wiki</title>
-    {common_head}
-</head>
-<body class="antialiased p-4 sm:p-6">
-    <div class="max-w-[1600px] mx-auto">
-        <header class="flex flex-col md:flex-row items-center justify-between gap-6 mb-8 glass-panel rounded-2xl p-4 md:px-8">
-            <div class="flex items-center gap-4">
-                <img src="https://gem.playpark.com/wp-content/uploads/2024/11/1-gem-logo.png" alt="Granado Espada M" class="h-16 object-contain drop-shadow-[0_0_10px_rgba(255,255,255,0.2)]" onerror="this.onerror=null;this.src='https://i.imgur.com/kSTiS9s.png';">
-                <div class="hidden sm:block border-l border-white/10 pl-4">
-                    <h1 class="text-xl font-bold text-white tracking-wide">CHARACTER WIKI</h1>
-                    <p class="text-xs text-accent-blue font-medium tracking-wider uppercase">Database & Stats</p>
-                </div>
-            </div>
-            <a href="https://freischultz.github.io/unofficial_gem/index.html" class="flex items-center gap-2 bg-white/5 hover:bg-white/10 border border-white/5 hover:border-white/20 text-white px-5 py-2 rounded-lg text-sm font-bold uppercase tracking-wide transition-all group">
-                <i class="ph-bold ph-arrow-u-up-left group-hover:-translate-x-1 transition-transform"></i>
-                Back to Tracker
-            </a>
-        </header>
-
-        <div class="glass-panel rounded-2xl p-6 md:p-8 min-h-screen">
-            <div class="mb-8 flex items-center gap-4 pb-6 border-b border-white/5">
-                <div class="relative w-full max-w-md">
-                    <i class="ph-bold ph-magnifying-glass absolute left-3 top-1/2 -translate-y-1/2 text-gray-400"></i>
-                    <input type="text" placeholder="Search characters..." class="w-full bg-black/20 border border-white/10 rounded-lg py-2 pl-10 pr-4 text-sm text-white focus:outline-none focus:border-accent-blue transition-colors placeholder-gray-500">
-                </div>
-                <div class="text-xs text-gray-500 font-mono uppercase tracking-widest ml-auto">
-                    Database Version 1.0
-                </div>
-            </div>
-
-            <div class="space-y-10">
-                {character_sections}
-            </div>
-        </div>
-    </div>
-    <script>
-        document.addEventListener('DOMContentLoaded', () => {{
-            const backgrounds = ['https://gem.hanbiton.com/Brand2E/src/images/new-contents/event/bg.jpg'];
-            document.body.style.backgroundImage = `url(${{backgrounds[0]}})`;
-        }});
-    </script>
-</body>
-</html>
-"""
+from ai_extract import (  # noqa: E402
+    AICancelled, CACHE_DIR_NAME, DEFAULT_CACHE_MB, DEFAULT_CONCURRENCY, DEFAULT_ENDPOINT, DEFAULT_MODEL,
+    DEFAULT_PREPROCESS, ResponseCache, extract_stats
+)
+from build_profile import REPORT_NAME, BuildProfile  # noqa: E402
+from character_data import open_store  # noqa: E402
+from log_sink import FLUSH_INTERVAL, MAX_SCROLLBACK, LogSink  # noqa: E402
+from stats_store import StatsStore  # noqa: E402
+from site_render import (  # noqa: E402
+    CHARACTER_GROUPS, CLASSIFICATIONS, build_site, default_workers, page_id
+)
 
-# 3. Individual Character Page Template
-# FIX: Uses double braces {{ }} for JS because this string IS formatted by Python.
-CHARACTER_TEMPLATE = """
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Granado Espada M - {name}</title>
-    {common_head}
-</head>
-<body class="antialiased p-4 sm:p-6">
-    <div class="max-w-6xl mx-auto">
-        
-        <header class="flex flex-col md:flex-row items-center justify-between gap-6 mb-8 glass-panel rounded-2xl p-4 md:px-8">
-            <div class="flex items-center gap-4">
-                <img src="https://gem.playpark.com/wp-content/uploads/2024/11/1-gem-logo.png" alt="Granado Espada M" class="h-16 object-contain drop-shadow-[0_0_10px_rgba(255,255,255,0.2)]" onerror="this.onerror=null;this.src='https://i.imgur.com/kSTiS9s.png';">
-            </div>
-            <a href="https://freischultz.github.io/unofficial_gem/wiki.html" class="flex items-center gap-2 bg-white/5 hover:bg-white/10 border border-white/5 hover:border-white/20 text-white px-5 py-2 rounded-lg text-sm font-bold uppercase tracking-wide transition-all group">
-                <i class="ph-bold ph-arrow-u-up-left group-hover:-translate-x-1 transition-transform"></i>
-                Back to Wiki
-            </a>
-        </header>
-
-        <div class="glass-panel rounded-2xl p-8">
-            <div class="flex flex-col md:flex-row gap-8 items-start">
-                
-                <!-- Portrait Card -->
-                <div class="w-full md:w-1/3 flex flex-col items-center glass-card p-4 rounded-2xl">
-                    <img src="{image_path}" alt="{name}" class="w-full h-auto rounded-xl border-2 {border_class} shadow-lg mb-4">
-                    <h1 class="text-2xl font-bold text-white text-center">{name}</h1>
-                    <div class="mt-2 px-3 py-1 rounded-full bg-white/10 text-xs font-mono uppercase tracking-widest text-accent-blue">
-                        Character Profile
-                    </div>
-                </div>
-
-                <!-- Info Panel -->
-                <div class="w-full md:w-2/3">
-                    <h2 class="text-xl font-bold text-accent-gold uppercase tracking-widest mb-6 border-b border-white/10 pb-2">
-                        <i class="ph-fill ph-chart-bar"></i> Combat Statistics
-                    </h2>
-                    
-                    <div class="glass-card rounded-xl p-6">
-                        <!-- STATS_GO_HERE -->
-                        <div class="flex flex-col items-center justify-center py-12 text-center">
-                            <i class="ph-duotone ph-scroll text-4xl text-gray-500 mb-4"></i>
-                            <h3 class="text-lg font-semibold text-white">No Data Available</h3>
-                            <p class="text-sm text-gray-400 max-w-md mt-2">
-                                Detailed stats, stances, and recruitment data for {name} have not been uploaded yet. Use the admin tool to analyze screenshots.
-                            </p>
-                        </div>
-                    </div>
-                </div>
-            </div>
-        </div>
-    </div>
-    <script>
-        document.addEventListener('DOMContentLoaded', () => {{
-            const backgrounds = ['https://gem.hanbiton.com/Brand2E/src/images/new-contents/event/bg.jpg'];
-            document.body.style.backgroundImage = `url(${{backgrounds[0]}})`;
-        }});
-    </script>
-</body>
-</html>
-"""
+# Quiet period before a burst of edits is written to characters.json
+SAVE_DELAY_MS = 500
 
 # --- STYLESHEET FOR THE GUI ---
 STYLESHEET = """
 QWidget { font-family: 'Poppins', sans-serif; color: #E5E7EB; }
 QMainWindow, QDialog { background-color: #1a1b26; }
 QLabel { background: transparent; }
-QTextEdit, QListWidget, QLineEdit, QComboBox { background-color: rgba(42, 44, 61, 0.8); border: 1px solid #414558; border-radius: 8px; }
+QTextEdit, QPlainTextEdit, QListWidget, QLineEdit, QComboBox { background-color: rgba(42, 44, 61, 0.8); border: 1px solid #414558; border-radius: 8px; }
 QPushButton { background-color: #5c95c4; border: 1px solid #6e9cc4; padding: 10px; border-radius: 8px; font-weight: bold; }
 QPushButton:hover { background-color: #6e9cc4; }
 QPushButton:disabled { background-color: #414558; }
@@ -261,6 +73,95 @@ class SortDialog(QDialog):
     def get_ordered_names(self):
         return self.text_edit.toPlainText().splitlines()
 
+class AIJobSignals(QObject):
+    # Emitted from the pool thread, delivered on the GUI thread (queued connection)
+    progress = Signal(str, str)         # char_id, message
+    finished = Signal(str, bool, str, str)   # char_id, success, message, stats_html
+
+class AIUpdateJob(QRunnable):
+    """One character's stat extraction, run on MainWindow.ai_pool. The GUI thread stores the result."""
+    def __init__(self, char_id, files, temp_files, api_key, endpoint, model, cache=None, bypass_cache=False,
+                 preprocess=DEFAULT_PREPROCESS):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.char_id = char_id
+        self.files = list(files)
+        self.temp_files = list(temp_files)
+        self.api_key = api_key
+        self.endpoint = endpoint
+        self.model = model
+        self.cache = cache
+        self.bypass_cache = bypass_cache
+        self.preprocess = preprocess
+        self.cancel_event = threading.Event()
+        self.signals = AIJobSignals()
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def run(self):
+        try:
+            stats_html = extract_stats(
+                self.files, self.api_key, endpoint=self.endpoint, model=self.model,
+                cancel_event=self.cancel_event, progress=lambda message: self.signals.progress.emit(self.char_id, message),
+                cache=self.cache, bypass_cache=self.bypass_cache, preprocess=self.preprocess
+            )
+            if self.cancel_event.is_set():
+                raise AICancelled("Cancelled")
+            success, message = True, "AI analysis complete."
+        except AICancelled:
+            success, message, stats_html = False, "AI update cancelled.", ""
+        except Exception as e:
+            success, message, stats_html = False, f"An error occurred: {e}", ""
+
+        for file_path in self.temp_files:
+            try:
+                os.remove(file_path)
+            except OSError:
+                pass
+        # Last thing the job does: the GUI drops its reference to the job on this signal
+        self.signals.finished.emit(self.char_id, success, message, stats_html)
+
+class IconLoadSignals(QObject):
+    loaded = Signal(str, float, QImage)   # path, mtime, decoded image
+    scanned = Signal(list)                # icon file names found by a folder scan
+    finished = Signal()
+
+class IconLoadJob(QRunnable):
+    """Decodes a batch of icons off the GUI thread. QImage is thread safe, QPixmap is not."""
+    def __init__(self, paths):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.paths = list(paths)
+        self.signals = IconLoadSignals()
+
+    def run(self):
+        for path in self.paths:
+            try:
+                mtime = os.stat(path).st_mtime
+            except OSError:
+                continue
+            image = QImage(path)
+            if not image.isNull():
+                self.signals.loaded.emit(path, mtime, image)
+        self.signals.finished.emit()
+
+class IconScanJob(QRunnable):
+    """Lists the icon folder off the GUI thread; new characters are merged on the GUI thread."""
+    def __init__(self, icon_dir):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.icon_dir = icon_dir
+        self.signals = IconLoadSignals()
+
+    def run(self):
+        try:
+            filenames = [f for f in os.listdir(self.icon_dir) if f.endswith('.png')]
+        except OSError:
+            filenames = []
+        self.signals.scanned.emit(filenames)
+        self.signals.finished.emit()
+
 class CharacterEditDialog(QDialog):
     def __init__(self, char_id, char_data, api_key, parent=None):
         super().__init__(parent)
@@ -272,6 +173,8 @@ class CharacterEditDialog(QDialog):
         self.setGeometry(250, 250, 700, 500)
         self.setStyleSheet(STYLESHEET)
         self.selected_files = []
+        self.temp_files = []
+        self.job = None
 
         main_layout = QVBoxLayout(self)
         
@@ -303,6 +206,28 @@ class CharacterEditDialog(QDialog):
         self.update_button = QPushButton("Run AI Update")
         self.update_button.clicked.connect(self.run_ai_update)
         main_layout.addWidget(self.update_button)
+
+        self.bypass_cache_checkbox = QCheckBox("Bypass AI Cache (always send a new request)")
+        main_layout.addWidget(self.bypass_cache_checkbox)
+
+        # The job keeps running on the main window's pool if this dialog is closed
+        status_layout = QHBoxLayout()
+        self.ai_progress = QProgressBar()
+        self.ai_progress.setTextVisible(False)
+        self.ai_progress.setFixedHeight(8)
+        self.ai_status_label = QLabel("")
+        self.cancel_ai_button = QPushButton("Cancel")
+        self.cancel_ai_button.setFixedWidth(80)
+        self.cancel_ai_button.clicked.connect(self.cancel_ai_update)
+        status_layout.addWidget(self.ai_progress)
+        status_layout.addWidget(self.cancel_ai_button)
+        main_layout.addLayout(status_layout)
+        main_layout.addWidget(self.ai_status_label)
+        self.set_ai_running(False)
+
+        running_job = self.parent_window.ai_jobs.get(self.char_id)
+        if running_job:
+            self.attach_job(running_job)
         
         self.toggle_visibility_button = QPushButton()
         is_hidden = self.char_data.get("hidden", False)
@@ -330,11 +255,13 @@ class CharacterEditDialog(QDialog):
             return
 
         pixmap = QPixmap(clipboard.image())
-        # Use absolute path for temp file to avoid location issues
-        temp_path = os.path.join(self.parent_window.base_dir, "temp_clipboard_image.png")
+        # One temp file per paste, several AI jobs may hold pasted images at the same time
+        fd, temp_path = tempfile.mkstemp(prefix="clipboard_", suffix=".png")
+        os.close(fd)
         pixmap.save(temp_path, "PNG")
         
         self.selected_files.append(temp_path)
+        self.temp_files.append(temp_path)
         self.update_file_list()
         self.parent_window.log("Pasted image from clipboard.")
 
@@ -342,9 +269,9 @@ class CharacterEditDialog(QDialog):
         self.file_list.clear()
         self.file_list.addItems([os.path.basename(f) for f in self.selected_files])
 
-    def get_updated_data(self):
-        self.char_data['classification'] = self.class_combo.currentText()
-        return self.char_data
+    def get_changes(self):
+        """The fields this dialog edits, for MainWindow.update_character()."""
+        return {'classification': self.class_combo.currentText()}
 
     def toggle_visibility(self):
         is_hidden = self.char_data.get("hidden", False)
@@ -359,76 +286,100 @@ class CharacterEditDialog(QDialog):
 
     def run_ai_update(self):
         parent = self.parent_window
-        if not self.api_key:
-            parent.log("Error: API Key is required. Set it in the main window.")
-            return
         if not self.selected_files:
             parent.log("Error: Please upload or paste at least one image.")
             return
 
-        parent.log(f"Starting AI update for {self.char_data['name']}...")
-        self.update_button.setEnabled(False)
+        job = parent.start_ai_update(self.char_id, self.selected_files, self.temp_files,
+                                     bypass_cache=self.bypass_cache_checkbox.isChecked())
+        if job:
+            # The job owns (and deletes) the pasted temp files from here on
+            self.selected_files = []
+            self.temp_files = []
+            self.update_file_list()
+            self.attach_job(job)
 
-        try:
-            image_parts = []
-            for file_path in self.selected_files:
-                with open(file_path, "rb") as image_file:
-                    encoded_string = base64.b64encode(image_file.read()).decode('utf-8')
-                    image_parts.append({"inline_data": {"mime_type": "image/jpeg", "data": encoded_string}})
-
-            prompt = "Analyze the attached image(s) of a character's stats from Granado Espada M. Extract all Basic Stats and Stance Information. Format the output as a clean, well-structured HTML snippet using TailwindCSS classes. The final output should be ONLY the HTML code, without any markdown formatting. Use a structure like this: <div class='space-y-4'><div><h3 class='text-lg font-semibold text-amber-200'>Basic Stats</h3>...</div><div><h3 class='text-lg font-semibold text-amber-200'>Stance Information</h3>...</div></div>"
-
-            api_url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-2.5-pro:generateContent?key={self.api_key}"
-            payload = {"contents": [{"parts": [{"text": prompt}] + image_parts}]}
-            headers = {"Content-Type": "application/json"}
-            response = requests.post(api_url, headers=headers, json=payload, timeout=60)
-            response.raise_for_status()
-            
-            result = response.json()
-            ai_generated_html = result['candidates'][0]['content']['parts'][0]['text']
-            
-            parent.log("AI analysis complete. Updating HTML file...")
+    def attach_job(self, job):
+        self.job = job
+        job.signals.progress.connect(self.on_ai_progress)
+        job.signals.finished.connect(self.on_ai_finished)
+        self.ai_status_label.setText("Queued...")
+        self.set_ai_running(True)
 
-            # Use site_root to find characters folder
-            clean_id = self.char_id.replace("spr-icon-pc-", "")
-            char_html_path = os.path.join(parent.site_root, "characters", f"{clean_id}.html")
-            
-            if os.path.exists(char_html_path):
-                with open(char_html_path, 'r', encoding='utf-8') as f:
-                    html_content = f.read()
-                
-                updated_content = re.sub(r'<!-- STATS_GO_HERE -->.*', f'<!-- STATS_GO_HERE -->{ai_generated_html}', html_content, flags=re.DOTALL)
-                
-                with open(char_html_path, 'w', encoding='utf-8') as f:
-                    f.write(updated_content)
-                
-                parent.log(f"Successfully updated {char_html_path}")
-            else:
-                parent.log(f"Error: Could not find HTML file: {char_html_path}")
-
-        except Exception as e:
-            parent.log(f"An error occurred: {e}")
-        finally:
-            self.update_button.setEnabled(True)
-            for file_path in self.selected_files:
-                if "temp_clipboard_image.png" in file_path and os.path.exists(file_path):
-                    try:
-                        os.remove(file_path)
-                    except:
-                        pass
+    def detach_job(self):
+        if not self.job:
+            return
+        try:
+            self.job.signals.progress.disconnect(self.on_ai_progress)
+            self.job.signals.finished.disconnect(self.on_ai_finished)
+        except (RuntimeError, TypeError):
+            pass
+        self.job = None
+
+    def set_ai_running(self, running):
+        self.update_button.setEnabled(not running)
+        self.cancel_ai_button.setVisible(running)
+        self.ai_progress.setVisible(running)
+        # Busy indicator: the request has no measurable progress
+        self.ai_progress.setRange(0, 0 if running else 1)
+
+    def cancel_ai_update(self):
+        if self.job:
+            self.job.cancel()
+            self.ai_status_label.setText("Cancelling...")
+            self.cancel_ai_button.setEnabled(False)
+
+    def on_ai_progress(self, char_id, message):
+        self.ai_status_label.setText(message)
+
+    def on_ai_finished(self, char_id, success, message, stats_html):
+        self.detach_job()
+        self.ai_status_label.setText(message)
+        self.cancel_ai_button.setEnabled(True)
+        self.set_ai_running(False)
+
+    def done(self, result):
+        self.detach_job()
+        for file_path in self.temp_files:
+            if os.path.exists(file_path):
+                os.remove(file_path)
+        self.temp_files = []
+        super().done(result)
 
 class MainWindow(QMainWindow):
-    def __init__(self):
+    def __init__(self, startup_time=None, base_dir=None):
+        """base_dir (config.json, the roster and build state) defaults to the script's folder."""
         super().__init__()
+        # perf_counter() at launch (STARTUP_TIME when run as a script), for the "window interactive" log line
+        self.startup_time = startup_time if startup_time is not None else time.perf_counter()
         self.setWindowTitle("Granado Espada M - Wiki Page Generator")
         self.setGeometry(100, 100, 1400, 900)
         self.characters = {}
         self.group_lists = {}
         self.sort_buttons = {}
         self.config = {}
+        # Background AI extraction, at most ai_concurrency requests in flight
+        self.ai_pool = QThreadPool(self)
+        self.ai_pool.setMaxThreadCount(DEFAULT_CONCURRENCY)
+        self.ai_jobs = {}
+        self.ai_cache = None
+        # Debounced character store writes, see save_character_data()
+        self.save_timer = QTimer(self)
+        self.save_timer.setSingleShot(True)
+        self.save_timer.setInterval(SAVE_DELAY_MS)
+        self.save_timer.timeout.connect(self.flush_character_data)
+        # Decoded list icons {path: (mtime, QIcon)} and the list item of every character
+        self.icon_cache = {}
+        self.list_items = {}
+        # Startup: icons are decoded in batches on icon_pool while the window is already usable
+        self.icon_pool = QThreadPool(self)
+        self.icon_jobs = []
+        self.pending_icons = {}
+        self.placeholder_icon = None
+        self.icon_load_start = None
         
         # --- DYNAMIC PATH RESOLUTION ---
-        self.base_dir = os.path.dirname(os.path.abspath(__file__))
+        self.base_dir = base_dir or os.path.dirname(os.path.abspath(__file__))
         
         # Attempt to detect site root (where 'http' folder content is)
         # 1. Check if 'http' folder exists in current dir (script is in root)
@@ -468,14 +419,34 @@ class MainWindow(QMainWindow):
         self.edit_mode_checkbox.toggled.connect(self.toggle_edit_mode)
         
         self.save_button = QPushButton("Save Character Data")
-        self.save_button.clicked.connect(self.save_character_data)
+        self.save_button.clicked.connect(lambda: self.save_character_data(immediate=True))
         self.save_button.hide()
         
         self.generate_button = QPushButton("Generate HTML Pages")
         self.generate_button.clicked.connect(self.run_generation_process)
+
+        self.force_rebuild_checkbox = QCheckBox("Force Full Rebuild")
+        # Writes build_profile.json next to the script, see build_profile.py
+        self.profile_checkbox = QCheckBox("Profile Build")
+        # Also runs cProfile into build_profile.pstats (single worker, so it sees the whole build)
+        self.pstats_checkbox = QCheckBox("Collect cProfile Stats")
+        self.pstats_checkbox.toggled.connect(lambda checked: checked and self.profile_checkbox.setChecked(True))
+
+        self.workers_spinbox = QSpinBox()
+        self.workers_spinbox.setRange(1, 64)
+        self.workers_spinbox.setValue(default_workers())
+        self.workers_spinbox.valueChanged.connect(self.save_config)
         
-        self.log_display = QTextEdit()
+        # Messages go through log_sink and reach the widget in batches, at most every FLUSH_INTERVAL
+        self.log_display = QPlainTextEdit()
         self.log_display.setReadOnly(True)
+        self.log_display.setMaximumBlockCount(MAX_SCROLLBACK)
+        self.log_sink = LogSink()
+        self.last_log_flush = 0.0
+        self.log_timer = QTimer(self)
+        self.log_timer.setInterval(int(FLUSH_INTERVAL * 1000))
+        self.log_timer.timeout.connect(self.flush_log)
+        self.log_timer.start()
         
         left_layout.addWidget(title_label)
         left_layout.addWidget(QLabel("Global API Key:"))
@@ -483,6 +454,11 @@ class MainWindow(QMainWindow):
         left_layout.addWidget(self.edit_mode_checkbox)
         left_layout.addWidget(self.save_button)
         left_layout.addWidget(self.generate_button)
+        left_layout.addWidget(self.force_rebuild_checkbox)
+        left_layout.addWidget(self.profile_checkbox)
+        left_layout.addWidget(self.pstats_checkbox)
+        left_layout.addWidget(QLabel("Build Workers:"))
+        left_layout.addWidget(self.workers_spinbox)
         left_layout.addWidget(QLabel("Logs:"))
         left_layout.addWidget(self.log_display)
         
@@ -548,25 +524,47 @@ class MainWindow(QMainWindow):
 
         self.load_config()
         self.load_character_data()
-        self.populate_lists()
+        self.populate_lists(defer_icons=True)
         self.toggle_edit_mode(False)
+        # Runs once the event loop is up, i.e. right after the window is shown
+        QTimer.singleShot(0, self.start_background_loading)
 
     def log(self, message):
-        self.log_display.append(message)
-        QApplication.processEvents()
+        self.log_sink(message)
+        # Long synchronous work on the GUI thread (builds) starves log_timer; flush at the capped rate from here
+        if QThread.currentThread() == self.thread() and time.perf_counter() - self.last_log_flush >= FLUSH_INTERVAL:
+            self.flush_log()
+            QApplication.processEvents()
+
+    def flush_log(self):
+        messages = self.log_sink.drain()
+        self.last_log_flush = time.perf_counter()
+        if messages:
+            self.log_display.appendPlainText("\n".join(messages))
 
     def load_config(self):
         config_path = os.path.join(self.base_dir, "config.json")
         if os.path.exists(config_path):
             with open(config_path, 'r') as f:
                 self.config = json.load(f)
+            # Both widgets save the config when they change; don't let one write the other's default over the file
+            for widget in (self.api_key_input, self.workers_spinbox):
+                widget.blockSignals(True)
             self.api_key_input.setText(self.config.get("api_key", ""))
+            self.workers_spinbox.setValue(self.config.get("build_workers", default_workers()))
+            for widget in (self.api_key_input, self.workers_spinbox):
+                widget.blockSignals(False)
+            self.ai_pool.setMaxThreadCount(max(1, self.config.get("ai_concurrency", DEFAULT_CONCURRENCY)))
+            if self.config.get("log_file"):
+                # Relative paths are next to the script, like config.json
+                self.log_sink.open_file(os.path.join(self.base_dir, self.config["log_file"]))
             self.log("Loaded config.")
         else:
             self.log(f"Config not found at {config_path}")
 
     def save_config(self):
         self.config['api_key'] = self.api_key_input.text()
+        self.config['build_workers'] = self.workers_spinbox.value()
         config_path = os.path.join(self.base_dir, "config.json")
         with open(config_path, 'w') as f:
             json.dump(self.config, f, indent=4)
@@ -584,32 +582,69 @@ class MainWindow(QMainWindow):
         self.log(f"Script running in: {self.base_dir}")
         self.log(f"Site Assets Root: {self.site_root}")
         
-        # JSON is in base_dir
-        char_json_path = os.path.join(self.base_dir, "characters.json")
-        if os.path.exists(char_json_path):
-            with open(char_json_path, 'r') as f:
-                self.characters = json.load(f)
-            self.log(f"Loaded existing data from characters.json")
+        # Roster is in base_dir; "data_file" in config.json can point to a SQLite store (characters.db)
+        data_file = self.config.get("data_file", "characters.json")
+        self.store = open_store(os.path.join(self.base_dir, data_file))
+        self.characters = self.store.load_all()
+        if self.characters:
+            self.log(f"Loaded existing data from {data_file}")
         
-        # Icons are in site_root/images/icons
+        # New icons in site_root/images/icons are picked up by scan_icon_folder() in the background
+
+    def start_background_loading(self):
+        self.log(f"Window interactive after {(time.perf_counter() - self.startup_time) * 1000:.0f} ms.")
+        self.icon_load_start = time.perf_counter()
+
         icon_dir = os.path.join(self.site_root, "images", "icons")
-        
         if not os.path.exists(icon_dir):
             self.log(f"Warning: '{icon_dir}' not found. No characters will be loaded.")
-            return
-            
+        else:
+            scan = IconScanJob(icon_dir)
+            scan.signals.scanned.connect(self.merge_new_icons)
+            self.run_icon_job(scan)
+        self.load_pending_icons()
+
+    def run_icon_job(self, job):
+        job.signals.finished.connect(lambda: self.icon_job_finished(job))
+        self.icon_jobs.append(job)
+        self.icon_pool.start(job)
+
+    def icon_job_finished(self, job):
+        self.icon_jobs.remove(job)
+        if not self.icon_jobs and self.icon_load_start is not None:
+            self.log(f"Loaded {len(self.icon_cache)} icons in {(time.perf_counter() - self.icon_load_start) * 1000:.0f} ms.")
+            self.icon_load_start = None
+
+    def load_pending_icons(self, batch_size=16):
+        """Queues every icon still showing a placeholder, in small batches so the lists fill in progressively."""
+        paths = [path for path in self.pending_icons if path not in self.icon_cache]
+        for start in range(0, len(paths), batch_size):
+            job = IconLoadJob(paths[start:start + batch_size])
+            job.signals.loaded.connect(self.on_icon_loaded)
+            self.run_icon_job(job)
+
+    def on_icon_loaded(self, path, mtime, image):
+        icon = QIcon(QPixmap.fromImage(image))
+        self.icon_cache[path] = (mtime, icon)
+        for char_id in self.pending_icons.pop(path, []):
+            item = self.find_list_item(char_id)
+            if item is not None:
+                list_widget = item.listWidget()
+                list_widget.blockSignals(True)
+                item.setIcon(icon)
+                list_widget.blockSignals(False)
+
+    def merge_new_icons(self, filenames):
         new_chars_found = False
-        for filename in os.listdir(icon_dir):
-            if not filename.endswith('.png'): continue
-            
+        for filename in filenames:
             char_id = os.path.splitext(filename)[0].lower().replace('_', '-')
             if char_id not in self.characters:
-                new_chars_found = True
                 parsed_info = self.parse_filename(filename)
                 if not parsed_info:
                     self.log(f"Skipping unrecognized icon: {filename}")
                     continue
                 
+                new_chars_found = True
                 self.log(f"New character found: {parsed_info['name']}")
                 self.characters[char_id] = {
                     "name": parsed_info['name'],
@@ -620,50 +655,142 @@ class MainWindow(QMainWindow):
                     "classification": "Stock",
                     "hidden": False
                 }
+                self.update_character_item(char_id)
         if new_chars_found:
             self.save_character_data()
 
-    def save_character_data(self):
-        self.log("Saving changes to characters.json...")
+    def save_character_data(self, immediate=False):
+        """
+        Takes the groups from the lists and schedules a write of the character store. Bursts of edits
+        share one write SAVE_DELAY_MS after the last of them; immediate writes right away.
+        """
         for group_name, list_widget in self.group_lists.items():
             for i in range(list_widget.count()):
                 item = list_widget.item(i)
                 char_id = item.data(Qt.UserRole)
                 if char_id in self.characters:
                     self.characters[char_id]['group'] = group_name
-        
-        char_json_path = os.path.join(self.base_dir, "characters.json")
-        with open(char_json_path, 'w') as f:
-            json.dump(self.characters, f, indent=4)
-        self.log("Save complete.")
 
-    def populate_lists(self):
+        if immediate:
+            self.flush_character_data()
+        else:
+            self.save_timer.start()
+
+    def flush_character_data(self):
+        self.save_timer.stop()
+        # The SQLite store only writes the rows that changed
+        if self.store.save_all(self.characters):
+            self.log(f"Saved {os.path.basename(self.store.path)}.")
+
+    def update_character(self, char_id, **fields):
+        """
+        Applies an edit to one character. With SQLite just that row is written right away; the
+        JSON file is rewritten as a whole, so there (and for characters the store doesn't have
+        yet) the edit joins the debounced save.
+        """
+        self.characters[char_id].update(fields)
+        if not (self.store.RECORD_UPDATES and self.store.update(char_id, **fields)):
+            self.save_character_data()
+
+    def get_icon(self, icon_path):
+        """Decoded icon for icon_path, cached until the file's mtime changes. None if the file is missing."""
+        try:
+            mtime = os.stat(icon_path).st_mtime
+        except OSError:
+            return None
+        cached = self.icon_cache.get(icon_path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        icon = QIcon(QPixmap(icon_path))
+        self.icon_cache[icon_path] = (mtime, icon)
+        return icon
+
+    def get_placeholder_icon(self):
+        if self.placeholder_icon is None:
+            pixmap = QPixmap(64, 64)
+            pixmap.fill(QColor("#414558"))
+            self.placeholder_icon = QIcon(pixmap)
+        return self.placeholder_icon
+
+    def apply_item_data(self, item, char_id, defer_icon=False):
+        """
+        Copies name, icon, sort order and hidden state of char_id onto its list item.
+        With defer_icon, icons that are not cached yet get a placeholder and are queued for the icon pool.
+        """
+        data = self.characters[char_id]
+        # Load icon from site_root/images/icons
+        icon_path = os.path.join(self.site_root, "images", "icons", data['icon'])
+        if defer_icon and icon_path not in self.icon_cache:
+            self.pending_icons.setdefault(icon_path, []).append(char_id)
+            icon = self.get_placeholder_icon()
+        else:
+            icon = self.get_icon(icon_path)
+        item.setText(data['name'])
+        item.setIcon(icon if icon else QIcon())
+        item.setData(Qt.UserRole, char_id)
+        item.setData(Qt.UserRole + 1, data.get('sort_order', 999))
+        if data.get('hidden', False):
+            item.setForeground(QBrush(Qt.gray))
+        else:
+            # Back to the stylesheet colour (an empty QBrush would paint no text at all)
+            item.setData(Qt.ForegroundRole, None)
+        if self.edit_mode_checkbox.isChecked():
+            item.setFlags(item.flags() | Qt.ItemIsEditable)
+
+    def populate_lists(self, defer_icons=False):
+        """Full rebuild of every group list; after edits use update_character_item() instead."""
         for list_widget in self.group_lists.values():
+            list_widget.blockSignals(True)
             list_widget.clear()
+        self.list_items = {}
         
         for char_id, data in self.characters.items():
             group = data.get("group", "Unknown")
             if group in self.group_lists:
-                # Load icon from site_root/images/icons
-                icon_path = os.path.join(self.site_root, "images", "icons", data['icon'])
-                
-                if os.path.exists(icon_path):
-                    item = QListWidgetItem(QIcon(icon_path), data['name'])
-                else:
-                    item = QListWidgetItem(data['name'])
-                    
-                item.setData(Qt.UserRole, char_id)
-                item.setData(Qt.UserRole + 1, data.get('sort_order', 999))
-
-                if data.get('hidden', False):
-                    brush = QBrush(Qt.gray)
-                    item.setForeground(brush)
-                
+                item = QListWidgetItem()
+                self.apply_item_data(item, char_id, defer_icon=defer_icons)
                 self.group_lists[group].addItem(item)
+                self.list_items[char_id] = item
         
         for list_widget in self.group_lists.values():
             list_widget.sortItems()
+            list_widget.blockSignals(False)
+
+    def find_list_item(self, char_id):
+        item = self.list_items.get(char_id)
+        try:
+            if item is not None and item.listWidget() is not None and item.data(Qt.UserRole) == char_id:
+                return item
+        except RuntimeError:
+            pass  # Drag & drop moves delete the original item and insert a copy
+        for list_widget in self.group_lists.values():
+            for i in range(list_widget.count()):
+                if list_widget.item(i).data(Qt.UserRole) == char_id:
+                    return list_widget.item(i)
+        return None
+
+    def update_character_item(self, char_id):
+        """Refreshes one character's list item in place, moving it if its group changed."""
+        data = self.characters.get(char_id)
+        item = self.find_list_item(char_id)
+        target = self.group_lists.get(data.get("group", "Unknown")) if data else None
+
+        if item is not None and item.listWidget() is not target:
+            source = item.listWidget()
+            item = source.takeItem(source.row(item))
+        if target is None:
+            self.list_items.pop(char_id, None)
+            return
 
+        target.blockSignals(True)
+        if item is None:
+            item = QListWidgetItem()
+        self.apply_item_data(item, char_id)
+        if item.listWidget() is None:
+            target.addItem(item)
+        target.sortItems()
+        target.blockSignals(False)
+        self.list_items[char_id] = item
 
     def toggle_edit_mode(self, checked):
         self.log(f"Edit mode {'enabled' if checked else 'disabled'}.")
@@ -685,15 +812,17 @@ class MainWindow(QMainWindow):
         new_name = item.text()
         if char_id in self.characters and self.characters[char_id]['name'] != new_name:
             self.log(f"Renamed '{self.characters[char_id]['name']}' to '{new_name}'")
-            self.characters[char_id]['name'] = new_name
+            self.update_character(char_id, name=new_name)
             
     def open_sort_dialog(self, group_name):
-        chars_in_group = [data for data in self.characters.values() if data.get('group') == group_name]
-        dialog = SortDialog(group_name, chars_in_group, self)
+        # Pending list moves first, so the store's group query sees the current members
+        self.save_character_data(immediate=True)
+        members = self.store.by_group(group_name, include_hidden=True)
+        dialog = SortDialog(group_name, [data for _, data in members], self)
         
         if dialog.exec():
             ordered_names = dialog.get_ordered_names()
-            name_to_id_map = {data['name']: char_id for char_id, data in self.characters.items()}
+            name_to_id_map = {data['name']: char_id for char_id, data in members}
             
             for i, name in enumerate(ordered_names):
                 char_id = name_to_id_map.get(name)
@@ -701,7 +830,10 @@ class MainWindow(QMainWindow):
                     self.characters[char_id]['sort_order'] = i
             
             self.log(f"Updated sort order for group '{group_name}'.")
-            self.populate_lists()
+            for char_id, _ in members:
+                self.update_character_item(char_id)
+            # One write for the whole group; SQLite only touches the rows whose order changed
+            self.save_character_data()
             
     def open_edit_dialog(self, item):
         char_id = item.data(Qt.UserRole)
@@ -710,151 +842,126 @@ class MainWindow(QMainWindow):
         
         dialog = CharacterEditDialog(char_id, char_data, self.api_key_input.text(), self)
         if dialog.exec():
-            # This block now only runs if Save is clicked, not after visibility toggle
-            self.characters[char_id] = dialog.get_updated_data()
-            self.save_character_data()
-            self.populate_lists()
-            self.log(f"Updated settings for {char_data['name']}.")
+            # Also runs after the visibility toggle, which has already saved its own change
+            changes = {key: value for key, value in dialog.get_changes().items() if char_data.get(key) != value}
+            if changes:
+                self.update_character(char_id, **changes)
+                self.update_character_item(char_id)
+                self.log(f"Updated settings for {char_data['name']}.")
 
     def handle_toggle_visibility(self, char_id):
         if char_id in self.characters:
             char_data = self.characters[char_id]
             is_hidden = char_data.get('hidden', False)
-            char_data['hidden'] = not is_hidden
             
             action = "shown" if is_hidden else "hidden"
             self.log(f"Character '{char_data['name']}' is now {action}.")
             
-            self.save_character_data()
-            self.populate_lists()
+            self.update_character(char_id, hidden=not is_hidden)
+            self.update_character_item(char_id)
             self.generate_main_wiki_page()
 
-    def generate_main_wiki_page(self):
-        """Generates only the main wiki.html file."""
-        self.log("Generating main wiki page...")
-        all_sections_html = ""
-        classification_map = {
-            "Stock": "border-stock",
-            "Scout": "border-scout",
-            "Recruit": "border-recruit"
-        }
-        
-        # Icon mapping for headers
-        icon_map = {
-            "Stock Characters": "ph-users-three",
-            "Cite Of Reboldouex": "ph-buildings",
-            "Port Of Coimbra": "ph-anchor",
-            "City of Auch": "ph-city",
-            "Ustiur": "ph-tree-palm",
-            "Bahamar": "ph-mountains",
-            "Los Toldos": "ph-skull",
-            "Katovic": "ph-snowflake",
-            "Gigante": "ph-island",
-            "Unreleased": "ph-lock-key",
-            "Unknown": "ph-question"
-        }
-        
-        # Color mapping for headers
-        color_map = {
-            "Stock Characters": "text-accent-gold",
-            "Unreleased": "text-accent-red",
-            "Unknown": "text-gray-500"
-        }
+    def start_ai_update(self, char_id, files, temp_files=(), bypass_cache=False):
+        """Queues an AI stat update for char_id. Returns the job, or None if it could not be started."""
+        char_data = self.characters[char_id]
+        api_key = self.api_key_input.text()
+        if not api_key:
+            self.log("Error: API Key is required. Set it in the main window.")
+            return None
+        if char_id in self.ai_jobs:
+            self.log(f"An AI update for {char_data['name']} is already running.")
+            return None
+
+        job = AIUpdateJob(
+            char_id, files, temp_files, api_key,
+            endpoint=self.config.get("ai_endpoint", DEFAULT_ENDPOINT), model=self.config.get("ai_model", DEFAULT_MODEL),
+            cache=self.get_ai_cache(), bypass_cache=bypass_cache,
+            # config "ai_preprocess" overrides individual keys, e.g. {"max_side": 2048, "crop": [0.5, 0, 1, 1]}
+            preprocess={**DEFAULT_PREPROCESS, **self.config.get("ai_preprocess", {})}
+        )
+        job.signals.progress.connect(self.on_ai_progress)
+        job.signals.finished.connect(self.on_ai_finished)
+        self.ai_jobs[char_id] = job
+        self.log(f"Starting AI update for {char_data['name']}...")
+        self.ai_pool.start(job)
+        return job
+
+    def get_ai_cache(self):
+        if self.ai_cache is None:
+            max_mb = self.config.get("ai_cache_mb", DEFAULT_CACHE_MB)
+            self.ai_cache = ResponseCache(os.path.join(self.base_dir, CACHE_DIR_NAME), max_mb * 1024 * 1024)
+        return self.ai_cache
+
+    def on_ai_progress(self, char_id, message):
+        self.log(f"[{self.characters[char_id]['name']}] {message}")
+
+    def on_ai_finished(self, char_id, success, message, stats_html):
+        job = self.ai_jobs.pop(char_id, None)
+        name = self.characters[char_id]['name']
+        self.log(f"[{name}] {message}")
+        if not success:
+            return
 
-        for group_name in CHARACTER_GROUPS:
-            # Filter out hidden characters
-            chars_in_group = [c for c in self.characters.values() if c['group'] == group_name and not c.get('hidden', False)]
-            if not chars_in_group: continue
-
-            icon_class = icon_map.get(group_name, "ph-caret-right")
-            color_class = color_map.get(group_name, "text-accent-blue")
-
-            section_html = f"""
-            <section>
-                <h2 class="text-lg font-bold {color_class} uppercase tracking-widest mb-4 flex items-center gap-2">
-                    <i class="ph-fill {icon_class}"></i> {group_name}
-                </h2>
-                <div class="grid grid-cols-2 sm:grid-cols-4 md:grid-cols-6 lg:grid-cols-8 xl:grid-cols-10 gap-4">
-            """
-            
-            links_html = ""
-            sorted_chars = sorted(chars_in_group, key=lambda x: x.get('sort_order', 999))
+        # stats.json is the source of truth; the page is re-rendered from it like any other build
+        stats = StatsStore(self.base_dir)
+        # Creating stats.json ends the one-time legacy import, so it has to run before the first save
+        stats.import_legacy(self.site_root, self.characters, page_id, log=self.log)
+        stats.set(char_id, stats_html, model=job.model if job else None)
+        stats.save()
+        page = f"characters/{page_id(char_id)}.html"
+        count, skipped, errors = build_site(self.characters, self.site_root, self.base_dir, log=self.log, only={page})
+        if not errors:
+            self.log(f"[{name}] Stats saved to stats.json and {page} updated.")
+
+    def closeEvent(self, event):
+        # Running requests can't be interrupted mid-flight, but no new attempt starts after cancel
+        for job in self.ai_jobs.values():
+            job.cancel()
+        self.ai_pool.waitForDone()
+        self.icon_pool.waitForDone()
+        if self.save_timer.isActive():
+            self.flush_character_data()
+        self.store.close()
+        self.flush_log()
+        self.log_sink.close()
+        super().closeEvent(event)
 
-            for char_data in sorted_chars:
-                border_class = classification_map.get(char_data.get("classification", "Stock"))
-                char_id = os.path.splitext(char_data['icon'])[0].lower().replace('_', '-')
-                clean_id = char_id.replace("spr-icon-pc-", "")
-                
-                # Add opacity for unreleased
-                extra_classes = "opacity-70 hover:opacity-100" if group_name == "Unreleased" else ""
-                img_classes = "grayscale group-hover:grayscale-0 transition-all" if group_name == "Unreleased" else "group-hover:scale-110 transition-transform"
-                text_classes = "text-gray-400" if group_name == "Unreleased" else "text-gray-300"
-
-                links_html += f"""
-                    <a href="characters/{clean_id}.html" class="glass-card p-3 rounded-xl flex flex-col items-center gap-3 group text-center {extra_classes}">
-                        <img src="images/icons/{char_data['icon']}" class="w-16 h-16 rounded-lg border-2 {border_class} {img_classes}">
-                        <span class="text-xs font-semibold {text_classes} group-hover:text-white truncate w-full">{char_data['name']}</span>
-                    </a>
-                """
-            links_html += '</div></section>'
-            all_sections_html += section_html + links_html
-
-        wiki_content = WIKI_TEMPLATE.format(
-            common_head=COMMON_HEAD,
-            character_sections=all_sections_html
-        )
-        with open(os.path.join(self.site_root, "wiki.html"), 'w', encoding='utf-8') as f:
-            f.write(wiki_content)
-        self.log("Main wiki page generation complete.")
+    def generate_main_wiki_page(self):
+        """Generates only the main wiki.html file."""
+        build_site(self.characters, self.site_root, self.base_dir, wiki_only=True, log=self.log)
 
     def run_generation_process(self):
         """Generates all individual character pages."""
         self.log("--- Starting HTML Generation ---")
         self.generate_button.setEnabled(False)
-        
-        # Output folder is site_root/characters
-        char_dir = os.path.join(self.site_root, "characters")
-        if not os.path.exists(char_dir):
-            os.makedirs(char_dir)
-        
-        classification_map = {
-            "Stock": "border-stock",
-            "Scout": "border-scout",
-            "Recruit": "border-recruit"
-        }
 
-        count = 0
-        for char_id, data in self.characters.items():
-            self.log(f"Generating page for {data['name']}...")
-            portrait_filename = data['icon'].replace("SPR_Icon", "IMG_Portrait")
-            
-            # Check for portrait in site_root/images/portrait
-            full_portrait_path = os.path.join(self.site_root, "images", "portrait", portrait_filename)
-            
-            # HTML path remains relative for browser
-            image_path = f"../images/portrait/{portrait_filename}" if os.path.exists(full_portrait_path) else f"../images/icons/{data['icon']}"
-            
-            border_class = classification_map.get(data.get("classification", "Stock"))
-            
-            content = CHARACTER_TEMPLATE.format(
-                common_head=COMMON_HEAD,
-                name=data['name'],
-                image_path=image_path,
-                border_class=border_class
-            )
-            
-            clean_id = char_id.replace("spr-icon-pc-", "")
-            with open(os.path.join(char_dir, f"{clean_id}.html"), 'w', encoding='utf-8') as f:
-                f.write(content)
-            count += 1
-            
-        self.generate_main_wiki_page()
+        profile = None
+        if self.profile_checkbox.isChecked() or self.pstats_checkbox.isChecked():
+            report_path = os.path.join(self.base_dir, REPORT_NAME)
+            pstats_path = os.path.splitext(report_path)[0] + ".pstats" if self.pstats_checkbox.isChecked() else None
+            profile = BuildProfile(pstats_path=pstats_path)
+
+        # Pages are rendered on a worker pool; only the summary and per-page errors reach the log
+        count, skipped, errors = build_site(
+            self.characters, self.site_root, self.base_dir,
+            force=self.force_rebuild_checkbox.isChecked(), log=self.log,
+            workers=self.workers_spinbox.value(), profile=profile
+        )
 
-        self.log(f"--- HTML Generation Complete ({count} pages) ---")
+        failed = f", {len(errors)} failed" if errors else ""
+        self.log(f"--- HTML Generation Complete ({count} pages, {skipped} unchanged{failed}) ---")
+        if profile:
+            profile.stop()
+            profile.write(report_path, tool="gui", workers=self.workers_spinbox.value(), force=self.force_rebuild_checkbox.isChecked(),
+                          written=count, unchanged=skipped, errors=len(errors))
+            for line in profile.summary():
+                self.log(line)
+            pstats_note = f" (cProfile stats in {profile.pstats_path})" if profile.pstats_path else ""
+            self.log(f"Build profile written to {report_path}{pstats_note}.")
         self.generate_button.setEnabled(True)
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
-    window = MainWindow()
+    window = MainWindow(STARTUP_TIME)
     window.show()
     sys.exit(app.exec())
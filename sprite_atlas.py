@@ -0,0 +1,158 @@
+import hashlib
+import json
+import math
+import os
+import re
+
+from output_stage import VARIANT_PATTERN, minify_css
+
+try:
+    from PIL import Image
+except ImportError:  # Optional: without Pillow the wiki grid keeps one <img> per icon
+    Image = None
+
+# --- CONFIGURATION ---
+ICON_DIR = "images/icons"
+# Icons per atlas sheet; 8x8 cells of 124px keeps each sheet under ~1000px square
+ICONS_PER_ATLAS = 64
+ATLAS_COLUMNS = 8
+HASH_CACHE_NAME = ".icon_hashes.json"
+
+
+def icon_files(site_root):
+    """
+    Every icon in ICON_DIR. The atlas packs all of them, hidden characters included, so
+    toggling a character's visibility reuses the existing sheets.
+    """
+    icon_dir = os.path.join(site_root, ICON_DIR)
+    if not os.path.isdir(icon_dir):
+        return []
+    return sorted(f for f in os.listdir(icon_dir) if f.lower().endswith('.png'))
+
+
+def sprite_class(icon_filename):
+    """'SPR_Icon_PC_Adelina_01.png' -> 'spr-adelina-01'."""
+    stem = os.path.splitext(icon_filename)[0].lower().replace('_', '-')
+    return "spr-" + stem.replace("spr-icon-pc-", "")
+
+
+class IconHashCache:
+    """
+    sha256 of every icon, keyed by file name (.icon_hashes.json). Like image_dimensions.ImageSizeCache,
+    a file is only read again when its size/mtime changes, so no-op builds just stat the icons.
+    Without a state_dir the hashes are kept in memory only.
+    """
+
+    def __init__(self, site_root, state_dir=None):
+        self.icon_dir = os.path.join(site_root, ICON_DIR)
+        self.path = os.path.join(state_dir, HASH_CACHE_NAME) if state_dir else None
+        self.entries = {}
+        self.dirty = False
+        if self.path and os.path.exists(self.path):
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self.entries = json.load(f).get("icons", {})
+            except (OSError, ValueError):
+                self.entries = {}
+
+    def sha256(self, filename):
+        path = os.path.join(self.icon_dir, filename)
+        stat = os.stat(path)
+        entry = self.entries.get(filename)
+        if not entry or entry["mtime"] != stat.st_mtime or entry["size"] != stat.st_size:
+            with open(path, 'rb') as f:
+                entry = {"mtime": stat.st_mtime, "size": stat.st_size, "sha256": hashlib.sha256(f.read()).hexdigest()}
+            self.entries[filename] = entry
+            self.dirty = True
+        return entry["sha256"]
+
+    def save(self):
+        if not self.dirty or not self.path:
+            return
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump({"icons": self.entries}, f, indent=4, sort_keys=True)
+        self.dirty = False
+
+
+def icon_set_digest(site_root, icon_filenames, hashes=None):
+    """Hash over the names and contents of the icons, so the atlas is only rebuilt when the set changes."""
+    hashes = hashes or IconHashCache(site_root)
+    digest = hashlib.sha256()
+    for filename in icon_filenames:
+        digest.update(f"{filename}\0{hashes.sha256(filename)}\0".encode('utf-8'))
+    return digest.hexdigest()[:12]
+
+
+def build_atlas(site_root, asset_dir, icon_filenames, log=print, hashes=None):
+    """
+    Packs the given icons into <asset_dir>/icons.<hash>.<n>.png sheets plus an
+    icons.<hash>.css offset map. Returns (atlas, files, bytes written), where atlas is
+    {"stylesheet": rel_css_path, "classes": {icon: class}} or None when Pillow is missing or
+    there are no icons. hashes is an IconHashCache to reuse.
+    """
+    if Image is None:
+        return None, 0, 0
+    icon_filenames = sorted({f for f in icon_filenames if os.path.exists(os.path.join(site_root, ICON_DIR, f))})
+    if not icon_filenames:
+        return None, 0, 0
+
+    digest = icon_set_digest(site_root, icon_filenames, hashes)
+    css_name = f"icons.{digest}.css"
+    classes = {filename: sprite_class(filename) for filename in icon_filenames}
+    result = {"stylesheet": f"{asset_dir}/{css_name}", "classes": classes}
+    out_dir = os.path.join(site_root, asset_dir)
+    if os.path.exists(os.path.join(out_dir, css_name)):
+        return result, 0, 0
+
+    log(f"Packing {len(icon_filenames)} icons into sprite atlases...")
+    os.makedirs(out_dir, exist_ok=True)
+    with Image.open(os.path.join(site_root, ICON_DIR, icon_filenames[0])) as first:
+        cell = max(first.size)
+
+    # Percentage sizes/offsets so the sprite scales to whatever w-*/h-* the grid uses
+    # padding-box clip keeps neighbouring cells from showing under semi-transparent borders
+    css_lines = [".spr{display:block;background-repeat:no-repeat;background-clip:padding-box}"]
+    files = size = 0
+    for sheet_index, start in enumerate(range(0, len(icon_filenames), ICONS_PER_ATLAS)):
+        batch = icon_filenames[start:start + ICONS_PER_ATLAS]
+        columns = min(ATLAS_COLUMNS, len(batch))
+        rows = math.ceil(len(batch) / columns)
+        sheet = Image.new("RGBA", (columns * cell, rows * cell), (0, 0, 0, 0))
+        for index, filename in enumerate(batch):
+            with Image.open(os.path.join(site_root, ICON_DIR, filename)) as icon:
+                icon = icon.convert("RGBA")
+                if icon.size != (cell, cell):
+                    icon = icon.resize((cell, cell), Image.LANCZOS)
+                sheet.paste(icon, ((index % columns) * cell, (index // columns) * cell))
+
+        sheet_name = f"icons.{digest}.{sheet_index}.png"
+        sheet.save(os.path.join(out_dir, sheet_name), "PNG", optimize=True)
+        files += 1
+        size += os.path.getsize(os.path.join(out_dir, sheet_name))
+        for index, filename in enumerate(batch):
+            col, row = index % columns, index // columns
+            x = col * 100 / (columns - 1) if columns > 1 else 0
+            y = row * 100 / (rows - 1) if rows > 1 else 0
+            css_lines.append(
+                f".{classes[filename]}{{background-image:url({sheet_name});background-size:{columns * 100}% {rows * 100}%;"
+                f"background-position:{x:.4f}% {y:.4f}%}}"
+            )
+
+    data = minify_css("\n".join(css_lines)).encode('utf-8')
+    tmp_path = os.path.join(out_dir, css_name + ".tmp")
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, os.path.join(out_dir, css_name))
+    return result, files + 1, size + len(data)
+
+
+def prune_atlases(out_dir, keep_stylesheet):
+    """Removes sprite sheets/CSS (and the CSS variants) from older icon sets."""
+    if not os.path.isdir(out_dir):
+        return
+    digest = os.path.basename(keep_stylesheet).split('.')[1]
+    pattern = re.compile(rf"icons\.([0-9a-f]{{12}})\.(?:\d+\.png|css{VARIANT_PATTERN})$")
+    for filename in os.listdir(out_dir):
+        match = pattern.match(filename)
+        if match and match.group(1) != digest:
+            os.remove(os.path.join(out_dir, filename))
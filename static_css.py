@@ -0,0 +1,868 @@
+import hashlib
+import os
+import re
+
+from output_stage import VARIANT_PATTERN
+
+# Build-time replacement for the cdn.tailwindcss.com JIT runtime.
+# Scans rendered HTML for the utility classes it actually uses and compiles only those
+# into one static stylesheet. Covers the Tailwind v3 utilities our templates (and the
+# AI generated stats snippets) use; anything it doesn't know is reported, not guessed.
+
+# --- THEME (was the inline tailwind.config in COMMON_HEAD) ---
+THEME = {
+    "fontFamily": {
+        "sans": "Poppins, sans-serif",
+        "mono": "Rajdhani, monospace",
+    },
+    "colors": {
+        "glass": {
+            "100": "rgba(255, 255, 255, 0.1)",
+            "200": "rgba(255, 255, 255, 0.2)",
+            "dark": "rgba(15, 23, 42, 0.6)",
+            "darker": "rgba(10, 15, 30, 0.8)",
+        },
+        "accent": {
+            "gold": "#fbbf24",
+            "blue": "#38bdf8",
+            "green": "#4ade80",
+            "red": "#f87171",
+        },
+    },
+}
+
+# Default Tailwind palette (all hues: AI-extracted stats rendered into the pages may use any of them)
+_SHADES = ["50", "100", "200", "300", "400", "500", "600", "700", "800", "900", "950"]
+PALETTE = {
+    "slate": "f8fafc f1f5f9 e2e8f0 cbd5e1 94a3b8 64748b 475569 334155 1e293b 0f172a 020617",
+    "gray": "f9fafb f3f4f6 e5e7eb d1d5db 9ca3af 6b7280 4b5563 374151 1f2937 111827 030712",
+    "zinc": "fafafa f4f4f5 e4e4e7 d4d4d8 a1a1aa 71717a 52525b 3f3f46 27272a 18181b 09090b",
+    "neutral": "fafafa f5f5f5 e5e5e5 d4d4d4 a3a3a3 737373 525252 404040 262626 171717 0a0a0a",
+    "stone": "fafaf9 f5f5f4 e7e5e4 d6d3d1 a8a29e 78716c 57534e 44403c 292524 1c1917 0c0a09",
+    "red": "fef2f2 fee2e2 fecaca fca5a5 f87171 ef4444 dc2626 b91c1c 991b1b 7f1d1d 450a0a",
+    "orange": "fff7ed ffedd5 fed7aa fdba74 fb923c f97316 ea580c c2410c 9a3412 7c2d12 431407",
+    "amber": "fffbeb fef3c7 fde68a fcd34d fbbf24 f59e0b d97706 b45309 92400e 78350f 451a03",
+    "yellow": "fefce8 fef9c3 fef08a fde047 facc15 eab308 ca8a04 a16207 854d0e 713f12 422006",
+    "lime": "f7fee7 ecfccb d9f99d bef264 a3e635 84cc16 65a30d 4d7c0f 3f6212 365314 1a2e05",
+    "green": "f0fdf4 dcfce7 bbf7d0 86efac 4ade80 22c55e 16a34a 15803d 166534 14532d 052e16",
+    "emerald": "ecfdf5 d1fae5 a7f3d0 6ee7b7 34d399 10b981 059669 047857 065f46 064e3b 022c22",
+    "teal": "f0fdfa ccfbf1 99f6e4 5eead4 2dd4bf 14b8a6 0d9488 0f766e 115e59 134e4a 042f2e",
+    "cyan": "ecfeff cffafe a5f3fc 67e8f9 22d3ee 06b6d4 0891b2 0e7490 155e75 164e63 083344",
+    "sky": "f0f9ff e0f2fe bae6fd 7dd3fc 38bdf8 0ea5e9 0284c7 0369a1 075985 0c4a6e 082f49",
+    "blue": "eff6ff dbeafe bfdbfe 93c5fd 60a5fa 3b82f6 2563eb 1d4ed8 1e40af 1e3a8a 172554",
+    "indigo": "eef2ff e0e7ff c7d2fe a5b4fc 818cf8 6366f1 4f46e5 4338ca 3730a3 312e81 1e1b4b",
+    "violet": "f5f3ff ede9fe ddd6fe c4b5fd a78bfa 8b5cf6 7c3aed 6d28d9 5b21b6 4c1d95 2e1065",
+    "purple": "faf5ff f3e8ff e9d5ff d8b4fe c084fc a855f7 9333ea 7e22ce 6b21a8 581c87 3b0764",
+    "fuchsia": "fdf4ff fae8ff f5d0fe f0abfc e879f9 d946ef c026d3 a21caf 86198f 701a75 4a044e",
+    "pink": "fdf2f8 fce7f3 fbcfe8 f9a8d4 f472b6 ec4899 db2777 be185d 9d174d 831843 500724",
+    "rose": "fff1f2 ffe4e6 fecdd3 fda4af fb7185 f43f5e e11d48 be123c 9f1239 881337 4c0519",
+}
+COLORS = {"white": "#ffffff", "black": "#000000"}
+for _hue, _values in PALETTE.items():
+    for _shade, _hex in zip(_SHADES, _values.split()):
+        COLORS[f"{_hue}-{_shade}"] = f"#{_hex}"
+for _hue, _values in THEME["colors"].items():
+    for _shade, _value in _values.items():
+        COLORS[f"{_hue}-{_shade}"] = _value
+SPECIAL_COLORS = {"transparent": "transparent", "current": "currentColor", "inherit": "inherit"}
+
+BREAKPOINTS = [("sm", "640px"), ("md", "768px"), ("lg", "1024px"), ("xl", "1280px"), ("2xl", "1536px")]
+
+# Pseudo-class variants, in the order Tailwind emits them (later wins on equal specificity)
+PSEUDO_VARIANTS = {
+    "first": ":first-child",
+    "last": ":last-child",
+    "odd": ":nth-child(odd)",
+    "even": ":nth-child(even)",
+    "focus-within": ":focus-within",
+    "hover": ":hover",
+    "focus": ":focus",
+    "focus-visible": ":focus-visible",
+    "active": ":active",
+    "disabled": ":disabled",
+}
+VARIANT_ORDER = list(PSEUDO_VARIANTS) + ["group-hover", "group-focus"]
+
+FONT_SIZES = {
+    "xs": ("0.75rem", "1rem"), "sm": ("0.875rem", "1.25rem"), "base": ("1rem", "1.5rem"),
+    "lg": ("1.125rem", "1.75rem"), "xl": ("1.25rem", "1.75rem"), "2xl": ("1.5rem", "2rem"),
+    "3xl": ("1.875rem", "2.25rem"), "4xl": ("2.25rem", "2.5rem"), "5xl": ("3rem", "1"),
+    "6xl": ("3.75rem", "1"), "7xl": ("4.5rem", "1"), "8xl": ("6rem", "1"), "9xl": ("8rem", "1"),
+}
+FONT_WEIGHTS = {
+    "thin": "100", "extralight": "200", "light": "300", "normal": "400", "medium": "500",
+    "semibold": "600", "bold": "700", "extrabold": "800", "black": "900",
+}
+TRACKING = {"tighter": "-0.05em", "tight": "-0.025em", "normal": "0em", "wide": "0.025em", "wider": "0.05em", "widest": "0.1em"}
+LEADING = {"none": "1", "tight": "1.25", "snug": "1.375", "normal": "1.5", "relaxed": "1.625", "loose": "2"}
+RADIUS = {"none": "0px", "sm": "0.125rem", "": "0.25rem", "md": "0.375rem", "lg": "0.5rem", "xl": "0.75rem", "2xl": "1rem", "3xl": "1.5rem", "full": "9999px"}
+MAX_WIDTHS = {
+    "none": "none", "0": "0rem", "xs": "20rem", "sm": "24rem", "md": "28rem", "lg": "32rem", "xl": "36rem",
+    "2xl": "42rem", "3xl": "48rem", "4xl": "56rem", "5xl": "64rem", "6xl": "72rem", "7xl": "80rem",
+    "full": "100%", "min": "min-content", "max": "max-content", "fit": "fit-content", "prose": "65ch",
+    "screen-sm": "640px", "screen-md": "768px", "screen-lg": "1024px", "screen-xl": "1280px", "screen-2xl": "1536px",
+}
+SHADOWS = {
+    "sm": "0 1px 2px 0 rgb(0 0 0 / 0.05)",
+    "": "0 1px 3px 0 rgb(0 0 0 / 0.1), 0 1px 2px -1px rgb(0 0 0 / 0.1)",
+    "md": "0 4px 6px -1px rgb(0 0 0 / 0.1), 0 2px 4px -2px rgb(0 0 0 / 0.1)",
+    "lg": "0 10px 15px -3px rgb(0 0 0 / 0.1), 0 4px 6px -4px rgb(0 0 0 / 0.1)",
+    "xl": "0 20px 25px -5px rgb(0 0 0 / 0.1), 0 8px 10px -6px rgb(0 0 0 / 0.1)",
+    "2xl": "0 25px 50px -12px rgb(0 0 0 / 0.25)",
+    "inner": "inset 0 2px 4px 0 rgb(0 0 0 / 0.05)",
+    "none": "0 0 #0000",
+}
+DROP_SHADOWS = {
+    "sm": "drop-shadow(0 1px 1px rgb(0 0 0 / 0.05))",
+    "": "drop-shadow(0 1px 2px rgb(0 0 0 / 0.1)) drop-shadow(0 1px 1px rgb(0 0 0 / 0.06))",
+    "md": "drop-shadow(0 4px 3px rgb(0 0 0 / 0.07)) drop-shadow(0 2px 2px rgb(0 0 0 / 0.06))",
+    "lg": "drop-shadow(0 10px 8px rgb(0 0 0 / 0.04)) drop-shadow(0 4px 3px rgb(0 0 0 / 0.1))",
+    "xl": "drop-shadow(0 20px 13px rgb(0 0 0 / 0.03)) drop-shadow(0 8px 5px rgb(0 0 0 / 0.08))",
+    "2xl": "drop-shadow(0 25px 25px rgb(0 0 0 / 0.15))",
+    "none": "drop-shadow(0 0 #0000)",
+}
+BLURS = {"none": "0", "sm": "4px", "": "8px", "md": "12px", "lg": "16px", "xl": "24px", "2xl": "40px", "3xl": "64px"}
+EASING = {"linear": "linear", "in": "cubic-bezier(0.4, 0, 1, 1)", "out": "cubic-bezier(0, 0, 0.2, 1)", "in-out": "cubic-bezier(0.4, 0, 0.2, 1)"}
+TRANSITIONS = {
+    "": "color, background-color, border-color, text-decoration-color, fill, stroke, opacity, box-shadow, transform, filter, backdrop-filter",
+    "all": "all",
+    "colors": "color, background-color, border-color, text-decoration-color, fill, stroke",
+    "opacity": "opacity",
+    "shadow": "box-shadow",
+    "transform": "transform",
+}
+ANIMATIONS = {
+    "spin": ("spin 1s linear infinite", "@keyframes spin{to{transform:rotate(360deg)}}"),
+    "ping": ("ping 1s cubic-bezier(0, 0, 0.2, 1) infinite", "@keyframes ping{75%,100%{transform:scale(2);opacity:0}}"),
+    "pulse": ("pulse 2s cubic-bezier(0.4, 0, 0.6, 1) infinite", "@keyframes pulse{50%{opacity:.5}}"),
+    "bounce": ("bounce 1s infinite", "@keyframes bounce{0%,100%{transform:translateY(-25%);animation-timing-function:cubic-bezier(0.8,0,1,1)}50%{transform:none;animation-timing-function:cubic-bezier(0,0,0.2,1)}}"),
+}
+
+TRANSFORM = "transform:translate(var(--tw-translate-x), var(--tw-translate-y)) rotate(var(--tw-rotate)) scaleX(var(--tw-scale-x)) scaleY(var(--tw-scale-y))"
+FILTER = "filter:var(--tw-blur) var(--tw-brightness) var(--tw-grayscale) var(--tw-invert) var(--tw-sepia) var(--tw-drop-shadow)"
+BACKDROP_FILTER = "-webkit-backdrop-filter:var(--tw-backdrop-blur);backdrop-filter:var(--tw-backdrop-blur)"
+
+# Tailwind preflight (modern-normalize + resets) and the variable defaults the
+# transform/filter/gradient utilities compose from.
+PREFLIGHT = """*,::before,::after{box-sizing:border-box;border-width:0;border-style:solid;border-color:#e5e7eb;--tw-translate-x:0;--tw-translate-y:0;--tw-rotate:0;--tw-scale-x:1;--tw-scale-y:1;--tw-blur: ;--tw-brightness: ;--tw-grayscale: ;--tw-invert: ;--tw-sepia: ;--tw-drop-shadow: ;--tw-backdrop-blur: }
+::before,::after{--tw-content:''}
+html,:host{line-height:1.5;-webkit-text-size-adjust:100%;-moz-tab-size:4;tab-size:4;font-family:{sans};-webkit-tap-highlight-color:transparent}
+body{margin:0;line-height:inherit}
+hr{height:0;color:inherit;border-top-width:1px}
+h1,h2,h3,h4,h5,h6{font-size:inherit;font-weight:inherit}
+a{color:inherit;text-decoration:inherit}
+b,strong{font-weight:bolder}
+code,kbd,samp,pre{font-family:{mono};font-size:1em}
+small{font-size:80%}
+sub,sup{font-size:75%;line-height:0;position:relative;vertical-align:baseline}
+sub{bottom:-.25em}
+sup{top:-.5em}
+table{text-indent:0;border-color:inherit;border-collapse:collapse}
+button,input,optgroup,select,textarea{font-family:inherit;font-size:100%;font-weight:inherit;line-height:inherit;letter-spacing:inherit;color:inherit;margin:0;padding:0}
+button,select{text-transform:none}
+button,input:where([type='button']),input:where([type='reset']),input:where([type='submit']){-webkit-appearance:button;background-color:transparent;background-image:none}
+progress{vertical-align:baseline}
+[type='search']{-webkit-appearance:textfield;outline-offset:-2px}
+summary{display:list-item}
+blockquote,dl,dd,h1,h2,h3,h4,h5,h6,hr,figure,p,pre{margin:0}
+fieldset{margin:0;padding:0}
+legend{padding:0}
+ol,ul,menu{list-style:none;margin:0;padding:0}
+textarea{resize:vertical}
+input::placeholder,textarea::placeholder{opacity:1;color:#9ca3af}
+button,[role="button"]{cursor:pointer}
+:disabled{cursor:default}
+img,svg,video,canvas,audio,iframe,embed,object{display:block;vertical-align:middle}
+img,video{max-width:100%;height:auto}
+[hidden]{display:none}
+""".replace("{sans}", THEME["fontFamily"]["sans"]).replace("{mono}", THEME["fontFamily"]["mono"])
+
+CLASS_ATTR_RE = re.compile(r'\bclass\s*=\s*(["\'])(.*?)\1', re.DOTALL)
+
+
+def extract_classes(html):
+    """Returns every class name used in the class="" attributes of a page."""
+    classes = set()
+    for match in CLASS_ATTR_RE.finditer(html):
+        classes.update(match.group(2).split())
+    return classes
+
+
+# --- VALUE HELPERS ---
+
+def _num(value):
+    return ('%.6f' % value).rstrip('0').rstrip('.')
+
+
+def _arbitrary(value):
+    """'[0_0_10px_rgba(...)]' -> '0 0 10px rgba(...)', None if not an arbitrary value."""
+    if len(value) > 2 and value[0] == '[' and value[-1] == ']':
+        return value[1:-1].replace('_', ' ')
+    return None
+
+
+def _spacing(value):
+    """Tailwind spacing scale: 4 -> 1rem, px -> 1px, 1/2 -> 50%, full -> 100%."""
+    arbitrary = _arbitrary(value)
+    if arbitrary is not None:
+        return arbitrary
+    if value == '0':
+        return '0px'
+    if value == 'px':
+        return '1px'
+    if value == 'full':
+        return '100%'
+    if value == 'auto':
+        return 'auto'
+    if re.fullmatch(r'\d+(\.5)?', value):
+        return f"{_num(float(value) * 0.25)}rem"
+    fraction = re.fullmatch(r'(\d+)/(\d+)', value)
+    if fraction and int(fraction.group(2)):
+        return f"{_num(int(fraction.group(1)) * 100 / int(fraction.group(2)))}%"
+    return None
+
+
+def _size(value, axis):
+    """Width/height values: the spacing scale plus screen/min/max/fit."""
+    keywords = {"screen": "100vw" if axis == 'w' else "100vh", "min": "min-content", "max": "max-content", "fit": "fit-content"}
+    return keywords.get(value) or _spacing(value)
+
+
+def _negate(value, negative):
+    if not negative or value is None:
+        return value
+    return value[1:] if value.startswith('-') else f"-{value}"
+
+
+def _hex_to_rgb(value):
+    value = value.lstrip('#')
+    if len(value) == 3:
+        value = ''.join(c * 2 for c in value)
+    return tuple(int(value[i:i + 2], 16) for i in (0, 2, 4))
+
+
+def _color(token, alpha=None):
+    """'white/10' -> 'rgb(255 255 255 / 0.1)'. None when token isn't a color."""
+    if alpha is None and '/' in token and not token.startswith('['):
+        token, alpha_token = token.rsplit('/', 1)
+        alpha = _arbitrary(alpha_token)
+        if alpha is None:
+            if not alpha_token.isdigit():
+                return None
+            alpha = _num(int(alpha_token) / 100)
+    if token in SPECIAL_COLORS:
+        return SPECIAL_COLORS[token]
+    value = _arbitrary(token) or COLORS.get(token)
+    if value is None:
+        return None
+    if re.fullmatch(r'#[0-9a-fA-F]{3}|#[0-9a-fA-F]{6}', value):
+        r, g, b = _hex_to_rgb(value)
+        return f"rgb({r} {g} {b} / {alpha})" if alpha is not None else f"rgb({r} {g} {b})"
+    return value
+
+
+def _transparent(color):
+    """Fully transparent version of a color, used as the implicit gradient end."""
+    match = re.fullmatch(r'rgb\((\d+) (\d+) (\d+)(?: / [\d.]+)?\)', color)
+    if match:
+        return f"rgb({match.group(1)} {match.group(2)} {match.group(3)} / 0)"
+    return "transparent"
+
+
+# --- UTILITIES ---
+# Each resolver gets the class name without variants (and without a leading '-') and
+# returns None or (declarations, selector_suffix, extra_css). The list order is the
+# emit order, mirroring Tailwind's plugin order so e.g. 'p-4 px-8' resolves the same way.
+
+SIDES = {"": [""], "x": ["-left", "-right"], "y": ["-top", "-bottom"], "t": ["-top"], "r": ["-right"], "b": ["-bottom"], "l": ["-left"]}
+
+
+def _sided(prop, sides, value):
+    return ';'.join(f"{prop}{side}:{value}" for side in SIDES[sides])
+
+
+def _r_sr_only(name, negative):
+    if name == 'sr-only':
+        return "position:absolute;width:1px;height:1px;padding:0;margin:-1px;overflow:hidden;clip:rect(0, 0, 0, 0);white-space:nowrap;border-width:0"
+
+
+def _r_pointer_events(name, negative):
+    if name in ('pointer-events-none', 'pointer-events-auto'):
+        return f"pointer-events:{name[15:]}"
+
+
+def _r_position(name, negative):
+    if name in ('static', 'fixed', 'absolute', 'relative', 'sticky'):
+        return f"position:{name}"
+
+
+def _r_inset(name, negative):
+    match = re.fullmatch(r'(inset-x|inset-y|inset|top|right|bottom|left)-(.+)', name)
+    if not match:
+        return None
+    value = _negate(_spacing(match.group(2)), negative)
+    if value is None:
+        return None
+    props = {"inset": ["inset"], "inset-x": ["left", "right"], "inset-y": ["top", "bottom"]}.get(match.group(1), [match.group(1)])
+    return ';'.join(f"{prop}:{value}" for prop in props)
+
+
+def _r_z(name, negative):
+    match = re.fullmatch(r'z-(\d+|auto)', name)
+    if match:
+        return f"z-index:{_negate(match.group(1), negative)}"
+
+
+def _r_col_span(name, negative):
+    if name == 'col-span-full':
+        return "grid-column:1 / -1"
+    match = re.fullmatch(r'col-span-(\d+)', name)
+    if match:
+        return f"grid-column:span {match.group(1)} / span {match.group(1)}"
+
+
+def _r_margin(name, negative):
+    match = re.fullmatch(r'm([xytrbl]?)-(.+)', name)
+    if match:
+        value = _negate(_spacing(match.group(2)), negative)
+        if value is not None:
+            return _sided("margin", match.group(1), value)
+
+
+def _r_display(name, negative):
+    displays = {
+        "block": "block", "inline-block": "inline-block", "inline": "inline", "flex": "flex",
+        "inline-flex": "inline-flex", "grid": "grid", "inline-grid": "inline-grid", "table": "table",
+        "table-row": "table-row", "table-cell": "table-cell", "contents": "contents", "list-item": "list-item",
+        "hidden": "none",
+    }
+    if name in displays:
+        return f"display:{displays[name]}"
+
+
+def _r_size(name, negative):
+    match = re.fullmatch(r'(min-w|min-h|max-h|w|h)-(.+)', name)
+    if match:
+        prop = {"w": "width", "h": "height", "min-w": "min-width", "min-h": "min-height", "max-h": "max-height"}[match.group(1)]
+        value = _size(match.group(2), match.group(1)[-1])
+        if value is not None:
+            return f"{prop}:{value}"
+
+
+def _r_max_width(name, negative):
+    if name.startswith('max-w-'):
+        value = MAX_WIDTHS.get(name[6:]) or _arbitrary(name[6:])
+        if value is not None:
+            return f"max-width:{value}"
+
+
+def _r_flex(name, negative):
+    values = {
+        "flex-1": "flex:1 1 0%", "flex-auto": "flex:1 1 auto", "flex-initial": "flex:0 1 auto", "flex-none": "flex:none",
+        "shrink": "flex-shrink:1", "shrink-0": "flex-shrink:0", "flex-shrink-0": "flex-shrink:0",
+        "grow": "flex-grow:1", "grow-0": "flex-grow:0", "flex-grow": "flex-grow:1",
+    }
+    return values.get(name)
+
+
+def _r_table(name, negative):
+    values = {"table-auto": "table-layout:auto", "table-fixed": "table-layout:fixed", "border-collapse": "border-collapse:collapse", "border-separate": "border-collapse:separate"}
+    return values.get(name)
+
+
+def _r_origin(name, negative):
+    if name.startswith('origin-'):
+        value = name[7:].replace('-', ' ')
+        if value in ('center', 'top', 'bottom', 'left', 'right', 'top left', 'top right', 'bottom left', 'bottom right'):
+            return f"transform-origin:{value}"
+
+
+def _r_translate(name, negative):
+    match = re.fullmatch(r'translate-([xy])-(.+)', name)
+    if match:
+        value = _negate(_spacing(match.group(2)), negative)
+        if value is not None:
+            return f"--tw-translate-{match.group(1)}:{value};{TRANSFORM}"
+
+
+def _r_rotate(name, negative):
+    match = re.fullmatch(r'rotate-(\d+)', name)
+    if match:
+        return f"--tw-rotate:{_negate(match.group(1) + 'deg', negative)};{TRANSFORM}"
+
+
+def _r_scale(name, negative):
+    match = re.fullmatch(r'scale-(?:([xy])-)?(\d+)', name)
+    if match:
+        value = _negate(_num(int(match.group(2)) / 100), negative)
+        axes = [match.group(1)] if match.group(1) else ['x', 'y']
+        return ';'.join(f"--tw-scale-{axis}:{value}" for axis in axes) + f";{TRANSFORM}"
+
+
+def _r_transform(name, negative):
+    if name == 'transform':
+        return TRANSFORM
+    if name == 'transform-none':
+        return "transform:none"
+
+
+def _r_animate(name, negative):
+    if name.startswith('animate-'):
+        if name == 'animate-none':
+            return "animation:none"
+        animation = ANIMATIONS.get(name[8:])
+        if animation:
+            return f"animation:{animation[0]}", "", animation[1]
+
+
+def _r_cursor(name, negative):
+    if name in ('cursor-pointer', 'cursor-default', 'cursor-not-allowed', 'cursor-wait', 'cursor-text', 'cursor-move', 'cursor-help'):
+        return f"cursor:{name[7:]}"
+
+
+def _r_select(name, negative):
+    if name in ('select-none', 'select-text', 'select-all', 'select-auto'):
+        return f"-webkit-user-select:{name[7:]};user-select:{name[7:]}"
+
+
+def _r_list(name, negative):
+    values = {"list-none": "list-style-type:none", "list-disc": "list-style-type:disc", "list-decimal": "list-style-type:decimal", "list-inside": "list-style-position:inside", "list-outside": "list-style-position:outside"}
+    return values.get(name)
+
+
+def _r_appearance(name, negative):
+    if name == 'appearance-none':
+        return "-webkit-appearance:none;appearance:none"
+
+
+def _r_grid_cols(name, negative):
+    if name == 'grid-cols-none':
+        return "grid-template-columns:none"
+    match = re.fullmatch(r'grid-cols-(\d+)', name)
+    if match:
+        return f"grid-template-columns:repeat({match.group(1)}, minmax(0, 1fr))"
+
+
+def _r_flex_direction(name, negative):
+    values = {"flex-row": "row", "flex-row-reverse": "row-reverse", "flex-col": "column", "flex-col-reverse": "column-reverse"}
+    if name in values:
+        return f"flex-direction:{values[name]}"
+
+
+def _r_flex_wrap(name, negative):
+    if name in ('flex-wrap', 'flex-wrap-reverse', 'flex-nowrap'):
+        return f"flex-wrap:{name[5:]}"
+
+
+def _r_alignment(name, negative):
+    flex_values = {"start": "flex-start", "end": "flex-end", "center": "center", "between": "space-between", "around": "space-around", "evenly": "space-evenly", "baseline": "baseline", "stretch": "stretch"}
+    for prefix, prop in (("items-", "align-items"), ("justify-", "justify-content"), ("self-", "align-self"), ("content-", "align-content")):
+        if name.startswith(prefix) and name[len(prefix):] in flex_values:
+            return f"{prop}:{flex_values[name[len(prefix):]]}"
+    if name == 'self-auto':
+        return "align-self:auto"
+
+
+def _r_gap(name, negative):
+    match = re.fullmatch(r'gap-(?:([xy])-)?(.+)', name)
+    if match:
+        value = _spacing(match.group(2))
+        if value is not None:
+            prop = {"x": "column-gap", "y": "row-gap"}.get(match.group(1), "gap")
+            return f"{prop}:{value}"
+
+
+def _r_space(name, negative):
+    match = re.fullmatch(r'space-([xy])-(.+)', name)
+    if match:
+        value = _negate(_spacing(match.group(2)), negative)
+        if value is not None:
+            prop = "margin-left" if match.group(1) == 'x' else "margin-top"
+            return f"{prop}:{value}", " > :not([hidden]) ~ :not([hidden])", ""
+
+
+def _r_divide(name, negative):
+    match = re.fullmatch(r'divide-([xy])(?:-(\d+))?', name)
+    if match:
+        prop = "border-left-width" if match.group(1) == 'x' else "border-top-width"
+        return f"{prop}:{match.group(2) or '1'}px", " > :not([hidden]) ~ :not([hidden])", ""
+    if name.startswith('divide-'):
+        color = _color(name[7:])
+        if color:
+            return f"border-color:{color}", " > :not([hidden]) ~ :not([hidden])", ""
+
+
+def _r_overflow(name, negative):
+    match = re.fullmatch(r'overflow-(?:([xy])-)?(auto|hidden|visible|scroll|clip)', name)
+    if match:
+        prop = f"overflow-{match.group(1)}" if match.group(1) else "overflow"
+        return f"{prop}:{match.group(2)}"
+
+
+def _r_text_overflow(name, negative):
+    values = {
+        "truncate": "overflow:hidden;text-overflow:ellipsis;white-space:nowrap",
+        "text-ellipsis": "text-overflow:ellipsis",
+        "whitespace-nowrap": "white-space:nowrap", "whitespace-normal": "white-space:normal",
+        "whitespace-pre": "white-space:pre", "whitespace-pre-line": "white-space:pre-line", "whitespace-pre-wrap": "white-space:pre-wrap",
+        "break-words": "overflow-wrap:break-word", "break-all": "word-break:break-all",
+    }
+    return values.get(name)
+
+
+def _r_rounded(name, negative):
+    match = re.fullmatch(r'rounded(?:-(t|r|b|l|tl|tr|br|bl))?(?:-(.+))?', name)
+    if not match:
+        return None
+    value = RADIUS.get(match.group(2) or "") or _arbitrary(match.group(2) or "")
+    if value is None:
+        return None
+    corners = {
+        None: ["border-radius"],
+        "t": ["border-top-left-radius", "border-top-right-radius"], "r": ["border-top-right-radius", "border-bottom-right-radius"],
+        "b": ["border-bottom-right-radius", "border-bottom-left-radius"], "l": ["border-top-left-radius", "border-bottom-left-radius"],
+        "tl": ["border-top-left-radius"], "tr": ["border-top-right-radius"], "br": ["border-bottom-right-radius"], "bl": ["border-bottom-left-radius"],
+    }[match.group(1)]
+    return ';'.join(f"{corner}:{value}" for corner in corners)
+
+
+def _r_border_width(name, negative):
+    match = re.fullmatch(r'border(?:-([xytrbl]))?(?:-(\d+))?', name)
+    if match:
+        width = f"{match.group(2) or '1'}px"
+        return ';'.join(f"border{side}-width:{width}" for side in SIDES[match.group(1) or ""])
+
+
+def _r_border_style(name, negative):
+    if name in ('border-solid', 'border-dashed', 'border-dotted', 'border-double', 'border-none'):
+        return f"border-style:{name[7:]}"
+
+
+def _r_border_color(name, negative):
+    match = re.fullmatch(r'border-(?:([xytrbl])-)?(.+)', name)
+    if match:
+        color = _color(match.group(2))
+        if color:
+            return ';'.join(f"border{side}-color:{color}" for side in SIDES[match.group(1) or ""])
+
+
+def _r_background(name, negative):
+    if name.startswith('bg-gradient-to-'):
+        directions = {"t": "top", "tr": "top right", "r": "right", "br": "bottom right", "b": "bottom", "bl": "bottom left", "l": "left", "tl": "top left"}
+        direction = directions.get(name[15:])
+        if direction:
+            return f"background-image:linear-gradient(to {direction}, var(--tw-gradient-stops))"
+        return None
+    if name.startswith('bg-'):
+        color = _color(name[3:])
+        if color:
+            return f"background-color:{color}"
+
+
+def _r_gradient_stops(name, negative):
+    match = re.fullmatch(r'(from|via|to)-(.+)', name)
+    if not match:
+        return None
+    color = _color(match.group(2))
+    if color is None:
+        return None
+    if match.group(1) == 'from':
+        return f"--tw-gradient-from:{color};--tw-gradient-to:{_transparent(color)};--tw-gradient-stops:var(--tw-gradient-from), var(--tw-gradient-to)"
+    if match.group(1) == 'via':
+        return f"--tw-gradient-to:{_transparent(color)};--tw-gradient-stops:var(--tw-gradient-from), {color}, var(--tw-gradient-to)"
+    return f"--tw-gradient-to:{color}"
+
+
+def _r_object_fit(name, negative):
+    if name in ('object-contain', 'object-cover', 'object-fill', 'object-none', 'object-scale-down'):
+        return f"object-fit:{name[7:]}"
+    if name in ('object-center', 'object-top', 'object-bottom', 'object-left', 'object-right'):
+        return f"object-position:{name[7:]}"
+
+
+def _r_padding(name, negative):
+    match = re.fullmatch(r'p([xytrbl]?)-(.+)', name)
+    if match:
+        value = _spacing(match.group(2))
+        if value is not None and value != 'auto':
+            return _sided("padding", match.group(1), value)
+
+
+def _r_text_align(name, negative):
+    if name in ('text-left', 'text-center', 'text-right', 'text-justify'):
+        return f"text-align:{name[5:]}"
+
+
+def _r_align(name, negative):
+    if name in ('align-top', 'align-middle', 'align-bottom', 'align-baseline'):
+        return f"vertical-align:{name[6:]}"
+
+
+def _r_font_family(name, negative):
+    family = THEME["fontFamily"].get(name[5:]) if name.startswith('font-') else None
+    if family:
+        return f"font-family:{family}"
+
+
+def _r_font_size(name, negative):
+    if name.startswith('text-'):
+        size = FONT_SIZES.get(name[5:])
+        if size:
+            return f"font-size:{size[0]};line-height:{size[1]}"
+        arbitrary = _arbitrary(name[5:])
+        if arbitrary and re.fullmatch(r'[\d.]+(px|rem|em|%|vw|vh)', arbitrary):
+            return f"font-size:{arbitrary}"
+
+
+def _r_font_weight(name, negative):
+    if name.startswith('font-') and name[5:] in FONT_WEIGHTS:
+        return f"font-weight:{FONT_WEIGHTS[name[5:]]}"
+
+
+def _r_text_transform(name, negative):
+    values = {"uppercase": "text-transform:uppercase", "lowercase": "text-transform:lowercase", "capitalize": "text-transform:capitalize", "normal-case": "text-transform:none", "italic": "font-style:italic", "not-italic": "font-style:normal"}
+    return values.get(name)
+
+
+def _r_leading(name, negative):
+    if name.startswith('leading-'):
+        value = LEADING.get(name[8:]) or _arbitrary(name[8:])
+        if value is None and name[8:].isdigit():
+            value = _spacing(name[8:])
+        if value is not None:
+            return f"line-height:{value}"
+
+
+def _r_tracking(name, negative):
+    if name.startswith('tracking-') and name[9:] in TRACKING:
+        return f"letter-spacing:{_negate(TRACKING[name[9:]], negative)}"
+
+
+def _r_text_color(name, negative):
+    if name.startswith('text-'):
+        color = _color(name[5:])
+        if color:
+            return f"color:{color}"
+
+
+def _r_decoration(name, negative):
+    values = {"underline": "text-decoration-line:underline", "line-through": "text-decoration-line:line-through", "no-underline": "text-decoration-line:none"}
+    return values.get(name)
+
+
+def _r_antialiased(name, negative):
+    if name == 'antialiased':
+        return "-webkit-font-smoothing:antialiased;-moz-osx-font-smoothing:grayscale"
+
+
+def _r_placeholder(name, negative):
+    if name.startswith('placeholder-'):
+        color = _color(name[12:])
+        if color:
+            return f"color:{color}", "::placeholder", ""
+
+
+def _r_opacity(name, negative):
+    match = re.fullmatch(r'opacity-(\d+)', name)
+    if match:
+        return f"opacity:{_num(int(match.group(1)) / 100)}"
+
+
+def _r_shadow(name, negative):
+    match = re.fullmatch(r'shadow(?:-(.+))?', name)
+    if match and (match.group(1) or "") in SHADOWS:
+        return f"box-shadow:{SHADOWS[match.group(1) or '']}"
+
+
+def _r_outline(name, negative):
+    if name == 'outline-none':
+        return "outline:2px solid transparent;outline-offset:2px"
+    if name == 'outline':
+        return "outline-style:solid"
+
+
+def _r_filter(name, negative):
+    match = re.fullmatch(r'blur(?:-(.+))?', name)
+    if match and (match.group(1) or "") in BLURS:
+        return f"--tw-blur:blur({BLURS[match.group(1) or '']});{FILTER}"
+    match = re.fullmatch(r'brightness-(\d+)', name)
+    if match:
+        return f"--tw-brightness:brightness({_num(int(match.group(1)) / 100)});{FILTER}"
+    for filter_name in ('grayscale', 'invert', 'sepia'):
+        if name == filter_name:
+            return f"--tw-{filter_name}:{filter_name}(100%);{FILTER}"
+        if name == f"{filter_name}-0":
+            return f"--tw-{filter_name}:{filter_name}(0);{FILTER}"
+    match = re.fullmatch(r'drop-shadow(?:-(.+))?', name)
+    if match:
+        key = match.group(1) or ""
+        value = DROP_SHADOWS.get(key)
+        if value is None and _arbitrary(key):
+            value = f"drop-shadow({_arbitrary(key)})"
+        if value:
+            return f"--tw-drop-shadow:{value};{FILTER}"
+
+
+def _r_backdrop(name, negative):
+    match = re.fullmatch(r'backdrop-blur(?:-(.+))?', name)
+    if match and (match.group(1) or "") in BLURS:
+        return f"--tw-backdrop-blur:blur({BLURS[match.group(1) or '']});{BACKDROP_FILTER}"
+
+
+def _r_transition(name, negative):
+    match = re.fullmatch(r'transition(?:-(.+))?', name)
+    if match:
+        if match.group(1) == 'none':
+            return "transition-property:none"
+        if (match.group(1) or "") in TRANSITIONS:
+            return f"transition-property:{TRANSITIONS[match.group(1) or '']};transition-timing-function:cubic-bezier(0.4, 0, 0.2, 1);transition-duration:150ms"
+
+
+def _r_duration(name, negative):
+    match = re.fullmatch(r'(duration|delay)-(\d+)', name)
+    if match:
+        prop = "transition-duration" if match.group(1) == 'duration' else "transition-delay"
+        return f"{prop}:{match.group(2)}ms"
+
+
+def _r_ease(name, negative):
+    if name.startswith('ease-') and name[5:] in EASING:
+        return f"transition-timing-function:{EASING[name[5:]]}"
+
+
+RESOLVERS = [
+    _r_sr_only, _r_pointer_events, _r_position, _r_inset, _r_z, _r_col_span, _r_margin, _r_display,
+    _r_size, _r_max_width, _r_flex, _r_table, _r_origin, _r_translate, _r_rotate, _r_scale, _r_transform,
+    _r_animate, _r_cursor, _r_select, _r_list, _r_appearance, _r_grid_cols, _r_flex_direction, _r_flex_wrap,
+    _r_alignment, _r_gap, _r_space, _r_divide, _r_overflow, _r_text_overflow, _r_rounded, _r_border_width,
+    _r_border_style, _r_border_color, _r_background, _r_gradient_stops, _r_object_fit, _r_padding,
+    _r_text_align, _r_align, _r_font_family, _r_font_size, _r_font_weight, _r_text_transform, _r_leading,
+    _r_tracking, _r_text_color, _r_decoration, _r_antialiased, _r_placeholder, _r_opacity, _r_shadow,
+    _r_outline, _r_filter, _r_backdrop, _r_transition, _r_duration, _r_ease,
+]
+
+
+def _split_variants(class_name):
+    """'md:hover:bg-white/10' -> (['md', 'hover'], 'bg-white/10'), ignoring ':' inside [...]."""
+    parts, depth, current = [], 0, ""
+    for char in class_name:
+        if char == '[':
+            depth += 1
+        elif char == ']':
+            depth -= 1
+        if char == ':' and depth == 0:
+            parts.append(current)
+            current = ""
+        else:
+            current += char
+    return parts, current
+
+
+def _escape(class_name):
+    """CSS-escapes a class name for use in a selector ('md:w-1/3' -> 'md\\:w-1\\/3')."""
+    escaped = "".join(c if (c.isalnum() or c in '-_') else f"\\{c}" for c in class_name)
+    if escaped[0].isdigit():
+        escaped = f"\\{ord(escaped[0]):x} {escaped[1:]}"
+    return escaped
+
+
+def _resolve(class_name):
+    """Returns (media_index, variant_rank, plugin_index, selector, declarations, extra_css) or None."""
+    variants, utility = _split_variants(class_name)
+    media_index = 0
+    breakpoints = [bp for bp, _ in BREAKPOINTS]
+    pseudo = []
+    variant_rank = 0
+    for variant in variants:
+        if variant in breakpoints and media_index == 0:
+            media_index = breakpoints.index(variant) + 1
+        elif variant in PSEUDO_VARIANTS or variant in ('group-hover', 'group-focus'):
+            pseudo.append(variant)
+            variant_rank = max(variant_rank, VARIANT_ORDER.index(variant) + 1)
+        else:
+            return None
+
+    negative = utility.startswith('-')
+    name = utility[1:] if negative else utility
+    for plugin_index, resolver in enumerate(RESOLVERS):
+        result = resolver(name, negative)
+        if result is None:
+            continue
+        declarations, suffix, extra_css = result if isinstance(result, tuple) else (result, "", "")
+        selector = f".{_escape(class_name)}"
+        group = ""
+        for variant in pseudo:
+            if variant.startswith('group-'):
+                group = f".group{PSEUDO_VARIANTS[variant[6:]]} "
+            else:
+                selector += PSEUDO_VARIANTS[variant]
+        return media_index, variant_rank, plugin_index, f"{group}{selector}{suffix}", declarations, extra_css
+    return None
+
+
+def compile_css(classes):
+    """
+    Compiles the given class names into a stylesheet (preflight + only the used utilities).
+    Returns (css, unknown) where unknown is the set of classes no utility matched -
+    our own component classes (glass-card, ph-* icons, ...) end up there too.
+    """
+    rules = []
+    unknown = set()
+    extra = []
+    for class_name in classes:
+        resolved = _resolve(class_name)
+        if resolved is None:
+            unknown.add(class_name)
+            continue
+        media_index, variant_rank, plugin_index, selector, declarations, extra_css = resolved
+        rules.append((media_index, variant_rank, plugin_index, class_name, selector, declarations))
+        if extra_css and extra_css not in extra:
+            extra.append(extra_css)
+
+    # Responsive blocks in breakpoint order, variants after plain utilities, then Tailwind's plugin order
+    rules.sort()
+    lines = [PREFLIGHT.rstrip('\n')]
+    lines.extend(sorted(extra))
+    current_media = 0
+    for media_index, _, _, _, selector, declarations in rules:
+        if media_index != current_media:
+            if current_media:
+                lines.append("}")
+            lines.append(f"@media (min-width:{BREAKPOINTS[media_index - 1][1]}){{")
+            current_media = media_index
+        lines.append(f"{selector}{{{declarations}}}")
+    if current_media:
+        lines.append("}")
+    return "\n".join(lines) + "\n", unknown
+
+
+def write_stylesheet(css, out_dir, prefix="site"):
+    """
+    Writes css to <out_dir>/<prefix>.<hash>.css (skipped when that build already exists).
+    Returns (file name, files, bytes written).
+    """
+    data = css.encode('utf-8')
+    filename = f"{prefix}.{hashlib.sha256(data).hexdigest()[:12]}.css"
+    path = os.path.join(out_dir, filename)
+    if os.path.exists(path):
+        return filename, 0, 0
+    os.makedirs(out_dir, exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return filename, 1, len(data)
+
+
+def prune_stylesheets(out_dir, keep, prefix="site"):
+    """
+    Removes <prefix>.<hash>.css builds (and their .gz/.br variants) not in keep, the file names
+    pages still link. The unhashed <prefix>.css of older versions goes too.
+    """
+    if not os.path.isdir(out_dir):
+        return
+    pattern = re.compile(rf"({re.escape(prefix)}(?:\.[0-9a-f]{{12}})?\.css){VARIANT_PATTERN}$")
+    for filename in os.listdir(out_dir):
+        match = pattern.match(filename)
+        if match and match.group(1) not in keep:
+            os.remove(os.path.join(out_dir, filename))
@@ -0,0 +1,77 @@
+import json
+import os
+import re
+import time
+
+# --- CONFIGURATION ---
+STATS_NAME = "stats.json"
+# Older builds spliced the AI output into the page after this marker, up to the end of the file
+LEGACY_MARKER = "<!-- STATS_GO_HERE -->"
+
+
+class StatsStore:
+    """
+    Extracted character stats, kept next to characters.json in stats.json:
+    {char_id: {"html": snippet, "model": model, "updated": timestamp}}.
+    The generator renders pages from here, so rebuilding never loses AI output.
+    """
+
+    def __init__(self, state_dir):
+        self.path = os.path.join(state_dir, STATS_NAME)
+        self.entries = {}
+        self.dirty = False
+        # stats.json only exists once the legacy pages have been checked (see import_legacy)
+        self.legacy_checked = os.path.exists(self.path)
+        if self.legacy_checked:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f)
+
+    def html(self, char_id):
+        entry = self.entries.get(char_id)
+        return entry["html"] if entry else None
+
+    def set(self, char_id, html, model=None):
+        self.entries[char_id] = {"html": html, "model": model, "updated": time.strftime("%Y-%m-%dT%H:%M:%S")}
+        self.dirty = True
+
+    def remove(self, char_id):
+        if self.entries.pop(char_id, None) is not None:
+            self.dirty = True
+
+    def import_legacy(self, site_root, characters, page_id, log=print):
+        """
+        Pulls stats out of pages written by older builds (marker followed by the AI snippet)
+        before the generator overwrites them. Returns the number of characters imported.
+        Runs once: afterwards save() writes stats.json (even an empty one) and later calls return 0.
+        """
+        if self.legacy_checked:
+            return 0
+        self.legacy_checked = True
+        self.dirty = True
+        imported = 0
+        for char_id in characters:
+            if char_id in self.entries:
+                continue
+            page_path = os.path.join(site_root, "characters", f"{page_id(char_id)}.html")
+            if not os.path.exists(page_path):
+                continue
+            with open(page_path, 'r', encoding='utf-8') as f:
+                html_content = f.read()
+            match = re.search(re.escape(LEGACY_MARKER) + r'(.*)', html_content, flags=re.DOTALL)
+            # The untouched template still has its "No Data Available" placeholder after the marker
+            if not match or "No Data Available" in match.group(1) or not match.group(1).strip():
+                continue
+            self.set(char_id, match.group(1).strip(), model="imported")
+            imported += 1
+        if imported:
+            log(f"Imported stats of {imported} character{'s' if imported != 1 else ''} from existing pages into {STATS_NAME}.")
+        return imported
+
+    def save(self):
+        if not self.dirty:
+            return
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f, indent=4, sort_keys=True)
+        os.replace(tmp_path, self.path)
+        self.dirty = False
@@ -0,0 +1,41 @@
+import html
+import re
+
+# Precompiled HTML templates for site_render.py.
+# {{ name }} is HTML-escaped, {{ name|raw }} is inserted as is (markup we built ourselves).
+# Single braces are plain text, so inline CSS and JS need no doubling.
+
+# --- CONFIGURATION ---
+SLOT_PATTERN = re.compile(r"\{\{\s*([A-Za-z_]\w*)\s*(\|\s*raw\s*)?\}\}")
+
+
+def escape(value):
+    """Text and attribute safe: & < > " ' are replaced by entities."""
+    return html.escape(str(value), quote=True)
+
+
+class Template:
+    """
+    Parsed once into literal chunks and slots; render() fills the slots and joins everything
+    in a single pass, so the cost is linear in the size of the output.
+    Every slot needs a value, a missing one raises KeyError.
+    """
+
+    def __init__(self, source):
+        self.source = source
+        # split() with two groups yields [text, name, raw, text, name, raw, ..., text]
+        pieces = SLOT_PATTERN.split(source)
+        self.head = pieces[0]
+        self.slots = [(name, bool(raw), text) for name, raw, text in zip(pieces[1::3], pieces[2::3], pieces[3::3])]
+
+    def render(self, **values):
+        out = [self.head]
+        for name, raw, text in self.slots:
+            value = values[name]
+            out.append(str(value) if raw else escape(value))
+            out.append(text)
+        return "".join(out)
+
+    def render_each(self, rows):
+        """Renders the template once per dict in rows and joins the results."""
+        return "".join(self.render(**row) for row in rows)
@@ -0,0 +1,154 @@
+import io
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+import ai_extract
+from ai_extract import AICancelled, AIExtractError, extract_stats, preprocess_image
+
+# extract_stats() against a stand-in for the Gemini endpoint on localhost.
+# Run from the repository root: python -m unittest discover tests
+
+
+class StandInServer:
+    """
+    Answers each POST with the next scripted (status, headers, body) and records when it came in.
+    The last response repeats once the script runs out.
+    """
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.requests = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                server.requests.append((time.perf_counter(), self.path, dict(self.headers), json.loads(body)))
+                status, headers, payload = server.responses[min(len(server.requests), len(server.responses)) - 1]
+                data = payload.encode('utf-8')
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.endpoint = f"http://127.0.0.1:{self.httpd.server_address[1]}/v1beta"
+        self.thread = threading.Thread(target=self.httpd.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def answer(text):
+    return 200, {"Content-Type": "application/json"}, json.dumps({"candidates": [{"content": {"parts": [{"text": text}]}}]})
+
+
+def failure(status, retry_after=None):
+    return status, {"Retry-After": retry_after} if retry_after else {}, "{}"
+
+
+# Keeps the exponential waits short; Retry-After is still capped by the real MAX_BACKOFF
+@mock.patch.object(ai_extract, "BASE_BACKOFF", 0.01)
+class ExtractStatsRetryTest(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.screenshot = os.path.join(tmp.name, "stats.png")
+        with open(self.screenshot, 'wb') as f:
+            f.write(b"\x89PNG\r\n\x1a\nnot really a png")
+        self.messages = []
+
+    def extract(self, server, **kwargs):
+        return extract_stats([self.screenshot], "test-key", endpoint=server.endpoint, model="test-model",
+                             progress=self.messages.append, preprocess=None, **kwargs)
+
+    def test_success_sends_key_header_and_image(self):
+        with StandInServer([answer("<div>stats</div>")]) as server:
+            self.assertEqual(self.extract(server), "<div>stats</div>")
+        _, path, headers, payload = server.requests[0]
+        self.assertEqual(path, "/v1beta/models/test-model:generateContent")
+        self.assertEqual(headers["x-goog-api-key"], "test-key")
+        self.assertEqual(payload["contents"][0]["parts"][1]["inline_data"]["mime_type"], "image/png")
+
+    def test_retries_429_and_5xx(self):
+        with StandInServer([failure(429), failure(503), answer("ok")]) as server:
+            self.assertEqual(self.extract(server), "ok")
+        self.assertEqual(len(server.requests), 3)
+        self.assertTrue(any("HTTP 503, retrying" in message for message in self.messages))
+
+    def test_honours_retry_after(self):
+        with StandInServer([failure(429, retry_after="1"), answer("ok")]) as server:
+            self.assertEqual(self.extract(server), "ok")
+        waited = server.requests[1][0] - server.requests[0][0]
+        self.assertGreaterEqual(waited, 0.9)
+        self.assertIn("HTTP 429, retrying in 1.0s...", self.messages)
+
+    def test_gives_up_after_retry_limit(self):
+        with StandInServer([failure(500)]) as server:
+            with self.assertRaisesRegex(AIExtractError, f"Giving up after {ai_extract.MAX_RETRIES + 1} attempts"):
+                self.extract(server)
+        self.assertEqual(len(server.requests), ai_extract.MAX_RETRIES + 1)
+
+    def test_client_error_is_not_retried(self):
+        with StandInServer([failure(400), answer("ok")]) as server:
+            with self.assertRaisesRegex(AIExtractError, "HTTP 400"):
+                self.extract(server)
+        self.assertEqual(len(server.requests), 1)
+
+    def test_cancel_interrupts_backoff(self):
+        cancel = threading.Event()
+        threading.Timer(0.2, cancel.set).start()
+        with StandInServer([failure(429, retry_after="30")]) as server:
+            start = time.perf_counter()
+            with self.assertRaises(AICancelled):
+                self.extract(server, cancel_event=cancel)
+        self.assertLess(time.perf_counter() - start, 2)
+        self.assertEqual(len(server.requests), 1)
+
+    def test_cancelled_before_first_attempt(self):
+        cancel = threading.Event()
+        cancel.set()
+        with StandInServer([answer("ok")]) as server:
+            with self.assertRaises(AICancelled):
+                self.extract(server, cancel_event=cancel)
+        self.assertEqual(server.requests, [])
+
+
+@unittest.skipIf(ai_extract.Image is None, "Pillow is not installed")
+class PreprocessImageTest(unittest.TestCase):
+
+    def test_undecodable_image_is_sent_as_is(self):
+        for data in (b"\x00\x00\x00\x18ftypheic" + b"\x00" * 64, b"\x89PNG\r\n\x1a\ntruncated"):
+            self.assertEqual(preprocess_image(data), (data, ai_extract.detect_mime(data)))
+
+    def test_exif_rotation_is_applied(self):
+        Image = ai_extract.Image
+        exif = Image.Exif()
+        exif[ai_extract.EXIF_ORIENTATION] = 6  # Stored landscape, displayed rotated 90 degrees clockwise
+        out = io.BytesIO()
+        Image.new("RGB", (40, 20), "white").save(out, "JPEG", exif=exif)
+        encoded, mime_type = preprocess_image(out.getvalue())
+        self.assertEqual(mime_type, "image/jpeg")
+        with Image.open(io.BytesIO(encoded)) as image:
+            self.assertEqual(image.size, (20, 40))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,132 @@
+import os
+import tempfile
+import unittest
+
+from character_data import JsonCharacterStore, SqliteCharacterStore, convert, open_store, save_characters
+
+# Both roster backends against the same small roster; the SQLite checks also look at the SQL
+# that runs, since group queries and single-record edits must not load or rewrite everything.
+# Run from the repository root: python -m unittest discover tests
+
+ROSTER = {
+    "spr-icon-pc-cyrill-01": {"name": "Cyrill", "icon": "SPR_Icon_PC_Cyrill_01.png", "group": "Bahamar", "classification": "Stock", "sort_order": 2},
+    "spr-icon-pc-adelina-01": {"name": "Adelina", "icon": "SPR_Icon_PC_Adelina_01.png", "group": "Bahamar", "classification": "Scout"},
+    "spr-icon-pc-bianca-01": {"name": "Bianca", "icon": "SPR_Icon_PC_Bianca_01.png", "group": "Bahamar", "classification": "Stock", "sort_order": 1},
+    "spr-icon-pc-hidden-01": {"name": "Hidden", "icon": "SPR_Icon_PC_Hidden_01.png", "group": "Bahamar", "hidden": True, "sort_order": 0},
+    "spr-icon-pc-emilia-01": {"name": "Emilia", "icon": "SPR_Icon_PC_Emilia_01.png", "group": "Reboldeaux", "classification": "Recruit"},
+}
+
+
+class StoreTests:
+    """Shared checks; subclasses set suffix to pick the backend through open_store()."""
+    suffix = None
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, "characters" + self.suffix)
+        store = open_store(self.path)
+        store.save_all({char_id: dict(data) for char_id, data in ROSTER.items()})
+        store.close()
+        self.store = open_store(self.path)
+        self.addCleanup(self.store.close)
+
+    def reopened(self):
+        store = open_store(self.path)
+        self.addCleanup(store.close)
+        return store
+
+    def test_load_all_keeps_order_and_records(self):
+        self.assertEqual(list(self.store.load_all().items()), list(ROSTER.items()))
+
+    def test_by_group_sorts_and_filters_hidden(self):
+        self.assertEqual([char_id for char_id, _ in self.store.by_group("Bahamar")],
+                         ["spr-icon-pc-bianca-01", "spr-icon-pc-cyrill-01", "spr-icon-pc-adelina-01"])
+        self.assertEqual([char_id for char_id, _ in self.store.by_group("Bahamar", include_hidden=True)][0], "spr-icon-pc-hidden-01")
+        self.assertEqual(self.store.by_group("Nowhere"), [])
+
+    def test_get(self):
+        self.assertEqual(self.store.get("spr-icon-pc-emilia-01"), ROSTER["spr-icon-pc-emilia-01"])
+        self.assertIsNone(self.store.get("spr-icon-pc-nobody-01"))
+
+    def test_update_is_partial_and_persisted(self):
+        self.store.update("spr-icon-pc-emilia-01", hidden=True, classification="Scout")
+        expected = dict(ROSTER["spr-icon-pc-emilia-01"], hidden=True, classification="Scout")
+        self.assertEqual(self.reopened().get("spr-icon-pc-emilia-01"), expected)
+        self.assertEqual([char_id for char_id, _ in self.reopened().by_group("Reboldeaux")], [])
+
+    def test_update_unknown_record(self):
+        self.assertFalse(self.store.update("spr-icon-pc-nobody-01", hidden=True))
+        self.assertEqual(self.reopened().load_all(), ROSTER)
+
+    def test_save_all_reports_changes(self):
+        characters = self.store.load_all()
+        self.assertFalse(self.store.save_all(characters))
+        del characters["spr-icon-pc-adelina-01"]
+        characters["spr-icon-pc-bianca-01"]["group"] = "Reboldeaux"
+        self.assertTrue(self.store.save_all(characters))
+        self.assertEqual(self.reopened().load_all(), characters)
+
+
+class JsonCharacterStoreTest(StoreTests, unittest.TestCase):
+    suffix = ".json"
+
+    def test_backend(self):
+        self.assertIsInstance(self.store, JsonCharacterStore)
+
+
+class SqliteCharacterStoreTest(StoreTests, unittest.TestCase):
+    suffix = ".db"
+
+    def trace(self):
+        statements = []
+        self.store.connection.set_trace_callback(statements.append)
+        return statements
+
+    def test_backend(self):
+        self.assertIsInstance(self.store, SqliteCharacterStore)
+
+    def test_by_group_uses_group_index(self):
+        plan = self.store.connection.execute(
+            "EXPLAIN QUERY PLAN SELECT id, data FROM characters WHERE grp = ? AND hidden = 0 "
+            "ORDER BY COALESCE(sort_order, 999), name", ("Bahamar",)).fetchall()
+        self.assertTrue(any("idx_characters_group" in row[-1] for row in plan), plan)
+
+    def test_update_writes_one_row(self):
+        statements = self.trace()
+        self.assertTrue(self.store.update("spr-icon-pc-emilia-01", hidden=True))
+        writes = [sql for sql in statements if sql.startswith(("INSERT", "UPDATE", "DELETE"))]
+        self.assertEqual(len(writes), 1)
+        self.assertIn("'spr-icon-pc-emilia-01'", writes[0])
+        self.assertFalse(any(sql.startswith("SELECT") and "WHERE" not in sql for sql in statements))
+
+    def test_save_all_writes_only_changed_rows(self):
+        characters = self.store.load_all()
+        characters["spr-icon-pc-bianca-01"]["sort_order"] = 5
+        # The last entry: removing an earlier one shifts (and so rewrites) the positions after it
+        del characters["spr-icon-pc-emilia-01"]
+        statements = self.trace()
+        self.store.save_all(characters)
+        self.assertEqual(len([sql for sql in statements if sql.startswith("INSERT")]), 1)
+        self.assertEqual(len([sql for sql in statements if sql.startswith("DELETE")]), 1)
+
+    def test_update_then_save_all_does_not_rewrite_row(self):
+        characters = self.store.load_all()
+        self.store.update("spr-icon-pc-emilia-01", hidden=True)
+        characters["spr-icon-pc-emilia-01"]["hidden"] = True
+        statements = self.trace()
+        self.assertFalse(self.store.save_all(characters))
+        self.assertEqual(statements, [])
+
+    def test_convert_round_trip(self):
+        exported = self.path.replace(".db", ".json")
+        self.store.close()
+        self.assertEqual(convert(self.path, exported), len(ROSTER))
+        reference = exported + ".reference"
+        save_characters(reference, ROSTER)
+        with open(exported) as f, open(reference) as g:
+            self.assertEqual(f.read(), g.read())
+
+
+if __name__ == "__main__":
+    unittest.main()
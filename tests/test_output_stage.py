@@ -0,0 +1,82 @@
+import unittest
+
+from output_stage import minify_css, minify_html, minify_js
+
+# The minifiers on the cases their rules exist for; the golden pages in benchmarks/ only
+# cover what our own templates happen to contain.
+# Run from the repository root: python -m unittest discover tests
+
+
+class MinifyHtmlTest(unittest.TestCase):
+
+    def test_whitespace_around_block_tags_is_dropped(self):
+        html = "<!DOCTYPE html>\n<html>\n  <body>\n    <div>\n      <p> Hi <b>there</b>  you </p>\n    </div>\n  </body>\n</html>\n"
+        self.assertEqual(minify_html(html), "<!DOCTYPE html><html><body><div><p>Hi <b>there</b> you</p></div></body></html>\n")
+
+    def test_whitespace_between_inline_elements_stays(self):
+        self.assertEqual(minify_html("<div>\n  <span>a</span>\n  <span>b</span>\n</div>"), "<div><span>a</span> <span>b</span></div>\n")
+
+    def test_inline_block_tags_keep_their_whitespace(self):
+        html = '<div class="inline-block">a</div>\n<div class="inline-block">b</div>\n<div>c</div>'
+        self.assertEqual(minify_html(html), '<div class="inline-block">a</div> <div class="inline-block">b</div><div>c</div>\n')
+
+    def test_pre_and_textarea_are_copied(self):
+        html = "<div>\n<pre>\n  x   y\n</pre>\n<textarea>  a\n b </textarea>\n</div>"
+        self.assertEqual(minify_html(html), "<div><pre>\n  x   y\n</pre><textarea>  a\n b </textarea></div>\n")
+
+    def test_comments_dropped_except_conditional(self):
+        html = "<head>\n<!--[if IE]><p>old</p><![endif]-->\n<!-- note -->\n</head>\n<p>a <!-- x --> b</p>"
+        self.assertEqual(minify_html(html), "<head><!--[if IE]><p>old</p><![endif]--></head><p>a b</p>\n")
+
+    def test_nbsp_is_not_whitespace(self):
+        self.assertEqual(minify_html("<p>a \u00a0 b</p>"), "<p>a \u00a0 b</p>\n")
+        self.assertEqual(minify_html("<div>\u00a0</div>"), "<div>\u00a0</div>\n")
+
+
+class MinifyCssTest(unittest.TestCase):
+
+    def test_comments_and_spaces(self):
+        self.assertEqual(minify_css("/* c */ .a  >  .b , .c { margin: 0  auto; }\n"), ".a>.b,.c{margin:0 auto;}")
+
+    def test_strings_are_copied(self):
+        self.assertEqual(minify_css('.x::before { content: "a  b /* c */"; }'), '.x::before{content:"a  b /* c */";}')
+
+    def test_empty_custom_property_keeps_its_space(self):
+        self.assertEqual(minify_css(":root { --x: ; --y: 1px }"), ":root{--x: ;--y:1px}")
+
+    def test_pseudo_classes(self):
+        self.assertEqual(minify_css("a:hover { color: red }"), "a:hover{color:red}")
+        # A descendant's pseudo-class, not a:hover
+        self.assertEqual(minify_css("a :hover { color: red }"), "a :hover{color:red}")
+
+
+class MinifyJsTest(unittest.TestCase):
+
+    def test_regex_and_division(self):
+        self.assertEqual(minify_js("x = a / b / c"), "x=a/b/c\n")
+        self.assertEqual(minify_js("s.split( /[^a-z0-9 ]+/ ).filter(Boolean)"), "s.split(/[^a-z0-9 ]+/).filter(Boolean)\n")
+        self.assertEqual(minify_js("x = /a\\/b[/]  c/g.test(s)"), "x=/a\\/b[/]  c/g.test(s)\n")
+
+    def test_line_breaks_that_asi_needs_stay(self):
+        self.assertEqual(minify_js("function f() {\n    return\n    x\n}"), "function f(){return\nx}\n")
+        self.assertEqual(minify_js("a\n++b"), "a\n++b\n")
+        self.assertEqual(minify_js("a = b\n(c)"), "a=b\n(c)\n")
+        self.assertEqual(minify_js("foo()\n    .bar();\n// done\nbaz()"), "foo().bar();baz()\n")
+
+    def test_operators_do_not_merge(self):
+        self.assertEqual(minify_js("a + +b"), "a+ +b\n")
+        self.assertEqual(minify_js("a - -b"), "a- -b\n")
+        self.assertEqual(minify_js("1 .toString()"), "1 .toString()\n")
+
+    def test_strings_and_templates_are_copied(self):
+        self.assertEqual(minify_js("f('a  b', \"c // d\")"), "f('a  b',\"c // d\")\n")
+        self.assertEqual(minify_js("x = `a ${ `b  c` } d`;  y = 1"), "x=`a ${ `b  c` } d`;y=1\n")
+        self.assertEqual(minify_js('x = `${ {a: 1}["a"] }  ${ "}" }`'), 'x=`${ {a: 1}["a"] }  ${ "}" }`\n')
+
+    def test_unterminated_literal_returns_input(self):
+        for js in ("x = 'open", "x = `open ${ 1", "x = `a ${ `b } c`"):
+            self.assertEqual(minify_js(js), js)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,204 +1,213 @@
+import argparse
+import copy
+import difflib
 import json
 import os
-import difflib
+
+from character_data import NAME_MAPPING, open_store
 
 # --- CONFIGURATION ---
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 JSON_PATH = os.path.join(BASE_DIR, "characters.json")
+# Region lists: {"default_group": ..., "groups": [{"group": ..., "normal": [names], "rare": [names]}, ...]}
+ROSTER_PATH = os.path.join(BASE_DIR, "roster.json")
+# Fields the roster decides; anything else (icon, sort_order, ...) is left alone
+ROSTER_FIELDS = ("name", "group", "classification", "is_rare", "hidden")
+
+# Fuzzy matches scoring below this (difflib ratio) are reported as low confidence
+FUZZY_CUTOFF = 0.6
+CONFIDENT_SCORE = 0.85
+# A runner-up for another character this close to the best fuzzy score makes the match ambiguous
+AMBIGUOUS_MARGIN = 0.05
+# The fuzzy search only scores the names sharing the most bigrams with the query...
+MAX_FUZZY_CANDIDATES = 64
+# ...and skips bigrams found in more names than this (after the rarest one), they barely narrow anything down
+COMMON_GRAM_LIMIT = 1000
+
+
+def name_grams(text):
+    """Padded character bigrams, so even three-letter names share grams with their typos."""
+    text = f" {text.lower()} "
+    return {text[i:i + 2] for i in range(len(text) - 1)}
+
 
-# User provided lists
-STOCK_CHARS = ["Retiff", "Canabel", "Echella", "Tikanile", "Ganazu"]
-
-REBOLDOUEX = {
-    "normal": ["Andre", "Angie", "Brunie", "Claude", "Falso", "Idge", "Jack", "Panfilo", "Ramiro", "Sharif", "Verita", "Yeganeh", "Henik", "Nix", "Nolette", "Rakib", "Roizia"],
-    "rare": ["Scavenger Yeganeh", "Battle Cook Panfilo", "Battle Smith Idge", "Battlefield Claude"]
-}
-
-COIMBRA = {
-    "normal": ["Adelina", "Alejandro", "Bernelli", "Calyce", "Cortasar", "Reckless Emilia", "Emilia", "Gracielo", "Irawan", "Lisa", "Mboma", "Soho", "Vinar"],
-    "rare": ["Sniper Bernelli", "Sage Emilia", "Pirate Adelina", "Soho the Wind", "Mercenary Calyce", "Roht", "Loreta", "Bane", "Vanessa", "Becky"]
-}
-
-AUCH = {
-    "normal": ["Baek Ho", "Catherine", "Catherine Torsche", "Claire", "Gurtrude", "Hellena", "Karjalainen", "Keuen", "Lorch", "Mary", "Rio", "Trina", "Valleria", "Viki", "Tiburon"],
-    "rare": ["Cannon Shooter Claire", "Designer Karjalainen", "Meister Lorch", "Conductor Rio", "Cutie Claire", "Jane", "Jaina", "Giltine", "Valeria Vendetta", "Bianca"]
-}
-
-USTIUR = {
-    "normal": ["Grenmah", "Rescue Knight", "Serth", "Romina"],
-    "rare": ["Rescue Officer Romina", "P. Queen Grenmah", "Miho", "Miha", "Chungha", "Wanida", "Marcelino", "Elizabeth", "Ivy"]
-}
-
-BAHAMAR = {
-    "normal": ["Nena", "Sharon", "Sierra"],
-    "rare": ["Jin", "Asoka", "Sage Sharon", "Psyche", "Seolhwa", "Laval"]
-}
-
-LOS_TOLDOS = {
-    "normal": ["Kurt", "Edward"],
-    "rare": []
-}
-
-KATOVIC = {
-    "normal": ["Garcia", "Natalie", "Selva Norte"],
-    "rare": ["Banshee Natalie", "Mertis", "Selane", "Cold Hearted Ganazu", "Cold Hearted Ganuzu"]
-}
-
-# Mapping for tricky names or missing icons
-NAME_MAPPING = {
-    "Baek Ho": "Backho",
-    "Edward": "Eduardo",
-    "Grenmah": "Grandma",
-    "P. Queen Grenmah": "Grandma2", # Likely mapped to Grandma2
-    "Rescue Officer Romina": "Romina2",
-    "Battle Cook Panfilo": "Panfilo2",
-    "Battle Smith Idge": "Idge2",
-    "Battlefield Claude": "Claude2",
-    "Scavenger Yeganeh": "Yeganeh2",
-    "Sniper Bernelli": "Berneli2", # Note spelling Berneli vs Bernelli
-    "Sage Emilia": "Emilia3",
-    "Pirate Adelina": "Adelina2",
-    "Mercenary Calyce": "Calyce2",
-    "Cannon Shooter Claire": "Clair2", # Claire vs Clair
-    "Cutie Claire": "Clair3",
-    "Designer Karjalainen": "Karjalainen2",
-    "Meister Lorch": "Lorch2",
-    "Conductor Rio": "Rio2",
-    "Valeria Vendetta": "Valleria2", # Valleria vs Valeria
-    "Sage Sharon": "Sharon2",
-    "Banshee Natalie": "Natalie2",
-    "Cold Hearted Ganazu": "Ganazu2",
-    "Cold Hearted Ganuzu": "Ganazu2", # User typo handling
-    "Reckless Emilia": "Emilia2", 
-    "Selva Norte": "Selva",
-    "Catherine Torsche": "Catherine2", # Fixed from Torshe
-    "Rescue Knight": "Rescue", 
-}
-
-def normalize_key(name):
+class NameResolver:
     """
-    Tries to find the character key in the json based on the name.
+    Maps the names from the roster lists to character keys. The lookup tables are built once
+    from char_data: exact names, key tokens ("spr-icon-pc-backho-01" -> "backho"), the
+    NAME_MAPPING aliases and a bigram index that narrows the fuzzy search to a few candidates.
+    Same precedence as before: alias, exact name, key token, then closest name.
     """
-    # 1. Check explicit mapping
-    target_name = NAME_MAPPING.get(name, name)
-    
-    # 2. Try to find key containing this name (case insensitive)
-    # The keys are like "spr-icon-pc-name-01"
-    
-    # Clean target name for search (remove spaces, lowercase)
-    clean_target = target_name.lower().replace(" ", "")
-    
-    best_match = None
-    
-    for key in CHAR_DATA.keys():
-        # Key format: spr-icon-pc-name-01
-        key_parts = key.split("-")
-        if len(key_parts) >= 4:
-            key_name = key_parts[3] # spr-icon-pc-[NAME]-01
-            
-            # Direct match of name part
-            if key_name == clean_target:
-                return key
-            
-            # Check if key_name is in target (e.g. "clair" in "clair2") - wait, no.
-            # Check if target is in key_name?
-            
-    # 3. Fuzzy match if no direct match
-    # We search against the "name" field in the json values
-    for key, data in CHAR_DATA.items():
-        if data['name'].lower() == target_name.lower():
-            return key
-            
-    # 4. Fuzzy match against keys
-    # ...
-    
-    return None
 
-def find_key_by_name_fuzzy(name, char_data):
-    # 1. Explicit mapping
-    mapped_name = NAME_MAPPING.get(name, name)
-    
-    # 2. Direct Name Match in JSON values
-    for key, data in char_data.items():
-        if data['name'].lower() == mapped_name.lower():
-            return key
-            
-    # 3. Key Match (e.g. "Backho" -> "spr-icon-pc-backho-01")
-    # We construct a potential key pattern or search for it
-    # simplify mapped_name: "Grandma2" -> "grandma2"
-    simple_name = mapped_name.lower().replace(" ", "")
-    
-    for key in char_data.keys():
-        if f"-{simple_name}-" in key:
-            return key
-            
-    # 4. If still not found, try fuzzy match on names
-    all_names = [d['name'] for d in char_data.values()]
-    matches = difflib.get_close_matches(name, all_names, n=1, cutoff=0.6)
-    if matches:
+    def __init__(self, char_data):
+        self.names = {}      # lowercase name -> [key, ...] in char_data order
+        self.tokens = {}     # key token -> first key containing it
+        self.grams = {}      # bigram -> {lowercase name}
         for key, data in char_data.items():
-            if data['name'] == matches[0]:
-                return key
-                
-    return None
-
-def update_group(group_name, char_list, is_rare=False):
-    print(f"Processing {group_name} ({'Rare' if is_rare else 'Normal'})...")
-    for name in char_list:
-        key = find_key_by_name_fuzzy(name, CHAR_DATA)
+            self.add_name(key, data['name'])
+            for token in key.split('-')[1:-1]:
+                self.tokens.setdefault(token, key)
+
+    def add_name(self, key, name):
+        lower = name.lower()
+        self.names.setdefault(lower, []).append(key)
+        for gram in name_grams(lower):
+            self.grams.setdefault(gram, set()).add(lower)
+
+    def rename(self, key, old_name, new_name):
+        """Keeps the index in step when a caller renames a character."""
+        keys = self.names.get(old_name.lower(), [])
+        if key in keys:
+            keys.remove(key)
+        self.add_name(key, new_name)
+
+    def fuzzy_candidates(self, name):
+        """[(score, lowercase name), ...] best first, for the names sharing the most bigrams with name."""
+        lower = name.lower()
+        shared = {}
+        postings = sorted((self.grams.get(gram, ()) for gram in name_grams(lower)), key=len)
+        for i, names in enumerate(postings):
+            if i and len(names) > COMMON_GRAM_LIMIT:
+                break
+            for candidate in names:
+                shared[candidate] = shared.get(candidate, 0) + 1
+        if len(shared) > MAX_FUZZY_CANDIDATES:
+            shared = sorted(shared, key=shared.get, reverse=True)[:MAX_FUZZY_CANDIDATES]
+        matcher = difflib.SequenceMatcher()
+        matcher.set_seq2(lower)
+        scored = []
+        for candidate in shared:
+            if not self.names.get(candidate):
+                continue  # renamed away
+            matcher.set_seq1(candidate)
+            if matcher.real_quick_ratio() >= FUZZY_CUTOFF and matcher.quick_ratio() >= FUZZY_CUTOFF:
+                score = matcher.ratio()
+                if score >= FUZZY_CUTOFF:
+                    scored.append((score, candidate))
+        # Ties go to the same name difflib.get_close_matches() would pick
+        scored.sort(reverse=True)
+        return scored
+
+    def resolve(self, name):
+        """Returns (key or None, method, note); note is set for ambiguous or low-confidence matches."""
+        mapped_name = NAME_MAPPING.get(name, name)
+        method = "alias" if mapped_name != name else "name"
+
+        keys = self.names.get(mapped_name.lower())
+        if keys:
+            note = f"ambiguous, also {', '.join(keys[1:])}" if len(keys) > 1 else None
+            return keys[0], method, note
+
+        key = self.tokens.get(mapped_name.lower().replace(" ", ""))
         if key:
-            CHAR_DATA[key]['group'] = group_name
-            CHAR_DATA[key]['classification'] = "Recruit" if is_rare else "Stock"
-            CHAR_DATA[key]['is_rare'] = is_rare # Keep this for backward compat if needed
-            CHAR_DATA[key]['hidden'] = False # Ensure character is visible
+            return key, "key", None
+
+        candidates = self.fuzzy_candidates(name)
+        if not candidates:
+            return None, "missing", None
+        score, best = candidates[0]
+        note = None
+        if len(candidates) > 1 and score - candidates[1][0] < AMBIGUOUS_MARGIN:
+            note = f"ambiguous with '{candidates[1][1]}' ({candidates[1][0]:.2f})"
+        elif score < CONFIDENT_SCORE:
+            note = f"low confidence ({score:.2f})"
+        return self.names[best][0], f"fuzzy {score:.2f}", note
+
+    def resolve_all(self, names):
+        """Resolves a whole roster list: {name: (key or None, method, note)}."""
+        return {name: self.resolve(name) for name in names}
+
+
+def find_key_by_name_fuzzy(name, char_data):
+    """One-off lookup; use NameResolver directly when resolving more than one name."""
+    return NameResolver(char_data).resolve(name)[0]
+
+def load_roster(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def assign_group(characters, resolver, group_name, char_list, is_rare=False, log=print):
+    for name, (key, method, note) in resolver.resolve_all(char_list).items():
+        if key:
+            characters[key]['group'] = group_name
+            characters[key]['classification'] = "Recruit" if is_rare else "Stock"
+            characters[key]['is_rare'] = is_rare # Keep this for backward compat if needed
+            characters[key]['hidden'] = False # Ensure character is visible
             
             # Update name to match user input if it's a mapped name or just to be clean
             # But be careful not to overwrite "Ganazu (Rare)" with "Cold Hearted Ganuzu" if that's what we want.
             # The user requested "Cold Hearted Ganuzu", so we should use that name.
-            CHAR_DATA[key]['name'] = name
+            resolver.rename(key, characters[key]['name'], name)
+            characters[key]['name'] = name
             
-            print(f"  [OK] {name} -> {key}")
+            if note:
+                log(f"  [CHECK] {name} -> {key} ({method}, {note})")
         else:
-            print(f"  [MISSING] Could not find character: {name}")
+            log(f"  [MISSING] {group_name}: could not find character: {name}")
+
+
+def plan_roster(char_data, roster, log=print):
+    """
+    The roster as it should be: every character not listed goes back to the default group
+    (as Stock), then the lists are applied in file order, so a later list wins.
+    Works on a copy; char_data is not modified.
+    """
+    characters = copy.deepcopy(char_data)
+    default_group = roster.get("default_group", "Unreleased")
+    for data in characters.values():
+        data['group'] = default_group
+        data['classification'] = "Stock"
+        data['is_rare'] = False
+
+    # One index for every list
+    resolver = NameResolver(characters)
+    for entry in roster["groups"]:
+        assign_group(characters, resolver, entry["group"], entry.get("normal", []), log=log)
+        assign_group(characters, resolver, entry["group"], entry.get("rare", []), is_rare=True, log=log)
+    return characters
+
+
+def diff_characters(old, new):
+    """[(key, [(field, old value, new value), ...]), ...] for the characters whose roster fields differ."""
+    changes = []
+    for key, data in new.items():
+        before = old.get(key, {})
+        fields = [(field, before.get(field), data.get(field)) for field in ROSTER_FIELDS
+                  if before.get(field) != data.get(field)]
+        if fields:
+            changes.append((key, fields))
+    return changes
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Apply roster.json (groups and classifications) to the character store.")
+    parser.add_argument("--data", default=JSON_PATH, help="Path to characters.json, or a .db file for the SQLite store")
+    parser.add_argument("--roster", default=ROSTER_PATH, help="Roster file with the region lists")
+    parser.add_argument("--dry-run", action="store_true", help="Only print what would change")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    print(f"Loading {os.path.basename(args.data)} and {os.path.basename(args.roster)}...")
+    store = open_store(args.data)
+    char_data = store.load_all()
+    target = plan_roster(char_data, load_roster(args.roster))
+
+    changes = diff_characters(char_data, target)
+    for key, fields in changes:
+        print(f"{key}: " + ", ".join(f"{field} {before!r} -> {after!r}" for field, before, after in fields))
+    if not changes:
+        print("Roster is up to date, nothing to write.")
+    elif args.dry_run:
+        print(f"{len(changes)} character(s) would change (dry run, nothing written).")
+    else:
+        # Both stores skip the write when nothing differs; SQLite only touches the changed rows
+        store.save_all(target)
+        print(f"Updated {len(changes)} character(s) in {os.path.basename(args.data)}.")
+    store.close()
+
 
-# --- MAIN ---
 if __name__ == "__main__":
-    print("Loading characters.json...")
-    with open(JSON_PATH, 'r') as f:
-        CHAR_DATA = json.load(f)
-        
-    # Reset all
-    print("Resetting all characters...")
-    for key in CHAR_DATA:
-        CHAR_DATA[key]['group'] = "Unreleased"
-        CHAR_DATA[key]['classification'] = "Stock"
-        CHAR_DATA[key]['is_rare'] = False
-
-    # Update Groups
-    update_group("Stock Characters", STOCK_CHARS)
-    
-    update_group("Cite Of Reboldouex", REBOLDOUEX['normal'])
-    update_group("Cite Of Reboldouex", REBOLDOUEX['rare'], is_rare=True)
-    
-    update_group("Port Of Coimbra", COIMBRA['normal'])
-    update_group("Port Of Coimbra", COIMBRA['rare'], is_rare=True)
-    
-    update_group("City of Auch", AUCH['normal'])
-    update_group("City of Auch", AUCH['rare'], is_rare=True)
-    
-    update_group("Ustiur", USTIUR['normal'])
-    update_group("Ustiur", USTIUR['rare'], is_rare=True)
-    
-    update_group("Bahamar", BAHAMAR['normal'])
-    update_group("Bahamar", BAHAMAR['rare'], is_rare=True)
-    
-    update_group("Los Toldos", LOS_TOLDOS['normal'])
-    update_group("Los Toldos", LOS_TOLDOS['rare'], is_rare=True)
-    
-    update_group("Katovic", KATOVIC['normal'])
-    update_group("Katovic", KATOVIC['rare'], is_rare=True)
-
-    print("Saving characters.json...")
-    with open(JSON_PATH, 'w') as f:
-        json.dump(CHAR_DATA, f, indent=4)
-    print("Done.")
+    main()